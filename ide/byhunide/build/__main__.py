@@ -0,0 +1,195 @@
+"""Headless builds: ``python -m byhunide.build PROJECT [PROJECT ...]``.
+
+Only the build modules are imported (never Qt), so this runs on CI
+machines without PySide6. Several projects are built concurrently, one
+process each. Exit status is 0 when every build succeeded, 1 when any
+failed, 2 for usage errors and 130 when interrupted.
+
+With ``--watch`` the projects are built once and then kept up to date
+incrementally (see ``byhunide.build.watch``) until Ctrl+C.
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, NamedTuple, Optional
+
+from byhunide.build.cache import BuildCache
+from byhunide.build.compiler import compile_project
+from byhunide.build.profiles import DEFAULT_PROFILE, PROFILES
+from byhunide.build.report import BuildResult
+from byhunide.build.watch import DEFAULT_INTERVAL, ProjectWatcher, WatchUpdate
+
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_INTERRUPTED = 130
+
+DEFAULT_OUT_NAME = "build"
+FORMATS = {"zip": ".zip", "byhunpkg": ".byhunpkg"}
+
+
+class _Task(NamedTuple):
+    project_root: str
+    out_path: str
+    options: Dict
+
+
+class _Outcome(NamedTuple):
+    task: _Task
+    result: Optional[BuildResult]
+    error: Optional[str]
+
+
+def _build(task: _Task) -> _Outcome:
+    options = dict(task.options)
+    cache_dir = options.pop("cache_dir")
+    use_cache = options.pop("use_cache")
+    try:
+        cache = BuildCache(cache_dir) if use_cache else None
+        result = compile_project(task.project_root, task.out_path, cache=cache, **options)
+    except Exception as e:
+        return _Outcome(task, None, f"{type(e).__name__}: {e}")
+    return _Outcome(task, result, None)
+
+
+def _out_paths(projects: List[str], out: Optional[str], out_dir: Optional[str], ext: str) -> List[str]:
+    if out:
+        return [out]
+    if not out_dir:
+        return [os.path.join(p, DEFAULT_OUT_NAME + ext) for p in projects]
+    paths = [os.path.join(out_dir, os.path.basename(os.path.normpath(p)) + ext) for p in projects]
+    if len(set(paths)) != len(paths):
+        raise ValueError("projects with the same folder name cannot share --out-dir")
+    return paths
+
+
+def _print_outcome(outcome: _Outcome, quiet: bool) -> None:
+    if outcome.error is not None:
+        print(f"FAILED {outcome.task.project_root}: {outcome.error}", file=sys.stderr)
+    elif not quiet:
+        r = outcome.result
+        print(
+            f"ok     {r.project_root} -> {r.out_path} "
+            f"({len(r.files)} files, {r.archive_bytes / (1024 * 1024):.2f} MB, {r.total_s:.2f} s)"
+        )
+
+
+def _print_update(watcher: ProjectWatcher, update: WatchUpdate) -> None:
+    if update.full_rebuild:
+        what = f"rebuilt {len(update.changed)} files"
+    else:
+        what = ", ".join(update.changed + [f"-{rel}" for rel in update.removed])
+    print(f"{time.strftime('%H:%M:%S')} {watcher.project_root}: {what} ({update.seconds:.2f} s)")
+
+
+def _watch(tasks: List[_Task], interval: float) -> int:
+    watchers = []
+    for task in tasks:
+        options = dict(task.options)
+        cache_dir = options.pop("cache_dir")
+        use_cache = options.pop("use_cache")
+        options.pop("write_report")
+        cache = BuildCache(cache_dir) if use_cache else None
+        watchers.append(ProjectWatcher(task.project_root, task.out_path, cache=cache, **options))
+    try:
+        while True:
+            for watcher in watchers:
+                try:
+                    update = watcher.poll()
+                except Exception as e:
+                    print(f"FAILED {watcher.project_root}: {type(e).__name__}: {e}", file=sys.stderr)
+                    continue
+                if update is not None:
+                    _print_update(watcher, update)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        return EXIT_OK
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m byhunide.build",
+        description="Obfuscate and package ByHun projects without the IDE.",
+    )
+    parser.add_argument("projects", nargs="+", help="project folders to build")
+    parser.add_argument("-o", "--out", help="archive path (single project only); a .byhunpkg path writes a package")
+    parser.add_argument("--out-dir", help=f"write <project name>.<format> here instead of <project>/{DEFAULT_OUT_NAME}.<format>")
+    parser.add_argument(
+        "--format",
+        choices=sorted(FORMATS),
+        default="zip",
+        help="ZIP archive or indexed .byhunpkg package (ignored with --out)",
+    )
+    parser.add_argument("-j", "--jobs", type=int, default=0, help="projects built at once (default: one per CPU)")
+    parser.add_argument("--workers", type=int, default=0, help="transform processes per project (default: CPUs / jobs)")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default=DEFAULT_PROFILE)
+    parser.add_argument("--seed", type=int, help="fixed seed for reproducible archives")
+    parser.add_argument("--no-minify", action="store_true", help="skip the minification stage")
+    parser.add_argument("--dedup", action="store_true", help="store files with identical content once")
+    parser.add_argument("--bundle", action="store_true", help="inline local scripts and stylesheets into HTML pages")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the build cache")
+    parser.add_argument("--cache-dir", help="build cache location (default: the IDE's cache)")
+    parser.add_argument("--report", action="store_true", help="write <archive>.report.json next to each archive")
+    parser.add_argument("--watch", action="store_true", help="keep rebuilding changed files until Ctrl+C")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="watch polling interval in seconds")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print failures")
+    args = parser.parse_args(argv)
+
+    if args.out and len(args.projects) > 1:
+        parser.error("--out needs a single project; use --out-dir for several")
+    if args.out and args.out_dir:
+        parser.error("--out and --out-dir are mutually exclusive")
+    missing = [p for p in args.projects if not os.path.isdir(p)]
+    if missing:
+        parser.error(f"not a folder: {', '.join(missing)}")
+    try:
+        out_paths = _out_paths(args.projects, args.out, args.out_dir, FORMATS[args.format])
+    except ValueError as e:
+        parser.error(str(e))
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+
+    cpus = os.cpu_count() or 1
+    jobs = max(1, min(args.jobs or cpus, len(args.projects)))
+    options = {
+        "workers": args.workers or max(1, cpus // jobs),
+        "profile": args.profile,
+        "seed": args.seed,
+        "minify": not args.no_minify,
+        "dedup": args.dedup,
+        "bundle": args.bundle,
+        "write_report": args.report,
+        "use_cache": not args.no_cache,
+        "cache_dir": args.cache_dir,
+    }
+    tasks = [_Task(p, out, options) for p, out in zip(args.projects, out_paths)]
+    if args.watch:
+        return _watch(tasks, args.interval)
+
+    failed = 0
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    try:
+        if pool is None:
+            outcomes = map(_build, tasks)
+        else:
+            outcomes = (f.result() for f in as_completed([pool.submit(_build, t) for t in tasks]))
+        for outcome in outcomes:
+            failed += outcome.error is not None
+            _print_outcome(outcome, args.quiet)
+    except KeyboardInterrupt:
+        print("Interrupted", file=sys.stderr)
+        return EXIT_INTERRUPTED
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    if len(tasks) > 1 and not args.quiet:
+        print(f"{len(tasks) - failed} built, {failed} failed")
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
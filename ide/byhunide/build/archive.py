@@ -0,0 +1,275 @@
+import os
+import struct
+import time
+import zipfile
+import zlib
+from typing import BinaryIO, Iterable, List, NamedTuple, Optional, Tuple
+
+
+CHUNK_SIZE = 1024 * 1024
+
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_CENTRAL_HEADER = struct.Struct("<4s4B4HL2L5H2L")
+_END_RECORD = struct.Struct("<4s4H2LH")
+
+_LOCAL_SIG = b"PK\003\004"
+_CENTRAL_SIG = b"PK\001\002"
+_END_SIG = b"PK\005\006"
+
+_VERSION = 20
+_UTF8_FLAG = 0x800
+_ZIP_MAX = 0xFFFFFFFF
+_ZIP_MAX_ENTRIES = 0xFFFF
+
+DateTime = Tuple[int, int, int, int, int, int]
+
+
+class CompressedEntry(NamedTuple):
+    payload: bytes
+    crc: int
+    size: int
+    method: int
+
+
+class ZipRecord(NamedTuple):
+    """Central directory data for one written entry"""
+
+    name: bytes
+    flags: int
+    method: int
+    dostime: int
+    dosdate: int
+    crc: int
+    compress_size: int
+    size: int
+    offset: int
+
+
+def deflate_bytes(data: bytes, level: int = zlib.Z_DEFAULT_COMPRESSION) -> CompressedEntry:
+    """Compress a whole entry up front; safe to call from worker threads"""
+    co = zlib.compressobj(level, zlib.DEFLATED, -15)
+    payload = co.compress(data) + co.flush()
+    return CompressedEntry(payload, zlib.crc32(data), len(data), zipfile.ZIP_DEFLATED)
+
+
+def store_bytes(data: bytes) -> CompressedEntry:
+    return CompressedEntry(data, zlib.crc32(data), len(data), zipfile.ZIP_STORED)
+
+
+def file_date_time(path: str) -> DateTime:
+    return time.localtime(os.stat(path).st_mtime)[:6]
+
+
+def _dos_time(date_time: Optional[DateTime]) -> Tuple[int, int]:
+    if date_time is None:
+        date_time = time.localtime()[:6]
+    year, month, day, hour, minute, second = date_time
+    if year < 1980:
+        year, month, day, hour, minute, second = 1980, 1, 1, 0, 0, 0
+    dosdate = (year - 1980) << 9 | month << 5 | day
+    dostime = hour << 11 | minute << 5 | (second // 2)
+    return dostime, dosdate
+
+
+def _record_name(record: ZipRecord) -> str:
+    return record.name.decode("utf-8" if record.flags & _UTF8_FLAG else "ascii")
+
+
+class ZipStreamWriter:
+    """Write a ZIP archive entry by entry without staging files on disk.
+
+    Entries can be added pre-compressed (so deflate work can run on other
+    threads) or streamed from an open file in fixed-size chunks.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fp: BinaryIO = open(path, "wb")
+        self._records: List[ZipRecord] = []
+        self._names = set()
+
+    @classmethod
+    def append(cls, path: str) -> "ZipStreamWriter":
+        """Reopen an existing archive to replace, remove or add entries in place.
+
+        New entries overwrite the old central directory, which is rewritten
+        on close. Data of replaced or removed entries stays in the file,
+        unreferenced, until the archive is written afresh. The archive is
+        closed (and so stays readable) even if an entry fails half-way.
+        """
+        with zipfile.ZipFile(path) as zf:
+            infos = zf.infolist()
+            data_end = zf.start_dir
+        writer = cls.__new__(cls)
+        writer.path = path
+        writer._records = []
+        writer._names = set()
+        for info in infos:
+            raw_name, flags = writer._encode_name(info.filename)
+            dostime, dosdate = _dos_time(info.date_time)
+            writer._records.append(
+                ZipRecord(
+                    raw_name, flags, info.compress_type, dostime, dosdate, info.CRC,
+                    info.compress_size, info.file_size, info.header_offset,
+                )
+            )
+        writer._fp = open(path, "r+b")
+        writer._fp.seek(data_end)
+        writer._fp.truncate()
+        writer._close_on_error = True
+        return writer
+
+    _close_on_error = False
+
+    def __enter__(self) -> "ZipStreamWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None or self._close_on_error:
+            self.close()
+        else:
+            self._fp.close()
+
+    def unreferenced_bytes(self) -> int:
+        """Entry data written so far that no current record points to"""
+        return self._fp.tell() - sum(_LOCAL_HEADER.size + len(r.name) + r.compress_size for r in self._records)
+
+    def remove(self, name: str) -> Optional[ZipRecord]:
+        """Drop ``name`` from the central directory; returns its record if it was present"""
+        name = name.replace(os.sep, "/").lstrip("/")
+        if name not in self._names:
+            return None
+        self._names.discard(name)
+        for i, r in enumerate(self._records):
+            if _record_name(r) == name:
+                return self._records.pop(i)
+        return None
+
+    def _encode_name(self, name: str) -> Tuple[bytes, int]:
+        name = name.replace(os.sep, "/").lstrip("/")
+        if name in self._names:
+            raise ValueError(f"Duplicate archive entry: {name}")
+        self._names.add(name)
+        try:
+            return name.encode("ascii"), 0
+        except UnicodeEncodeError:
+            return name.encode("utf-8"), _UTF8_FLAG
+
+    def _write_local_header(
+        self,
+        name: bytes,
+        flags: int,
+        method: int,
+        dostime: int,
+        dosdate: int,
+        crc: int,
+        compress_size: int,
+        size: int,
+    ) -> None:
+        self._fp.write(
+            _LOCAL_HEADER.pack(
+                _LOCAL_SIG, _VERSION, 0, flags, method, dostime, dosdate,
+                crc, compress_size, size, len(name), 0,
+            )
+        )
+        self._fp.write(name)
+
+    def _check_limits(self, offset: int, compress_size: int, size: int) -> None:
+        if max(offset, compress_size, size) > _ZIP_MAX:
+            raise zipfile.LargeZipFile("Archive entry exceeds the 4 GiB ZIP limit")
+
+    def add_entry(self, name: str, entry: CompressedEntry, date_time: Optional[DateTime] = None) -> ZipRecord:
+        raw_name, flags = self._encode_name(name)
+        dostime, dosdate = _dos_time(date_time)
+        offset = self._fp.tell()
+        self._check_limits(offset, len(entry.payload), entry.size)
+        self._write_local_header(
+            raw_name, flags, entry.method, dostime, dosdate, entry.crc, len(entry.payload), entry.size
+        )
+        self._fp.write(entry.payload)
+        record = ZipRecord(
+            raw_name, flags, entry.method, dostime, dosdate, entry.crc, len(entry.payload), entry.size, offset
+        )
+        self._records.append(record)
+        return record
+
+    def add_chunks(
+        self,
+        name: str,
+        chunks: Iterable[bytes],
+        compress: bool = True,
+        level: int = zlib.Z_DEFAULT_COMPRESSION,
+        date_time: Optional[DateTime] = None,
+    ) -> ZipRecord:
+        """Write ``chunks`` as one entry as they arrive, patching sizes afterwards"""
+        raw_name, flags = self._encode_name(name)
+        dostime, dosdate = _dos_time(date_time)
+        method = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+        offset = self._fp.tell()
+        self._write_local_header(raw_name, flags, method, dostime, dosdate, 0, 0, 0)
+
+        co = zlib.compressobj(level, zlib.DEFLATED, -15) if compress else None
+        crc = 0
+        size = 0
+        compress_size = 0
+        for chunk in chunks:
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+            out = co.compress(chunk) if co is not None else chunk
+            compress_size += len(out)
+            self._fp.write(out)
+        if co is not None:
+            tail = co.flush()
+            compress_size += len(tail)
+            self._fp.write(tail)
+
+        self._check_limits(offset, compress_size, size)
+        end = self._fp.tell()
+        self._fp.seek(offset + 14)
+        self._fp.write(struct.pack("<3L", crc, compress_size, size))
+        self._fp.seek(end)
+        record = ZipRecord(raw_name, flags, method, dostime, dosdate, crc, compress_size, size, offset)
+        self._records.append(record)
+        return record
+
+    def add_stream(
+        self,
+        name: str,
+        src: BinaryIO,
+        compress: bool = True,
+        level: int = zlib.Z_DEFAULT_COMPRESSION,
+        date_time: Optional[DateTime] = None,
+    ) -> ZipRecord:
+        """Copy ``src`` into the archive chunk by chunk"""
+        return self.add_chunks(name, iter(lambda: src.read(CHUNK_SIZE), b""), compress, level, date_time)
+
+    def add_file(
+        self,
+        name: str,
+        src_path: str,
+        compress: bool = True,
+        level: int = zlib.Z_DEFAULT_COMPRESSION,
+    ) -> ZipRecord:
+        with open(src_path, "rb") as src:
+            return self.add_stream(name, src, compress, level, file_date_time(src_path))
+
+    def close(self) -> None:
+        if self._fp.closed:
+            return
+        if len(self._records) > _ZIP_MAX_ENTRIES:
+            raise zipfile.LargeZipFile("Too many entries for a ZIP archive without ZIP64")
+        cd_offset = self._fp.tell()
+        for r in self._records:
+            self._fp.write(
+                _CENTRAL_HEADER.pack(
+                    _CENTRAL_SIG, _VERSION, 3, _VERSION, 0, r.flags, r.method, r.dostime, r.dosdate,
+                    r.crc, r.compress_size, r.size, len(r.name), 0, 0, 0, 0,
+                    (0o100644 & 0xFFFF) << 16, r.offset,
+                )
+            )
+            self._fp.write(r.name)
+        cd_size = self._fp.tell() - cd_offset
+        self._check_limits(cd_offset, cd_size, 0)
+        count = len(self._records)
+        self._fp.write(_END_RECORD.pack(_END_SIG, 0, 0, count, count, cd_size, cd_offset, 0))
+        self._fp.close()
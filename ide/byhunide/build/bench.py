@@ -0,0 +1,336 @@
+"""Benchmarks for the build pipeline on synthetic ByHun projects.
+
+    python -m byhunide.build.bench --files 200 --file-size 20000 --out bench.json
+    python -m byhunide.build.bench --compare bench.json
+
+Each run generates a project, times the walk, transform and zip stages and
+the end-to-end ``compile_project``, and records throughput and peak memory.
+Results are written as JSON so runs from different releases can be compared;
+``--compare`` exits non-zero when a stage got slower than ``--threshold``.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+from byhunide.build.archive import ZipStreamWriter, deflate_bytes
+from byhunide.build.compression import CompressionPolicy
+from byhunide.build.compiler import (
+    COMPILER_VERSION,
+    TRANSFORMS,
+    _iter_project_files,
+    _iter_transforms,
+    compile_project,
+    obfuscate_css,
+    obfuscate_html,
+    obfuscate_js,
+)
+from byhunide.build.profiles import DEFAULT_PROFILE, get_profile
+
+
+RESULTS_VERSION = 1
+
+_JS_LINES = [
+    "function handler{n}(event){{ var el = document.getElementById('item{n}'); el.classList.toggle('active'); }}\n",
+    "const config{n} = {{ name: 'module{n}', retries: {n}, enabled: true }};\n",
+    "// Update the view after data for section {n} has loaded\n",
+    "window.addEventListener('load', function(){{ console.log('ready {n}'); }});\n",
+    "let total{n} = [1, 2, 3, {n}].map(function(x){{ return x * 2; }}).reduce(function(a, b){{ return a + b; }}, 0);\n",
+]
+_CSS_LINES = [
+    ".card-{n} {{ padding: {n}px; border-radius: 8px; color: #333; }}\n",
+    "/* layout rules for block {n} */\n",
+    "#item{n}:hover {{ background-color: #f0f0f0; transition: all 0.2s ease; }}\n",
+    "@media (max-width: 600px) {{ .col-{n} {{ width: 100%; }} }}\n",
+]
+_HTML_LINES = [
+    "<div class=\"card-{n}\" id=\"item{n}\"><h2>Item {n}</h2><p>Description for item {n}.</p></div>\n",
+    "<!-- section {n} -->\n",
+    "<ul><li><a href=\"#s{n}\">Link {n}</a></li><li>Entry {n}</li></ul>\n",
+    "<button onclick=\"handler{n}(event)\" class=\"btn\">Action {n}</button>\n",
+]
+_TEXT_KINDS = [(".js", _JS_LINES), (".css", _CSS_LINES), (".html", _HTML_LINES)]
+
+
+def _synthetic_text(lines: List[str], size: int, rng: random.Random) -> str:
+    parts = []
+    total = 0
+    while total < size:
+        line = rng.choice(lines).format(n=rng.randint(0, 9999))
+        parts.append(line)
+        total += len(line)
+    return "".join(parts)
+
+
+def generate_project(
+    root: str,
+    files: int = 100,
+    file_size: int = 16 * 1024,
+    binary_ratio: float = 0.2,
+    binary_size: int = 256 * 1024,
+    seed: int = 0,
+) -> Dict[str, int]:
+    """Write a synthetic project under ``root`` and return its file/byte counts.
+
+    ``binary_ratio`` of the files are incompressible binary assets of
+    ``binary_size`` bytes (images, fonts, media); the rest are JS, CSS and
+    HTML of about ``file_size`` bytes. The first file is always index.html.
+    """
+    rng = random.Random(seed)
+    os.makedirs(root, exist_ok=True)
+    stats = {"text_files": 0, "binary_files": 0, "text_bytes": 0, "binary_bytes": 0}
+    for i in range(files):
+        folder = os.path.join(root, f"module{i % 10}")
+        if i == 0:
+            path = os.path.join(root, "index.html")
+            data = _synthetic_text(_HTML_LINES, file_size, rng).encode("utf-8")
+            kind = "text"
+        elif rng.random() < binary_ratio:
+            ext = rng.choice([".png", ".jpg", ".woff2", ".mp4"])
+            path = os.path.join(folder, f"asset{i}{ext}")
+            data = rng.randbytes(binary_size)
+            kind = "binary"
+        else:
+            ext, lines = rng.choice(_TEXT_KINDS)
+            path = os.path.join(folder, f"file{i}{ext}")
+            data = _synthetic_text(lines, file_size, rng).encode("utf-8")
+            kind = "text"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        stats[f"{kind}_files"] += 1
+        stats[f"{kind}_bytes"] += len(data)
+    return stats
+
+
+def _measure(fn: Callable[[], object], measure_memory: bool) -> Tuple[float, Optional[int], object]:
+    """Time ``fn``; optionally run it again under tracemalloc for its peak allocation"""
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = None
+    if measure_memory:
+        tracemalloc.start()
+        try:
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def _stage(name: str, seconds: float, peak: Optional[int], nbytes: int) -> Dict:
+    return {
+        "stage": name,
+        "seconds": round(seconds, 6),
+        "bytes": nbytes,
+        "mb_per_s": round(nbytes / 1e6 / seconds, 3) if seconds > 0 else None,
+        "peak_memory_bytes": peak,
+    }
+
+
+def bench_pipeline(
+    project_root: str,
+    workers: int = 1,
+    profile: Optional[str] = None,
+    measure_memory: bool = True,
+    seed: int = 0,
+) -> List[Dict]:
+    """Time the walk, transform and zip stages separately, then the full build"""
+    profile_obj = get_profile(profile)
+    stages = []
+
+    def walk():
+        return list(_iter_project_files(project_root, set()))
+
+    t, peak, entries = _measure(walk, measure_memory)
+    total_bytes = sum(os.path.getsize(src) for _, src, _ in entries)
+    stages.append(_stage("walk", t, peak, total_bytes))
+
+    text_entries = [(rel, src, ext) for rel, src, ext in entries if ext in TRANSFORMS]
+    sources = []
+    for _, src, ext in text_entries:
+        with open(src, "rb") as f:
+            sources.append((ext, f.read(), seed, profile_obj, True))
+    text_bytes = sum(len(job[1]) for job in sources)
+
+    def transform():
+        return [out.text for out in _iter_transforms(sources, workers)]
+
+    t, peak, outputs = _measure(transform, measure_memory)
+    stages.append(_stage("transform", t, peak, text_bytes))
+
+    outputs_by_rel = {rel: out for (rel, _, _), out in zip(text_entries, outputs)}
+
+    policy = CompressionPolicy()
+
+    def zip_stage():
+        with tempfile.TemporaryDirectory(prefix="byhunide_bench_") as tmp:
+            with ZipStreamWriter(os.path.join(tmp, "out.zip")) as zw:
+                for rel, src, _ in entries:
+                    out = outputs_by_rel.get(rel)
+                    if out is not None:
+                        choice = policy.for_path(rel, text=True)
+                        zw.add_entry(rel, deflate_bytes(out.encode("utf-8"), choice.level))
+                    else:
+                        choice = policy.for_path(rel, text=False)
+                        zw.add_file(rel, src, choice.compress, choice.level)
+
+    zip_bytes = sum(len(o.encode("utf-8")) for o in outputs) + total_bytes - text_bytes
+    t, peak, _ = _measure(zip_stage, measure_memory)
+    stages.append(_stage("zip", t, peak, zip_bytes))
+
+    def full():
+        with tempfile.TemporaryDirectory(prefix="byhunide_bench_") as tmp:
+            out_path = os.path.join(tmp, "build.zip")
+            compile_project(project_root, out_path, workers=workers, seed=seed, profile=profile_obj)
+            return os.path.getsize(out_path)
+
+    t, peak, archive_size = _measure(full, measure_memory)
+    stage = _stage("compile_project", t, peak, total_bytes)
+    stage["archive_bytes"] = archive_size
+    stages.append(stage)
+    return stages
+
+
+def bench_obfuscators(sizes: List[int], profile: Optional[str] = None, seed: int = 0) -> List[Dict]:
+    """Throughput of each obfuscate_* function across source sizes"""
+    rng = random.Random(seed)
+    results = []
+    for ext, lines in _TEXT_KINDS:
+        fn = {".js": obfuscate_js, ".css": obfuscate_css, ".html": obfuscate_html}[ext]
+        for size in sizes:
+            text = _synthetic_text(lines, size, rng)
+            start = time.perf_counter()
+            out = fn(text, random.Random(seed), profile)
+            elapsed = time.perf_counter() - start
+            nbytes = len(text.encode("utf-8"))
+            results.append({
+                "function": fn.__name__,
+                "input_bytes": nbytes,
+                "output_bytes": len(out.encode("utf-8")),
+                "seconds": round(elapsed, 6),
+                "mb_per_s": round(nbytes / 1e6 / elapsed, 3) if elapsed > 0 else None,
+            })
+    return results
+
+
+def run(
+    files: int = 100,
+    file_size: int = 16 * 1024,
+    binary_ratio: float = 0.2,
+    binary_size: int = 256 * 1024,
+    workers: int = 1,
+    profile: Optional[str] = None,
+    measure_memory: bool = True,
+    obfuscator_sizes: Optional[List[int]] = None,
+    seed: int = 0,
+) -> Dict:
+    config = {
+        "files": files,
+        "file_size": file_size,
+        "binary_ratio": binary_ratio,
+        "binary_size": binary_size,
+        "workers": workers,
+        "profile": profile or DEFAULT_PROFILE,
+        "seed": seed,
+    }
+    with tempfile.TemporaryDirectory(prefix="byhunide_bench_project_") as root:
+        project = generate_project(root, files, file_size, binary_ratio, binary_size, seed)
+        stages = bench_pipeline(root, workers, profile, measure_memory, seed)
+    return {
+        "results_version": RESULTS_VERSION,
+        "compiler_version": COMPILER_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": config,
+        "project": project,
+        "stages": stages,
+        "obfuscators": bench_obfuscators(obfuscator_sizes or [16 * 1024, 256 * 1024], profile, seed),
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = 0.2) -> List[str]:
+    """Return a message for every stage that got slower than ``threshold`` (fractional)"""
+    regressions = []
+    if current.get("config") != baseline.get("config"):
+        regressions.append("warning: benchmark configs differ; timings may not be comparable")
+    base = {s["stage"]: s for s in baseline.get("stages", [])}
+    for stage in current.get("stages", []):
+        old = base.get(stage["stage"])
+        if not old or not old.get("seconds"):
+            continue
+        change = stage["seconds"] / old["seconds"] - 1
+        if change > threshold:
+            regressions.append(
+                f"{stage['stage']}: {old['seconds']:.3f}s -> {stage['seconds']:.3f}s (+{change:.0%})"
+            )
+    return regressions
+
+
+def _print_table(results: Dict) -> None:
+    print(f"{'stage':<18}{'seconds':>10}{'MB/s':>10}{'peak MB':>10}")
+    for s in results["stages"]:
+        peak = f"{s['peak_memory_bytes'] / 1e6:.1f}" if s["peak_memory_bytes"] is not None else "-"
+        mbps = f"{s['mb_per_s']:.2f}" if s["mb_per_s"] is not None else "-"
+        print(f"{s['stage']:<18}{s['seconds']:>10.3f}{mbps:>10}{peak:>10}")
+    print()
+    print(f"{'function':<18}{'in KB':>10}{'out KB':>10}{'MB/s':>10}")
+    for o in results["obfuscators"]:
+        mbps = f"{o['mb_per_s']:.2f}" if o["mb_per_s"] is not None else "-"
+        print(f"{o['function']:<18}{o['input_bytes'] // 1024:>10}{o['output_bytes'] // 1024:>10}{mbps:>10}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m byhunide.build.bench", description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--file-size", type=int, default=16 * 1024)
+    parser.add_argument("--binary-ratio", type=float, default=0.2)
+    parser.add_argument("--binary-size", type=int, default=256 * 1024)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--profile", default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--out", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown, e.g. 0.2 = 20%%")
+    args = parser.parse_args(argv)
+
+    results = run(
+        files=args.files,
+        file_size=args.file_size,
+        binary_ratio=args.binary_ratio,
+        binary_size=args.binary_size,
+        workers=args.workers,
+        profile=args.profile,
+        measure_memory=not args.no_memory,
+        seed=args.seed,
+    )
+    _print_table(results)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}" if not line.startswith("warning") else line, file=sys.stderr)
+        if any(not line.startswith("warning") for line in regressions):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
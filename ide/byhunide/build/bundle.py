@@ -0,0 +1,183 @@
+"""Inline a page's local scripts and stylesheets into the page itself.
+
+``<script src>`` and ``<link rel="stylesheet">`` elements that point at
+files inside the project are replaced by inline ``<script>`` and
+``<style>`` elements carrying the file's content, so after obfuscation the
+page is a single payload with a single decoder. Relative ``url()``
+references in inlined CSS are rewritten to stay valid from the page.
+
+Scripts whose behaviour depends on being external are left alone:
+``async``, ``defer``, ``nomodule``, ``type="module"`` (its imports resolve
+against the script URL) and non-JavaScript types. So are remote URLs,
+references inside comments and files missing from the project.
+"""
+
+import os
+import posixpath
+import re
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import unquote
+
+
+_HTML_REF = re.compile(
+    r"""<!--[\s\S]*?(?:-->|\Z)
+      | <(?P<style>style)\b[^>]*>[\s\S]*?(?:</style\s*>|\Z)
+      | <(?P<script>script)\b(?P<script_attrs>(?:[^>"']|"[^"]*"|'[^']*')*)>(?P<body>[\s\S]*?)(?:</script\s*>|\Z)
+      | <(?P<link>link)\b(?P<link_attrs>(?:[^>"']|"[^"]*"|'[^']*')*)>
+    """,
+    re.VERBOSE | re.IGNORECASE,
+)
+_ATTR = re.compile(r"""([^\s"'>/=]+)(?:\s*=\s*("[^"]*"|'[^']*'|[^\s"'>]+))?""")
+_CSS_URL = re.compile(r"""(url\(\s*)(["']?)([^"')]+)\2(\s*\))|(@import\s+)(["'])([^"']+)\6""", re.IGNORECASE)
+_REMOTE = re.compile(r"^(?:[a-zA-Z][a-zA-Z0-9+.-]*:|//)")
+_SCRIPT_CLOSE = re.compile(r"</(script)", re.IGNORECASE)
+_STYLE_CLOSE = re.compile(r"</(style)", re.IGNORECASE)
+# "<!--", with any backslashes before it.
+_SCRIPT_COMMENT_OPEN = re.compile(r"(\\*)<!--")
+
+_JS_TYPES = {"", "text/javascript", "application/javascript", "text/ecmascript", "application/ecmascript"}
+_SKIP_SCRIPT_ATTRS = {"async", "defer", "nomodule"}
+# Attributes that only make sense for an external resource.
+_DROPPED_ATTRS = {"src", "href", "rel", "integrity", "crossorigin", "charset", "referrerpolicy", "as", "type"}
+
+
+class BundleResult(NamedTuple):
+    text: str
+    inlined: List[str]  # project-relative paths, in page order
+
+
+def _parse_attrs(attrs: str) -> List[Tuple[str, Optional[str]]]:
+    out: List[Tuple[str, Optional[str]]] = []
+    for name, raw in _ATTR.findall(attrs.rstrip("/")):
+        if not raw:
+            value = None
+        elif raw[0] in "\"'":
+            value = raw[1:-1]
+        else:
+            value = raw
+        out.append((name.lower(), value))
+    return out
+
+
+def _resolve(ref: Optional[str], page_rel: str, project_root: str) -> Optional[str]:
+    """Project-relative path of a local reference made from ``page_rel``, or None"""
+    if not ref:
+        return None
+    ref = ref.strip().split("#", 1)[0].split("?", 1)[0]
+    if not ref or _REMOTE.match(ref):
+        return None
+    ref = unquote(ref)
+    if ref.startswith("/"):
+        rel = posixpath.normpath(ref.lstrip("/"))
+    else:
+        base = posixpath.dirname(page_rel.replace(os.sep, "/"))
+        rel = posixpath.normpath(posixpath.join(base, ref))
+    if rel.startswith("../") or rel == "..":
+        return None
+    path = os.path.join(project_root, *rel.split("/"))
+    return rel.replace("/", os.sep) if os.path.isfile(path) else None
+
+
+def _rebuild_tag(name: str, attrs: List[Tuple[str, Optional[str]]]) -> str:
+    parts = [name]
+    for attr, value in attrs:
+        if attr in _DROPPED_ATTRS:
+            continue
+        if value is None:
+            parts.append(attr)
+        else:
+            quote = "'" if '"' in value else '"'
+            parts.append(f"{attr}={quote}{value}{quote}")
+    return "<" + " ".join(parts) + ">"
+
+
+def _rewrite_css_urls(css: str, css_rel: str, page_rel: str) -> str:
+    css_dir = posixpath.dirname(css_rel.replace(os.sep, "/"))
+    page_dir = posixpath.dirname(page_rel.replace(os.sep, "/"))
+    if css_dir == page_dir:
+        return css
+
+    def rebase(url: str) -> str:
+        if _REMOTE.match(url) or url.startswith(("/", "#", "data:")):
+            return url
+        target = posixpath.normpath(posixpath.join(css_dir, url))
+        return posixpath.relpath(target, page_dir or ".")
+
+    def repl(m) -> str:
+        if m.group(1) is not None:
+            return f"{m.group(1)}{m.group(2)}{rebase(m.group(3).strip())}{m.group(2)}{m.group(4)}"
+        return f"{m.group(5)}{m.group(6)}{rebase(m.group(7))}{m.group(6)}"
+
+    return _CSS_URL.sub(repl, css)
+
+
+def _read_text(path: str) -> str:
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def _script_ref(attrs: List[Tuple[str, Optional[str]]]) -> Optional[str]:
+    values: Dict[str, Optional[str]] = dict(attrs)
+    if _SKIP_SCRIPT_ATTRS & values.keys():
+        return None
+    if (values.get("type") or "").strip().lower() not in _JS_TYPES:
+        return None
+    return values.get("src")
+
+
+def _stylesheet_ref(attrs: List[Tuple[str, Optional[str]]]) -> Optional[str]:
+    values: Dict[str, Optional[str]] = dict(attrs)
+    rel = (values.get("rel") or "").lower().split()
+    if "stylesheet" not in rel or "alternate" in rel:
+        return None
+    return values.get("href")
+
+
+def _escape_comment_open(m) -> str:
+    # "\x3C" means "<" in strings, templates and regexes alike, including
+    # u-flag regexes, where "\<" is a syntax error. An escaped "\<" loses
+    # its now redundant backslash.
+    backslashes = m.group(1)
+    return backslashes[:len(backslashes) - len(backslashes) % 2] + "\\x3C!--"
+
+
+def bundle_html(
+    html: str,
+    page_rel: str,
+    project_root: str,
+    read: Callable[[str], str] = _read_text,
+) -> BundleResult:
+    """Inline the local scripts and stylesheets ``html`` (at ``page_rel``) references"""
+    inlined: List[str] = []
+
+    def repl(m) -> str:
+        if m.group("script"):
+            if m.group("body").strip():
+                return m.group(0)
+            attrs = _parse_attrs(m.group("script_attrs"))
+            rel = _resolve(_script_ref(attrs), page_rel, project_root)
+            if rel is None:
+                return m.group(0)
+            code = read(os.path.join(project_root, rel))
+            # "</script" would end the element early and "<!--" can switch
+            # the parser into a state where it does.
+            code = _SCRIPT_COMMENT_OPEN.sub(_escape_comment_open, _SCRIPT_CLOSE.sub(r"<\\/\1", code))
+            inlined.append(rel)
+            return f"{_rebuild_tag('script', attrs)}{code}</script>"
+        if m.group("link"):
+            attrs = _parse_attrs(m.group("link_attrs"))
+            rel = _resolve(_stylesheet_ref(attrs), page_rel, project_root)
+            if rel is None:
+                return m.group(0)
+            css = _rewrite_css_urls(read(os.path.join(project_root, rel)), rel, page_rel)
+            css = _STYLE_CLOSE.sub(r"<\\/\1", css)
+            inlined.append(rel)
+            return f"{_rebuild_tag('style', attrs)}{css}</style>"
+        return m.group(0)
+
+    return BundleResult(_HTML_REF.sub(repl, html), inlined)
+
+
+def bundle_dependencies(html: str, page_rel: str, project_root: str) -> List[str]:
+    """Project-relative paths ``bundle_html`` would inline, without reading them"""
+    return bundle_html(html, page_rel, project_root, read=lambda _: "").inlined
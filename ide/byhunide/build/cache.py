@@ -0,0 +1,223 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+_INDEX_NAME = "index.json"
+_LOCK_NAME = "index.lock"
+_OBJECTS_DIR = "objects"
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def default_cache_dir() -> str:
+    return os.path.join(os.path.expanduser("~"), ".byhunide", "build-cache")
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".tmp_", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+@contextmanager
+def _file_lock(path: str) -> Iterator[None]:
+    """Hold an exclusive lock on ``path`` (created if missing) across processes"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            # Retries for about 10 seconds, then raises OSError.
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class BuildCache:
+    """Persistent cache of transformed build outputs.
+
+    Entries are keyed by the hash of the source content plus the compiler
+    settings that produced them, stored one file per entry and evicted in
+    least-recently-used order once the total size exceeds ``max_bytes``.
+    Several processes may share one cache directory: ``save`` merges the
+    index with what they saved meanwhile, and evicts only then, under the
+    same lock, so no process deletes an object another one's index still
+    lists.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, Dict[str, float]] = {}
+        # Keys this process dropped since the last save, with when.
+        self._removed: Dict[str, float] = {}
+        self._total = 0
+        self._dirty = False
+        self._load_index()
+
+    @staticmethod
+    def make_key(data: bytes, settings: str) -> str:
+        h = hashlib.sha256()
+        h.update(settings.encode("utf-8"))
+        h.update(b"\0")
+        h.update(data)
+        return h.hexdigest()
+
+    def _object_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, _OBJECTS_DIR, key[:2], key)
+
+    def _read_index(self) -> Dict[str, Dict[str, float]]:
+        path = os.path.join(self.cache_dir, _INDEX_NAME)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(raw, dict) or not isinstance(raw.get("entries"), dict):
+            return {}
+        entries = {}
+        for key, entry in raw["entries"].items():
+            try:
+                entries[key] = {"size": int(entry["size"]), "used": float(entry["used"])}
+            except (KeyError, TypeError, ValueError):
+                continue
+        return entries
+
+    def _load_index(self) -> None:
+        self._entries = self._read_index()
+        self._total = sum(int(entry["size"]) for entry in self._entries.values())
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            try:
+                with open(self._object_path(key), "rb") as f:
+                    data = f.read()
+            except OSError:
+                self._forget(key)
+            else:
+                entry["used"] = time.time()
+                self._dirty = True
+                self.hits += 1
+                return data.decode("utf-8")
+        self.misses += 1
+        return None
+
+    def put(self, key: str, text: str) -> None:
+        data = text.encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+        try:
+            _atomic_write(self._object_path(key), data)
+        except OSError:
+            return
+        if key in self._entries:
+            self._total -= int(self._entries[key]["size"])
+        self._entries[key] = {"size": len(data), "used": time.time()}
+        self._total += len(data)
+        self._dirty = True
+
+    def _forget(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total -= int(entry["size"])
+            self._removed[key] = time.time()
+            self._dirty = True
+
+    def _evict(self) -> None:
+        # Only with the index lock held (see save).
+        if self._total <= self.max_bytes:
+            return
+        for key in sorted(self._entries, key=lambda k: self._entries[k]["used"]):
+            if self._total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._object_path(key))
+            except OSError:
+                pass
+            self._forget(key)
+
+    def clear(self) -> None:
+        """Remove every entry, including ones other processes saved"""
+        try:
+            with _file_lock(os.path.join(self.cache_dir, _LOCK_NAME)):
+                self._entries.update(self._read_index())
+                for key in list(self._entries):
+                    try:
+                        os.remove(self._object_path(key))
+                    except OSError:
+                        pass
+                self._entries = {}
+                self._total = 0
+                self._write_index()
+        except OSError:
+            return
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self) -> int:
+        return self._total
+
+    def _write_index(self) -> None:
+        payload = json.dumps({"entries": self._entries}, separators=(",", ":"))
+        _atomic_write(os.path.join(self.cache_dir, _INDEX_NAME), payload.encode("utf-8"))
+        self._removed = {}
+        self._dirty = False
+
+    def save(self) -> None:
+        """Merge this process's changes into the on-disk index, then evict and write it.
+
+        The index is re-read under a lock, so entries other processes
+        saved meanwhile are kept (and count towards ``max_bytes``).
+        """
+        if not self._dirty:
+            return
+        try:
+            with _file_lock(os.path.join(self.cache_dir, _LOCK_NAME)):
+                merged = self._read_index()
+                for key, removed in self._removed.items():
+                    # Unless another process stored it again afterwards.
+                    if key in merged and merged[key]["used"] <= removed:
+                        del merged[key]
+                for key, entry in self._entries.items():
+                    if key not in merged or merged[key]["used"] < entry["used"]:
+                        merged[key] = entry
+                self._entries = merged
+                self._total = sum(int(entry["size"]) for entry in merged.values())
+                self._evict()
+                self._write_index()
+        except OSError:
+            return
@@ -0,0 +1,154 @@
+"""Bulk string/bytes codecs used by the obfuscators.
+
+The codecs produce exactly the same output as the per-character loops they
+replaced, but work through ``translate`` tables and C-level bulk operations.
+``random_var_name`` is the exception: its alphabet deliberately drops the
+Hiragana-block code points that are not valid in JS identifiers, so its
+names differ from the original generator's. Run
+``python -m byhunide.build.codec`` for micro-benchmarks.
+"""
+
+import base64
+import random
+import string
+import sys
+import timeit
+from functools import lru_cache
+from typing import Callable, Dict, List, Tuple
+
+
+_LOWER = string.ascii_lowercase
+_UPPER = string.ascii_uppercase
+_ROT13_FROM = _LOWER + _UPPER
+_ROT13_TO = _LOWER[13:] + _LOWER[:13] + _UPPER[13:] + _UPPER[:13]
+
+_ROT13_STR = str.maketrans(_ROT13_FROM, _ROT13_TO)
+_ROT13_BYTES = bytes.maketrans(_ROT13_FROM.encode("ascii"), _ROT13_TO.encode("ascii"))
+
+# Alphabet for generated identifiers: "_", "$" and the Hiragana letters
+# U+3041-U+3096. The original generator used U+3040-U+309E, which includes
+# unassigned code points (U+3040, U+3097, U+3098) and combining and spacing
+# sound marks (U+3099-U+309C) that break JS parsing; the iteration marks
+# U+309D-U+309E went with them.
+VAR_NAME_CHARS = "_$" + "".join(chr(i) for i in range(0x3041, 0x3097))
+
+
+def rot13(text: str) -> str:
+    return text.translate(_ROT13_STR)
+
+
+def rot13_bytes(data: bytes) -> bytes:
+    return data.translate(_ROT13_BYTES)
+
+
+@lru_cache(maxsize=256)
+def _xor_table(key: int) -> bytes:
+    return bytes(b ^ key for b in range(256))
+
+
+def xor_bytes(data: bytes, key: int) -> bytes:
+    """XOR every byte with a single-byte key"""
+    return data.translate(_xor_table(key & 0xFF))
+
+
+def xor_encode(text: str, key: int) -> str:
+    """XOR every character code with ``key`` (0-255)"""
+    try:
+        raw = text.encode("latin-1")
+    except UnicodeEncodeError:
+        return "".join(chr(ord(c) ^ key) for c in text)
+    return xor_bytes(raw, key).decode("latin-1")
+
+
+def hex_bytes(data: bytes) -> str:
+    """Render bytes as a JS ``\\xNN`` escape sequence"""
+    if not data:
+        return ""
+    return "\\x" + data.hex(":").replace(":", "\\x")
+
+
+def hex_encode(text: str) -> str:
+    try:
+        raw = text.encode("latin-1")
+    except UnicodeEncodeError:
+        return "".join(f"\\x{ord(c):02x}" for c in text)
+    return hex_bytes(raw)
+
+
+def b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def random_var_name(rng: random.Random, length: int = 8) -> str:
+    choice = rng.choice
+    chars = VAR_NAME_CHARS
+    return "".join([choice(chars) for _ in range(length)])
+
+
+# --- Micro-benchmarks -------------------------------------------------------
+#
+# The reference implementations below are the original per-character loops,
+# kept only so the benchmark can check equality and report the speedup.
+# ``random_var_name`` changed its alphabet on purpose, so it is only timed.
+
+
+def _ref_rot13(text: str) -> str:
+    result = []
+    for char in text:
+        if "a" <= char <= "z":
+            result.append(chr((ord(char) - ord("a") + 13) % 26 + ord("a")))
+        elif "A" <= char <= "Z":
+            result.append(chr((ord(char) - ord("A") + 13) % 26 + ord("A")))
+        else:
+            result.append(char)
+    return "".join(result)
+
+
+def _ref_xor_encode(data: str, key: int) -> str:
+    return "".join(chr(ord(c) ^ key) for c in data)
+
+
+def _ref_hex_encode(data: str) -> str:
+    return "".join(f"\\x{ord(c):02x}" for c in data)
+
+
+def _ref_random_var_name(rng: random.Random, length: int = 8) -> str:
+    chars = "_$" + "".join(chr(i) for i in range(0x3040, 0x309F))
+    return "".join(rng.choice(chars) for _ in range(length))
+
+
+def benchmark(size: int = 1024 * 1024, repeat: int = 3) -> List[Dict[str, float]]:
+    """Time each codec against its reference loop on ``size`` characters of base64 text"""
+    sample = b64(random.Random(0).randbytes(size * 3 // 4))[:size]
+    # (name, reference, codec, whether their outputs must be equal)
+    cases: List[Tuple[str, Callable[[], object], Callable[[], object], bool]] = [
+        ("rot13", lambda: _ref_rot13(sample), lambda: rot13(sample), True),
+        ("xor_encode", lambda: _ref_xor_encode(sample, 0x5A), lambda: xor_encode(sample, 0x5A), True),
+        ("hex_encode", lambda: _ref_hex_encode(sample), lambda: hex_encode(sample), True),
+        (
+            "random_var_name x10000",
+            lambda: [_ref_random_var_name(random.Random(1)) for _ in range(10000)],
+            lambda: [random_var_name(random.Random(1)) for _ in range(10000)],
+            False,
+        ),
+    ]
+    results = []
+    for name, ref, new, same_output in cases:
+        if same_output and ref() != new():
+            raise AssertionError(f"{name}: output differs from reference implementation")
+        ref_t = min(timeit.repeat(ref, number=1, repeat=repeat))
+        new_t = min(timeit.repeat(new, number=1, repeat=repeat))
+        results.append({"name": name, "reference_s": ref_t, "codec_s": new_t, "speedup": ref_t / new_t})
+    return results
+
+
+def main() -> int:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1024 * 1024
+    print(f"{'codec':<24}{'reference':>12}{'codec':>12}{'speedup':>10}")
+    for r in benchmark(size):
+        print(f"{r['name']:<24}{r['reference_s']:>11.4f}s{r['codec_s']:>11.4f}s{r['speedup']:>9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
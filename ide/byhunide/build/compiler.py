@@ -1,10 +1,60 @@
 import base64
+import hashlib
+import json
+import multiprocessing
 import os
 import random
-import re
-import tempfile
-import zipfile
-from typing import List, Set
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+
+from byhunide.build import codec
+from byhunide.build.archive import (
+    CompressedEntry,
+    ZipRecord,
+    ZipStreamWriter,
+    deflate_bytes,
+    file_date_time,
+    store_bytes,
+)
+from byhunide.build.bundle import bundle_html
+from byhunide.build.cache import BuildCache
+from byhunide.build.compression import (
+    ESTIMATE_SAMPLE_BYTES,
+    SNIFF_BYTES,
+    Compression,
+    CompressionPolicy,
+    DeflateEstimate,
+    estimate_deflate,
+)
+from byhunide.build.config import build_config_path, load_build_config
+from byhunide.build.dedup import ALIAS_MANIFEST, alias_manifest, find_duplicates
+from byhunide.build.minify import minify_css, minify_text
+from byhunide.build.package import PACKAGE_EXTENSION, PackageRecord, PackageWriter, critical_first, critical_patterns
+from byhunide.build.profiles import DecodeCost, NullDecodeCost, ObfuscationProfile, ProfileLike, get_profile
+from byhunide.build.report import (
+    CACHE_BYPASSED,
+    CACHE_DISABLED,
+    CACHE_HIT,
+    CACHE_MISS,
+    CACHE_NOT_APPLICABLE,
+    BuildResult,
+    FileReport,
+    report_path,
+)
+from byhunide.build.textstream import (
+    CHUNK_SIZE,
+    Base64,
+    ByteStream,
+    Concat,
+    Literal,
+    Rot13,
+    TextSource,
+    Xor,
+    iter_sized_pieces,
+)
 
 
 # Anti-debugging and integrity check code with multiple techniques
@@ -25,54 +75,49 @@ _ANTI_DEBUG_CODE = """
 """
 
 
+# Fallback for helpers called without an explicit generator; builds pass their own.
+_DEFAULT_RNG = random.Random()
+
+
 def _hex_encode(data: str) -> str:
     """Encode string to hex"""
-    return ''.join(f'\\x{ord(c):02x}' for c in data)
+    return codec.hex_encode(data)
 
 
 def _rot13(text: str) -> str:
     """ROT13 encoding"""
-    result = []
-    for char in text:
-        if 'a' <= char <= 'z':
-            result.append(chr((ord(char) - ord('a') + 13) % 26 + ord('a')))
-        elif 'A' <= char <= 'Z':
-            result.append(chr((ord(char) - ord('A') + 13) % 26 + ord('A')))
-        else:
-            result.append(char)
-    return ''.join(result)
+    return codec.rot13(text)
 
 
 def _xor_encode(data: str, key: int) -> str:
     """XOR encoding with key"""
-    return ''.join(chr(ord(c) ^ key) for c in data)
+    return codec.xor_encode(data, key)
 
 
-def _split_into_chunks(text: str, min_chunk: int = 50, max_chunk: int = 200) -> List[str]:
+def _split_into_chunks(text: str, min_chunk: int = 50, max_chunk: int = 200, rng: random.Random = _DEFAULT_RNG) -> List[str]:
     """Split text into random chunks"""
     chunks = []
     i = 0
     while i < len(text):
-        chunk_size = random.randint(min_chunk, max_chunk)
+        chunk_size = rng.randint(min_chunk, max_chunk)
         chunks.append(text[i:i + chunk_size])
         i += chunk_size
     return chunks
 
 
-def _generate_random_var_name(length: int = 8) -> str:
+def _generate_random_var_name(length: int = 8, rng: random.Random = _DEFAULT_RNG) -> str:
     """Generate random variable name with unicode characters"""
-    chars = '_$' + ''.join(chr(i) for i in range(0x3040, 0x309F))  # Hiragana
-    return ''.join(random.choice(chars) for _ in range(length))
+    return codec.random_var_name(rng, length)
 
 
-def _generate_dead_code(amount: int = 3) -> str:
+def _generate_dead_code(amount: int = 3, rng: random.Random = _DEFAULT_RNG) -> str:
     """Generate dead code to confuse deobfuscators"""
     dead_code = []
-    var_names = [_generate_random_var_name() for _ in range(amount * 2)]
+    var_names = [_generate_random_var_name(rng=rng) for _ in range(amount * 2)]
     
     for i in range(amount):
         var_name = var_names[i]
-        var_name2 = var_names[i + amount] if i + amount < len(var_names) else _generate_random_var_name()
+        var_name2 = var_names[i + amount] if i + amount < len(var_names) else _generate_random_var_name(rng=rng)
         operations = [
             f"var {var_name}=function(){{return Math.random()*1000;}};var {var_name2}={var_name}();",
             f"var {var_name}=[1,2,3,4,5].map(function(x){{return x*Math.PI;}});{var_name2}={var_name}.reduce(function(a,b){{return a+b;}},0);",
@@ -83,38 +128,38 @@ def _generate_dead_code(amount: int = 3) -> str:
             f"var {var_name}=Array(10).fill(0).map(function(_,i){{return i*i;}});var {var_name2}={var_name}.filter(function(x){{return x>5;}}).length;",
             f"var {var_name}=Object.keys({{a:1,b:2,c:3}});var {var_name2}={var_name}.forEach(function(k){{return k.length;}});"
         ]
-        dead_code.append(random.choice(operations))
+        dead_code.append(rng.choice(operations))
     
     # Add some conditional dead code
-    if_var = _generate_random_var_name()
-    dead_code.append(f"var {if_var}=Math.random()>0.5;if({if_var}){{var {_generate_random_var_name()}=function(){{return 'never';}};}}else{{var {_generate_random_var_name()}=function(){{return 'executed';}};}}")
+    if_var = _generate_random_var_name(rng=rng)
+    dead_code.append(f"var {if_var}=Math.random()>0.5;if({if_var}){{var {_generate_random_var_name(rng=rng)}=function(){{return 'never';}};}}else{{var {_generate_random_var_name(rng=rng)}=function(){{return 'executed';}};}}")
     
     return '\n    '.join(dead_code)
 
 
-def _obfuscate_string_literal(s: str) -> str:
+def _obfuscate_string_literal(s: str, rng: random.Random = _DEFAULT_RNG) -> str:
     """Heavily obfuscate a string literal"""
     methods = [
         lambda x: f"atob('{base64.b64encode(x.encode()).decode()}')",
         lambda x: f"String.fromCharCode({','.join(str(ord(c)) for c in x)})",
         lambda x: f"[{','.join(repr(c) for c in x)}].join('')",
-        lambda x: _split_string_encode(x),
+        lambda x: _split_string_encode(x, rng),
         lambda x: f"btoa(String.fromCharCode({','.join(str(ord(c)) for c in base64.b64decode(x.encode()).decode())}))" if len(x) > 0 else "''",
     ]
-    method = random.choice(methods)
+    method = rng.choice(methods)
     return method(s)
 
 
-def _split_string_encode(s: str) -> str:
+def _split_string_encode(s: str, rng: random.Random = _DEFAULT_RNG) -> str:
     """Split string into parts and encode each"""
     if len(s) == 0:
         return "''"
     if len(s) <= 3:
         return repr(s)
-    parts = _split_into_chunks(s, 2, 5)
+    parts = _split_into_chunks(s, 2, 5, rng)
     encoded_parts = []
     for part in parts:
-        enc = random.choice([
+        enc = rng.choice([
             lambda x: f"atob('{base64.b64encode(x.encode()).decode()}')",
             lambda x: f"String.fromCharCode({','.join(str(ord(c)) for c in x)})",
         ])
@@ -122,318 +167,868 @@ def _split_string_encode(s: str) -> str:
     return '+'.join(encoded_parts)
 
 
-def obfuscate_js(js_text: str) -> str:
-    """Advanced multi-layer JavaScript obfuscation"""
-    # Layer 1: Calculate checksum for integrity
-    checksum = sum(ord(c) for c in js_text) % 10000
-    
-    # Layer 2: Add dead code at the beginning
-    dead_code = _generate_dead_code(random.randint(5, 10))
-    
-    # Layer 3: Multiple encoding layers
-    # First encode with base64
-    layer1 = base64.b64encode(js_text.encode("utf-8")).decode("ascii")
-    
-    # Second layer: ROT13
-    layer2 = _rot13(layer1)
-    
-    # Third layer: XOR with random key
-    xor_key = random.randint(1, 255)
-    layer3_bytes = _xor_encode(layer2, xor_key).encode('latin-1', errors='ignore')
-    layer3 = base64.b64encode(layer3_bytes).decode("ascii")
-    
-    # Layer 4: Additional base64 encoding (double encoding)
-    layer4 = base64.b64encode(layer3.encode("utf-8")).decode("ascii")
-    
-    # Generate random variable names
-    var_atob = _generate_random_var_name()
-    var_rot13 = _generate_random_var_name()
-    var_xor = _generate_random_var_name()
-    var_result = _generate_random_var_name()
-    var_key = _generate_random_var_name()
-    var_decode = _generate_random_var_name()
-    var_exec = _generate_random_var_name()
-    var_temp = _generate_random_var_name()
-    var_bytes = _generate_random_var_name()
-    
-    # Create obfuscated decoder function with multiple layers
-    decoder_code = f"""
-(function(){{
-    {dead_code}
-    var {var_key}={xor_key};
-    var {var_atob}=function(_){{var _1=window.atob||function(_2){{var _3='ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=';var _4='',_5='',_6='',_7='',_8='',_9='',_a='',_b='';_2=String(_2).replace(/[^A-Za-z0-9\\+\\/\\=]/g,'');for(var _c=0;_c<_2.length;){{_7=_3.indexOf(_2.charAt(_c++));_8=_3.indexOf(_2.charAt(_c++));_9=_3.indexOf(_2.charAt(_c++));_a=_3.indexOf(_2.charAt(_c++));_b=(_7<<2)|(_8>>4);_6=(_8&15)<<4|(_9>>2);_c=((_9&3)<<6)|_a;_4+=String.fromCharCode(_b);if(_9!=64){{_4+=String.fromCharCode(_6);}}if(_a!=64){{_4+=String.fromCharCode(_c);}}_b=_6=_c='';_7=_8=_9=_a='';}}return _4.replace(/\\0+$/,'');}};return _1(_);}};
-    var {var_rot13}=function(_){{var _1='';for(var _2=0;_2<_.length;_2++){{var _3=_[_2];if('a'<=_3&&_3<='z'){{_1+=String.fromCharCode((_3.charCodeAt(0)-97+13)%%26+97);}}else if('A'<=_3&&_3<='Z'){{_1+=String.fromCharCode((_3.charCodeAt(0)-65+13)%%26+65);}}else{{_1+=_3;}}}}return _1;}};
-    var {var_xor}=function(_,_k){{var _1='';for(var _2=0;_2<_.length;_2++){{_1+=String.fromCharCode(_.charCodeAt(_2)^_k);}}return _1;}};
-    var {var_result}='{layer4}';
-    {var_result}={var_atob}({var_result});
-    {var_result}={var_atob}({var_result});
-    {var_result}={var_rot13}({var_result});
-    var {var_bytes}=new Uint8Array({var_result}.split('').map(function(_){{return _.charCodeAt(0);}}));
-    {var_temp}=String.fromCharCode.apply(null,Array.from({var_bytes}));
-    {var_result}={var_xor}({var_temp},{var_key});
-    {var_result}={var_atob}({var_result});
-    var {var_exec}=function(_){{try{{(function(){{(0,eval)(_);}})();}}catch(_e){{setTimeout(function(){{{var_exec}(_);}},10);}}}};
-    {var_exec}({var_result});
-}})();
-"""
-    
-    # Add anti-debugging wrapper
-    anti_debug = _ANTI_DEBUG_CODE.replace('%CHECKSUM%', str(checksum))
-    
-    # Combine anti-debug and decoder
-    combined_code = anti_debug + decoder_code
-    
-    # Additional obfuscation layer: Split and encode with ROT13
-    combined_rot13 = _rot13(combined_code)
-    combined_encoded = base64.b64encode(combined_rot13.encode("utf-8")).decode("ascii")
-    
-    # Final layer: Create wrapper with advanced obfuscation techniques
-    wrapper_var = _generate_random_var_name()
-    eval_var = _generate_random_var_name()
-    rot13_decode_var = _generate_random_var_name()
-    atob_var = _generate_random_var_name()
-    temp_var = _generate_random_var_name()
-    
-    # Create obfuscated decoder with ROT13 reverse
-    final_wrapper = f"""
+def _js_atob_fn(name: str) -> str:
+    return f"var {name}=function(_){{var _1=window.atob||function(_2){{var _3='ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=';var _4='',_5='',_6='',_7='',_8='',_9='',_a='',_b='';_2=String(_2).replace(/[^A-Za-z0-9\\+\\/\\=]/g,'');for(var _c=0;_c<_2.length;){{_7=_3.indexOf(_2.charAt(_c++));_8=_3.indexOf(_2.charAt(_c++));_9=_3.indexOf(_2.charAt(_c++));_a=_3.indexOf(_2.charAt(_c++));_b=(_7<<2)|(_8>>4);_6=(_8&15)<<4|(_9>>2);_5=((_9&3)<<6)|_a;_4+=String.fromCharCode(_b);if(_9!=64){{_4+=String.fromCharCode(_6);}}if(_a!=64){{_4+=String.fromCharCode(_5);}}}}return _4;}};return _1(_);}};"
+
+
+def _js_rot13_fn(name: str) -> str:
+    return f"var {name}=function(_){{var _1='';for(var _2=0;_2<_.length;_2++){{var _3=_[_2];if('a'<=_3&&_3<='z'){{_1+=String.fromCharCode((_3.charCodeAt(0)-97+13)%26+97);}}else if('A'<=_3&&_3<='Z'){{_1+=String.fromCharCode((_3.charCodeAt(0)-65+13)%26+65);}}else{{_1+=_3;}}}}return _1;}};"
+
+
+def _js_xor_fn(name: str) -> str:
+    return f"var {name}=function(_,_k){{var _1='';for(var _2=0;_2<_.length;_2++){{_1+=String.fromCharCode(_.charCodeAt(_2)^_k);}}return _1;}};"
+
+
+def _js_utf8_fn(name: str) -> str:
+    # atob() yields one char per byte; turn the UTF-8 bytes back into text.
+    return f"var {name}=function(_){{try{{return decodeURIComponent(escape(_));}}catch(_e){{return _;}}}};"
+
+
+def _encode_payload(source: ByteStream, layers: int, rng: random.Random) -> Tuple[ByteStream, List[Tuple[str, Optional[int]]], int]:
+    """Encode ``source`` with up to four layers.
+
+    Returns the payload stream, the decode steps in the order the runtime
+    applies them (each with the length of its input) and the XOR key (0 if
+    unused).
+    """
+    payload: ByteStream = Base64(source)
+    steps: List[Tuple[str, Optional[int]]] = [("atob", payload.length), ("utf8", source.length)]
+    xor_key = 0
+    if layers >= 2:
+        payload = Rot13(payload)
+        steps.insert(0, ("rot13", payload.length))
+    if layers >= 3:
+        xor_key = rng.randint(1, 255)
+        xored = Xor(payload, xor_key)
+        payload = Base64(xored)
+        steps[:0] = [("atob", payload.length), ("xor", xored.length)]
+    if layers >= 4:
+        payload = Base64(payload)
+        steps.insert(0, ("atob", payload.length))
+    return payload, steps, xor_key
+
+
+def _emit_decode_steps(
+    var: str,
+    steps: List[Tuple[str, int]],
+    fns: Dict[str, str],
+    cost: DecodeCost,
+) -> str:
+    out = []
+    for step, n in steps:
+        if step == "xor":
+            out.append(f"{var}={fns['xor']}({var},{fns['key']});")
+            cost.loop(n)
+        else:
+            out.append(f"{var}={fns[step]}({var});")
+            if step == "rot13":
+                cost.loop(n)
+            else:
+                cost.atob(n)
+    return "\n    ".join(out)
+
+
+def _decoder_fns(steps: List[Tuple[str, int]], xor_key: int, rng: random.Random) -> Tuple[Dict[str, str], str]:
+    """Pick names for the decoder helpers ``steps`` needs and emit their definitions"""
+    fns: Dict[str, str] = {}
+    defs = []
+    makers = {"atob": _js_atob_fn, "utf8": _js_utf8_fn, "rot13": _js_rot13_fn, "xor": _js_xor_fn}
+    for step, _ in steps:
+        if step in fns:
+            continue
+        fns[step] = _generate_random_var_name(rng=rng)
+        defs.append(makers[step](fns[step]))
+    if xor_key:
+        fns["key"] = _generate_random_var_name(rng=rng)
+        defs.insert(0, f"var {fns['key']}={xor_key};")
+    return fns, "\n    ".join(defs)
+
+
+def _wrap_eval(code: ByteStream, rng: random.Random, cost: DecodeCost, rot: bool) -> ByteStream:
+    """Hide ``code`` inside a base64 (optionally ROT13) literal that evals itself"""
+    encoded = Rot13(code) if rot else code
+    payload, steps, _ = _encode_payload(encoded, 1, rng)
+    if rot:
+        steps.append(("rot13", encoded.length))
+    fns, defs = _decoder_fns(steps, 0, rng)
+    var = _generate_random_var_name(rng=rng)
+    cost.evals += 1
+    return Concat([
+        Literal(f"""
 (function(){{
-    var {wrapper_var}='{combined_encoded}';
-    var {atob_var}=function(_){{var _1=window.atob||function(_2){{var _3='ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=';var _4='',_5='',_6='',_7='',_8='',_9='',_a='',_b='';_2=String(_2).replace(/[^A-Za-z0-9\\+\\/\\=]/g,'');for(var _c=0;_c<_2.length;){{_7=_3.indexOf(_2.charAt(_c++));_8=_3.indexOf(_2.charAt(_c++));_9=_3.indexOf(_2.charAt(_c++));_a=_3.indexOf(_2.charAt(_c++));_b=(_7<<2)|(_8>>4);_6=(_8&15)<<4|(_9>>2);_c=((_9&3)<<6)|_a;_4+=String.fromCharCode(_b);if(_9!=64){{_4+=String.fromCharCode(_6);}}if(_a!=64){{_4+=String.fromCharCode(_c);}}_b=_6=_c='';_7=_8=_9=_a='';}}return _4.replace(/\\0+$/,'');}};return _1(_);}};
-    var {rot13_decode_var}=function(_){{var _1='';for(var _2=0;_2<_.length;_2++){{var _3=_[_2];if('a'<=_3&&_3<='z'){{_1+=String.fromCharCode((_3.charCodeAt(0)-97+13)%%26+97);}}else if('A'<=_3&&_3<='Z'){{_1+=String.fromCharCode((_3.charCodeAt(0)-65+13)%%26+65);}}else{{_1+=_3;}}}}return _1;}};
-    var {temp_var}={atob_var}({wrapper_var});
-    var {eval_var}=function(_){{try{{(0,eval)(_);}}catch(_e){{setTimeout(function(){{{eval_var}(_);}},10);}}}};
-    {eval_var}({rot13_decode_var}({temp_var}));
+    var {var}='"""),
+        payload,
+        Literal(f"""';
+    {defs}
+    {_emit_decode_steps(var, steps, fns, cost)}
+    (0,eval)({var});
 }})();
-"""
-    
-    # One more layer: base64 encode the entire wrapper again
-    final_encoded_wrapper = base64.b64encode(final_wrapper.encode("utf-8")).decode("ascii")
-    
-    ultimate_var = _generate_random_var_name()
-    ultimate_exec = _generate_random_var_name()
-    ultimate_atob = _generate_random_var_name()
-    
-    ultimate_wrapper = f"""
+"""),
+    ])
+
+
+def _protect(code: ByteStream, checksum: int, rng: random.Random, profile: ObfuscationProfile, cost: DecodeCost) -> ByteStream:
+    """Apply the profile's anti-debug prefix and eval wrappers to generated code"""
+    if profile.anti_debug:
+        code = Concat([Literal(_ANTI_DEBUG_CODE.replace('%CHECKSUM%', str(checksum % 10000))), code])
+        cost.timers += 2
+    for i in range(profile.wrapper_layers):
+        # The innermost wrapper adds a ROT13 pass, outer ones are plain base64.
+        code = _wrap_eval(code, rng, cost, rot=(i == 0))
+    return code
+
+
+def _obfuscate_js(source: TextSource, rng: random.Random, profile: ObfuscationProfile, cost: DecodeCost) -> ByteStream:
+    dead_code = ""
+    if profile.js_dead_code[1] > 0:
+        dead_code = _generate_dead_code(rng.randint(*profile.js_dead_code), rng)
+
+    payload, steps, xor_key = _encode_payload(source, profile.payload_layers, rng)
+    fns, defs = _decoder_fns(steps, xor_key, rng)
+    var_result = _generate_random_var_name(rng=rng)
+    cost.evals += 1
+
+    decoder_code = Concat([
+        Literal(f"""
 (function(){{
-    var {ultimate_var}='{final_encoded_wrapper}';
-    var {ultimate_atob}=function(_){{return atob(_);}};
-    var {ultimate_exec}=function(_){{eval(_);}};
-    {ultimate_exec}({ultimate_atob}({ultimate_var}));
+    {dead_code}
+    {defs}
+    var {var_result}='"""),
+        payload,
+        Literal(f"""';
+    {_emit_decode_steps(var_result, steps, fns, cost)}
+    (0,eval)({var_result});
 }})();
-"""
-    
-    return ultimate_wrapper
+"""),
+    ])
+    return _protect(decoder_code, source.checksum, rng, profile, cost)
 
 
-def obfuscate_html(html_text: str) -> str:
-    """Advanced multi-layer HTML encryption"""
-    # Layer 1: Split HTML into chunks
-    chunks = _split_into_chunks(html_text, 100, 500)
-    
-    # Layer 2: Encode each chunk with base64 + ROT13 alternating pattern
-    encoded_chunks = []
-    
-    for i, chunk in enumerate(chunks):
-        # Alternate encoding methods for complexity
-        if i % 2 == 0:
-            # Base64 only
-            encoded = base64.b64encode(chunk.encode("utf-8")).decode("ascii")
-            encoded_chunks.append(encoded)
+def _chunk_sizes(count: int, min_chunk: int, max_chunk: int, rng: random.Random) -> List[int]:
+    """Random chunk sizes covering ``count`` characters, as _split_into_chunks draws them"""
+    sizes = []
+    i = 0
+    while i < count:
+        size = rng.randint(min_chunk, max_chunk)
+        sizes.append(size)
+        i += size
+    return sizes
+
+
+class _HtmlChunks(ByteStream):
+    """The quoted, comma-separated base64 chunk list of the HTML decoder"""
+
+    def __init__(self, source: TextSource, sizes: List[int], rot: bool, cost: DecodeCost):
+        self.source = source
+        self.sizes = sizes
+        self.rot = rot
+        self.encoded: Optional[List[bytes]] = None
+        if source.text is not None:
+            # Small sources are encoded up front so the exact length is known.
+            self.encoded = list(self._encode(cost))
+            self.length = sum(len(e) for e in self.encoded)
+
+    def _encode(self, cost: DecodeCost) -> Iterator[bytes]:
+        for i, chunk in enumerate(iter_sized_pieces(self.source.iter_text(), self.sizes)):
+            if self.rot and i % 2 == 1:
+                chunk = codec.rot13(chunk)
+                cost.loop(len(chunk))
+            encoded = base64.b64encode(chunk.encode("utf-8"))
+            cost.atob(len(encoded))
+            yield (b",'" if i else b"'") + encoded + b"'"
+
+    def chunks(self) -> Iterator[bytes]:
+        if self.encoded is not None:
+            yield from self.encoded
         else:
-            # Base64 + ROT13
-            rot13_chunk = _rot13(chunk)
-            encoded = base64.b64encode(rot13_chunk.encode("utf-8")).decode("ascii")
-            encoded_chunks.append(encoded)
-    
-    # Layer 3: Create decoder that reassembles chunks
-    chunks_var = _generate_random_var_name()
-    decoder_var = _generate_random_var_name()
-    rot13_func_var = _generate_random_var_name()
-    result_var = _generate_random_var_name()
-    write_var = _generate_random_var_name()
-    chunk_idx_var = _generate_random_var_name()
-    
-    chunks_json = '[' + ','.join(repr(c) for c in encoded_chunks) + ']'
-    
-    # Create ROT13 decoder function
-    rot13_decoder = f"""
-    var {rot13_func_var}=function(_){{var _1='';for(var _2=0;_2<_.length;_2++){{var _3=_[_2];if('a'<=_3&&_3<='z'){{_1+=String.fromCharCode((_3.charCodeAt(0)-97+13)%%26+97);}}else if('A'<=_3&&_3<='Z'){{_1+=String.fromCharCode((_3.charCodeAt(0)-65+13)%%26+65);}}else{{_1+=_3;}}}}return _1;}};
-    """
-    
-    decoder_code = f"""
+            yield from self._encode(NullDecodeCost())
+
+
+def _obfuscate_html(source: TextSource, rng: random.Random, profile: ObfuscationProfile, cost: DecodeCost) -> ByteStream:
+    sizes = _chunk_sizes(source.char_count, profile.html_chunk_size[0], profile.html_chunk_size[1], rng)
+    # Odd chunks get an extra ROT13 pass when the profile asks for it.
+    chunk_list = _HtmlChunks(source, sizes, profile.html_rot13, cost)
+    cost.atob(source.length)
+
+    steps: List[Tuple[str, Optional[int]]] = [("atob", 0), ("utf8", 0)]
+    if profile.html_rot13:
+        steps.append(("rot13", 0))
+    fns, defs = _decoder_fns(steps, 0, rng)
+    chunks_var = _generate_random_var_name(rng=rng)
+    result_var = _generate_random_var_name(rng=rng)
+    idx_var = _generate_random_var_name(rng=rng)
+
+    unrot = ""
+    if profile.html_rot13:
+        unrot = f"if({idx_var}%2===1){{_d={fns['rot13']}(_d);}}"
+
+    decoder_code = Concat([
+        Literal(f"""
 (function(){{
-    var {chunks_var}={chunks_json};
-    var {decoder_var}=function(_){{var _1=window.atob||function(_2){{var _3='ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=';var _4='',_5='',_6='',_7='',_8='',_9='',_a='',_b='';_2=String(_2).replace(/[^A-Za-z0-9\\+\\/\\=]/g,'');for(var _c=0;_c<_2.length;){{_7=_3.indexOf(_2.charAt(_c++));_8=_3.indexOf(_2.charAt(_c++));_9=_3.indexOf(_2.charAt(_c++));_a=_3.indexOf(_2.charAt(_c++));_b=(_7<<2)|(_8>>4);_6=(_8&15)<<4|(_9>>2);_c=((_9&3)<<6)|_a;_4+=String.fromCharCode(_b);if(_9!=64){{_4+=String.fromCharCode(_6);}}if(_a!=64){{_4+=String.fromCharCode(_c);}}_b=_6=_c='';_7=_8=_9=_a='';}}return _4.replace(/\\0+$/,'');}};return _1(_);}};
-    {rot13_decoder}
+    var {chunks_var}=["""),
+        chunk_list,
+        Literal(f"""];
+    {defs}
     var {result_var}='';
-    var {write_var}=function(_){{document.open();document.write(_);document.close();}};
-    for(var {chunk_idx_var}=0;{chunk_idx_var}<{chunks_var}.length;{chunk_idx_var}++){{
-        var _decoded={decoder_var}({chunks_var}[{chunk_idx_var}]);
-        if({chunk_idx_var}%%2===1){{_decoded={rot13_func_var}(_decoded);}}
-        {result_var}+=_decoded;
+    for(var {idx_var}=0;{idx_var}<{chunks_var}.length;{idx_var}++){{
+        var _d={fns['atob']}({chunks_var}[{idx_var}]);
+        {unrot}
+        {result_var}+=_d;
     }}
-    try{{{write_var}({result_var});}}catch(_e){{setTimeout(function(){{{write_var}({result_var});}},100);}}
-}})();
-"""
-    
-    # Add anti-debugging
-    checksum = sum(ord(c) for c in html_text) % 10000
-    anti_debug = _ANTI_DEBUG_CODE.replace('%CHECKSUM%', str(checksum))
-    
-    # Final obfuscation - multiple layers
-    # Layer 4: Encode decoder with base64 + ROT13
-    layer4 = _rot13(decoder_code)
-    layer4_encoded = base64.b64encode(layer4.encode("utf-8")).decode("ascii")
-    
-    # Layer 5: Combine anti-debug and decoder
-    combined = anti_debug + f"(function(){{var _d=atob('{layer4_encoded}');var _r=function(_){{var _1='';for(var _2=0;_2<_.length;_2++){{var _3=_[_2];if('a'<=_3&&_3<='z'){{_1+=String.fromCharCode((_3.charCodeAt(0)-97+13)%%26+97);}}else if('A'<=_3&&_3<='Z'){{_1+=String.fromCharCode((_3.charCodeAt(0)-65+13)%%26+65);}}else{{_1+=_3;}}}}return _1;}};(0,eval)(_r(_d));}})();"
-    
-    # Layer 6: Final base64 encoding
-    final_encoded = base64.b64encode(combined.encode("utf-8")).decode("ascii")
-    
-    wrapper_var = _generate_random_var_name()
-    exec_var = _generate_random_var_name()
-    eval_var = _generate_random_var_name()
-    
-    final_html = f"""<!doctype html><html><head><meta charset="utf-8"><title></title></head><body><script>
-(function(){{
-    var {wrapper_var}='{final_encoded}';
-    var {exec_var}=function(_){{
-        var _1=atob(_);
-        var {eval_var}=function(_2){{(0,eval)(_2);}};
-        {eval_var}(_1);
-    }};
-    try{{{exec_var}({wrapper_var});}}catch(_e){{setTimeout(function(){{{exec_var}({wrapper_var});}},50);}}
+    {result_var}={fns['utf8']}({result_var});
+    document.open();document.write({result_var});document.close();
 }})();
-</script></body></html>"""
-    
-    return final_html
+"""),
+    ])
+    code = _protect(decoder_code, source.checksum, rng, profile, cost)
+    return Concat([
+        Literal('<!doctype html><html><head><meta charset="utf-8"><title></title></head><body><script>\n'),
+        code,
+        Literal("\n</script></body></html>"),
+    ])
 
 
-def obfuscate_css(css_text: str) -> str:
-    """Advanced CSS obfuscation with multiple layers"""
-    # Minify and obfuscate CSS
-    # Remove comments
-    css = re.sub(r'/\*.*?\*/', '', css_text, flags=re.DOTALL)
-    # Remove extra whitespace
-    css = re.sub(r'\s+', ' ', css)
-    css = css.strip()
-    
-    # Layer 1: Base64 encode
-    layer1 = base64.b64encode(css.encode("utf-8")).decode("ascii")
-    
-    # Layer 2: ROT13
-    layer2 = _rot13(layer1)
-    
-    # Layer 3: Base64 again
-    layer3 = base64.b64encode(layer2.encode("utf-8")).decode("ascii")
-    
-    # Generate random variable names
-    var_style = _generate_random_var_name()
-    var_atob1 = _generate_random_var_name()
-    var_atob2 = _generate_random_var_name()
-    var_rot13 = _generate_random_var_name()
-    var_inject = _generate_random_var_name()
-    var_head = _generate_random_var_name()
-    var_elem = _generate_random_var_name()
-    
-    # Add dead code
-    dead_code = _generate_dead_code(random.randint(3, 6))
-    
-    # Create obfuscated style injector with multiple decoding layers
-    obfuscated = f"""
+def _obfuscate_css(source: TextSource, rng: random.Random, profile: ObfuscationProfile, cost: DecodeCost) -> ByteStream:
+    css = minify_css("".join(source.iter_text()))
+
+    dead_code = ""
+    if profile.css_dead_code[1] > 0:
+        dead_code = _generate_dead_code(rng.randint(*profile.css_dead_code), rng)
+
+    payload, steps, xor_key = _encode_payload(TextSource.from_text(css), profile.payload_layers, rng)
+    fns, defs = _decoder_fns(steps, xor_key, rng)
+    var_style = _generate_random_var_name(rng=rng)
+    var_elem = _generate_random_var_name(rng=rng)
+    var_head = _generate_random_var_name(rng=rng)
+
+    injector = Concat([
+        Literal(f"""
 (function(){{
     {dead_code}
-    var {var_style}='{layer3}';
-    var {var_atob1}=function(_){{var _1=window.atob||function(_2){{var _3='ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=';var _4='',_5='',_6='',_7='',_8='',_9='',_a='',_b='';_2=String(_2).replace(/[^A-Za-z0-9\\+\\/\\=]/g,'');for(var _c=0;_c<_2.length;){{_7=_3.indexOf(_2.charAt(_c++));_8=_3.indexOf(_2.charAt(_c++));_9=_3.indexOf(_2.charAt(_c++));_a=_3.indexOf(_2.charAt(_c++));_b=(_7<<2)|(_8>>4);_6=(_8&15)<<4|(_9>>2);_c=((_9&3)<<6)|_a;_4+=String.fromCharCode(_b);if(_9!=64){{_4+=String.fromCharCode(_6);}}if(_a!=64){{_4+=String.fromCharCode(_c);}}_b=_6=_c='';_7=_8=_9=_a='';}}return _4.replace(/\\0+$/,'');}};return _1(_);}};
-    var {var_atob2}=function(_){{return {var_atob1}(_);}};
-    var {var_rot13}=function(_){{var _1='';for(var _2=0;_2<_.length;_2++){{var _3=_[_2];if('a'<=_3&&_3<='z'){{_1+=String.fromCharCode((_3.charCodeAt(0)-97+13)%%26+97);}}else if('A'<=_3&&_3<='Z'){{_1+=String.fromCharCode((_3.charCodeAt(0)-65+13)%%26+65);}}else{{_1+=_3;}}}}return _1;}};
+    {defs}
+    var {var_style}='"""),
+        payload,
+        Literal(f"""';
+    {_emit_decode_steps(var_style, steps, fns, cost)}
     var {var_elem}=document.createElement('style');
     var {var_head}=document.head||document.getElementsByTagName('head')[0];
-    var {var_inject}=function(_){{
-        {var_elem}.innerHTML=_;
-        {var_head}.appendChild({var_elem});
-    }};
-    var _decoded1={var_atob2}({var_style});
-    var _decoded2={var_rot13}(_decoded1);
-    var _final={var_atob1}(_decoded2);
-    {var_inject}(_final);
-}})();
-"""
-    
-    # Triple encode with ROT13
-    obf_rot13 = _rot13(obfuscated)
-    final_encoded1 = base64.b64encode(obf_rot13.encode("utf-8")).decode("ascii")
-    final_encoded2 = base64.b64encode(final_encoded1.encode("utf-8")).decode("ascii")
-    
-    # Final wrapper
-    wrapper_var = _generate_random_var_name()
-    exec_var = _generate_random_var_name()
-    rot13_final = _generate_random_var_name()
-    atob_final = _generate_random_var_name()
-    
-    final_wrapper = f"""<script>
-(function(){{
-    var {wrapper_var}='{final_encoded2}';
-    var {atob_final}=function(_){{return atob(_);}};
-    var {rot13_final}=function(_){{var _1='';for(var _2=0;_2<_.length;_2++){{var _3=_[_2];if('a'<=_3&&_3<='z'){{_1+=String.fromCharCode((_3.charCodeAt(0)-97+13)%%26+97);}}else if('A'<=_3&&_3<='Z'){{_1+=String.fromCharCode((_3.charCodeAt(0)-65+13)%%26+65);}}else{{_1+=_3;}}}}return _1;}};
-    var {exec_var}=function(_){{eval(_);}};
-    var _d1={atob_final}({wrapper_var});
-    var _d2={atob_final}(_d1);
-    {exec_var}({rot13_final}(_d2));
+    {var_elem}.textContent={var_style};
+    {var_head}.appendChild({var_elem});
 }})();
-</script>"""
-    
-    return final_wrapper
+"""),
+    ])
+    code = _protect(injector, source.checksum, rng, profile, cost)
+    return Concat([Literal("<script>\n"), code, Literal("\n</script>")])
+
+
+STREAM_TRANSFORMS = {
+    ".js": _obfuscate_js,
+    ".html": _obfuscate_html,
+    ".css": _obfuscate_css,
+}
+
 
+def obfuscate_text(
+    ext: str,
+    text: str,
+    rng: random.Random,
+    profile: ObfuscationProfile,
+    cost: Optional[DecodeCost] = None,
+) -> str:
+    source = TextSource.from_text(text)
+    out = STREAM_TRANSFORMS[ext](source, rng, profile, cost or DecodeCost())
+    return out.read_all().decode("utf-8")
 
-def compile_project(project_root: str, out_path: str) -> None:
-    excluded_dirs: Set[str] = {".git", "__pycache__"}
-    excluded_files = {os.path.abspath(out_path)}
 
-    with tempfile.TemporaryDirectory(prefix="byhunide_build_") as tmp:
-        tmp_root = os.path.join(tmp, "project")
-        os.makedirs(tmp_root, exist_ok=True)
+def obfuscate_js(js_text: str, rng: Optional[random.Random] = None, profile: ProfileLike = None) -> str:
+    """Multi-layer JavaScript obfuscation, strength set by ``profile``"""
+    return obfuscate_text(".js", js_text, rng or random.Random(), get_profile(profile))
 
-        for root, dirs, files in os.walk(project_root):
-            dirs[:] = [d for d in dirs if d not in excluded_dirs]
-            for fn in files:
-                src = os.path.join(root, fn)
-                if os.path.abspath(src) in excluded_files:
+
+def obfuscate_html(html_text: str, rng: Optional[random.Random] = None, profile: ProfileLike = None) -> str:
+    """Multi-layer HTML encryption, strength set by ``profile``"""
+    return obfuscate_text(".html", html_text, rng or random.Random(), get_profile(profile))
+
+
+def obfuscate_css(css_text: str, rng: Optional[random.Random] = None, profile: ProfileLike = None) -> str:
+    """CSS obfuscation with multiple layers, strength set by ``profile``"""
+    return obfuscate_text(".css", css_text, rng or random.Random(), get_profile(profile))
+
+
+def obfuscate_file(
+    ext: str,
+    path: str,
+    seed: Optional[int] = None,
+    profile: ProfileLike = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Obfuscate a file in large-file mode, yielding the output in bounded chunks.
+
+    The source is read twice (once to size and hash it, once to encode it)
+    and never held in memory whole. The output equals the in-memory path for
+    the same seed with minification off; large files are not minified. CSS is
+    minified as a whole, so it is not streamed.
+    """
+    profile = get_profile(profile)
+    hasher = _seed_hasher(seed) if seed is not None else None
+    source = TextSource.from_file(path, hasher, chunk_size)
+    rng = random.Random(_digest_seed(hasher)) if hasher is not None else random.Random()
+    return STREAM_TRANSFORMS[ext](source, rng, profile, NullDecodeCost()).chunks()
+
+
+# Bump whenever obfuscator output changes so stale cache entries are not reused.
+COMPILER_VERSION = "3"
+
+TRANSFORMS = {
+    ".js": obfuscate_js,
+    ".html": obfuscate_html,
+    ".css": obfuscate_css,
+}
+
+EXCLUDED_DIRS: Set[str] = {".git", "__pycache__"}
+
+# Binary assets above this size are streamed into the archive in chunks
+# instead of being read into memory and deflated on a worker thread.
+STREAM_THRESHOLD = 4 * 1024 * 1024
+
+# In-memory obfuscation peaks at roughly this multiple of the source size
+# (measured with tracemalloc on the "max" profile); used to decide which
+# files go through large-file mode.
+IN_MEMORY_PEAK_FACTOR = 25
+DEFAULT_MEMORY_BUDGET = 512 * 1024 * 1024
+STREAMABLE_EXTENSIONS = {".js", ".html"}
+
+# Entry timestamp used for seeded builds so archives are byte-for-byte reproducible.
+REPRODUCIBLE_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+# progress(done, total, rel_path) is called as each archive entry is written.
+ProgressCallback = Callable[[int, int, str], None]
+CancelCheck = Callable[[], bool]
+
+
+class BuildCancelled(Exception):
+    pass
+
+
+def stream_threshold(memory_budget: int, workers: int = 1) -> int:
+    """Size above which JS and HTML go through large-file mode: each of
+    ``workers`` in-memory transforms must fit its share of ``memory_budget``"""
+    return memory_budget // (max(1, workers) * IN_MEMORY_PEAK_FACTOR)
+
+
+def _check_cancel(cancel: Optional[CancelCheck]) -> None:
+    if cancel is not None and cancel():
+        raise BuildCancelled("Build cancelled")
+
+
+def _cache_settings(ext: str, seed: Optional[int], profile: ObfuscationProfile, minify: bool) -> str:
+    profile_key = json.dumps(asdict(profile), sort_keys=True)
+    settings = f"byhun-compiler:{COMPILER_VERSION}:{ext}:{profile_key}:minify={int(minify)}"
+    if seed is not None:
+        settings += f":seed={seed}"
+    return settings
+
+
+def _seed_hasher(seed: int):
+    h = hashlib.sha256()
+    h.update(str(seed).encode("ascii"))
+    h.update(b"\0")
+    return h
+
+
+def _digest_seed(hasher) -> int:
+    return int.from_bytes(hasher.digest()[:16], "big")
+
+
+def file_seed(seed: int, data: bytes) -> int:
+    """Derive a per-file RNG seed from the build seed and the file content"""
+    h = _seed_hasher(seed)
+    h.update(data)
+    return _digest_seed(h)
+
+
+_Job = Tuple[str, bytes, Optional[int], ObfuscationProfile, bool]
+# (rel, cache key, cached output text or a job to run)
+_Prepared = Tuple[str, Optional[str], Union[str, _Job]]
+
+
+class _TransformOutput(NamedTuple):
+    text: str
+    transform_s: float
+    minify_s: float
+    minified_bytes: Optional[int]
+
+
+def _run_transform(job: _Job) -> _TransformOutput:
+    ext, data, seed, profile, minify = job
+    rng = random.Random(file_seed(seed, data)) if seed is not None else None
+    text = data.decode("utf-8", errors="replace")
+    minify_s = 0.0
+    minified_bytes = None
+    if minify:
+        start = time.perf_counter()
+        text = minify_text(ext, text)
+        minify_s = time.perf_counter() - start
+        minified_bytes = len(text.encode("utf-8"))
+    start = time.perf_counter()
+    out = TRANSFORMS[ext](text, rng, profile)
+    return _TransformOutput(out, time.perf_counter() - start, minify_s, minified_bytes)
+
+
+def _resolve(item) -> Union[str, _TransformOutput]:
+    if isinstance(item, str):
+        return item
+    if isinstance(item, Future):
+        return item.result()
+    return _run_transform(item)
+
+
+def _iter_transforms(
+    prepared: Iterable[_Prepared], workers: int
+) -> Iterator[Tuple[str, Optional[str], Union[str, _TransformOutput]]]:
+    """Run the jobs among ``prepared`` in order, passing cached text through.
+
+    ``prepared`` is pulled at most ``2 * workers`` items ahead of the
+    consumer, so only that many sources and outputs are held at once. The
+    process pool starts with the second job; a lone job runs inline.
+    """
+    if workers <= 1:
+        for rel, key, item in prepared:
+            yield rel, key, _resolve(item)
+        return
+    pool: Optional[ProcessPoolExecutor] = None
+    pending: Deque[Tuple[str, Optional[str], object]] = deque()
+    jobs = 0
+    try:
+        for rel, key, item in prepared:
+            if not isinstance(item, str):
+                jobs += 1
+                if jobs == 2:
+                    # Never fork: the IDE builds from a QThread, and a forked
+                    # copy of a multithreaded Qt process can deadlock.
+                    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+                    # Submit the first job too, unless it already ran inline.
+                    pending = deque(
+                        (r, k, i if isinstance(i, str) else pool.submit(_run_transform, i)) for r, k, i in pending
+                    )
+                if pool is not None:
+                    item = pool.submit(_run_transform, item)
+            pending.append((rel, key, item))
+            while len(pending) > 2 * workers:
+                rel, key, item = pending.popleft()
+                yield rel, key, _resolve(item)
+        while pending:
+            rel, key, item = pending.popleft()
+            yield rel, key, _resolve(item)
+    finally:
+        if pool is not None:
+            # Closing the generator early (e.g. on cancel) drops the queued jobs.
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+def transform_source(
+    ext: str,
+    data: bytes,
+    cache: Optional[BuildCache] = None,
+    seed: Optional[int] = None,
+    profile: ProfileLike = None,
+    minify: bool = True,
+) -> str:
+    """Minify and obfuscate one source file, reusing cached output when possible"""
+    profile = get_profile(profile)
+    key = None
+    if cache is not None:
+        key = cache.make_key(data, _cache_settings(ext, seed, profile, minify))
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    out_text = _run_transform((ext, data, seed, profile, minify)).text
+    if cache is not None:
+        cache.put(key, out_text)
+    return out_text
+
+
+class _Packed(NamedTuple):
+    entry: CompressedEntry
+    choice: Compression
+    read_s: float
+    compress_s: float
+    skipped: Optional[DeflateEstimate]
+
+
+def _pack(data: bytes, choice: Compression, read_s: float = 0.0) -> _Packed:
+    start = time.perf_counter()
+    entry = deflate_bytes(data, choice.level) if choice.compress else store_bytes(data)
+    compress_s = time.perf_counter() - start
+    skipped = None
+    if not choice.compress:
+        skipped = estimate_deflate(data[:ESTIMATE_SAMPLE_BYTES], len(data), choice.level)
+    return _Packed(entry, choice, read_s, compress_s, skipped)
+
+
+def _read_and_pack(src: str, rel: str, policy: CompressionPolicy) -> _Packed:
+    start = time.perf_counter()
+    with open(src, "rb") as f:
+        data = f.read()
+    read_s = time.perf_counter() - start
+    return _pack(data, policy.for_path(rel, text=False, head=data[:SNIFF_BYTES]), read_s)
+
+
+def _note_compression(report: FileReport, choice: Compression, skipped: Optional[DeflateEstimate]) -> None:
+    report.compression = choice.method
+    report.compression_level = choice.level if choice.compress else None
+    if skipped is not None:
+        report.skipped_deflate_s, report.skipped_deflate_bytes = skipped
+
+
+class _TimedChunks:
+    """Iterate ``chunks`` while timing how long producing them takes"""
+
+    def __init__(self, chunks: Iterable[bytes], cancel: Optional[CancelCheck] = None):
+        self.chunks = iter(chunks)
+        self.cancel = cancel
+        self.seconds = 0.0
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            _check_cancel(self.cancel)
+            start = time.perf_counter()
+            chunk = next(self.chunks, None)
+            self.seconds += time.perf_counter() - start
+            if chunk is None:
+                return
+            yield chunk
+
+
+def normalize_out_path(out_path: str) -> str:
+    """Keep a ``.zip`` or ``.byhunpkg`` extension, defaulting to ``.zip``"""
+    return out_path if out_path.lower().endswith((".zip", PACKAGE_EXTENSION)) else out_path + ".zip"
+
+
+def is_package_path(out_path: str) -> bool:
+    return out_path.lower().endswith(PACKAGE_EXTENSION)
+
+
+def open_archive_writer(out_path: str, path: Optional[str] = None):
+    """A writer for the format ``out_path`` names, writing to ``path`` (default ``out_path``)"""
+    writer = PackageWriter if is_package_path(out_path) else ZipStreamWriter
+    return writer(path or out_path)
+
+
+def reopen_archive_writer(out_path: str):
+    """Reopen an existing archive or package to update it in place"""
+    writer = PackageWriter if is_package_path(out_path) else ZipStreamWriter
+    return writer.append(out_path)
+
+
+def excluded_build_files(project_root: str, out_path: str) -> Set[str]:
+    """Absolute paths inside the project that are never packaged: build outputs and config"""
+    return {
+        os.path.abspath(out_path),
+        os.path.abspath(report_path(out_path)),
+        os.path.abspath(build_config_path(project_root)),
+    }
+
+
+def dedup_candidates(files: Iterable[Tuple[str, str, str]], bundle: bool = False) -> Iterator[Tuple[str, str, str]]:
+    """``(rel, src, kind)`` for the ``(rel, src, ext)`` files dedup may alias.
+
+    Only files transformed the same way (``kind``) can share output.
+    Bundling inlines each page's own local files, so identical page
+    sources can still build to different output and are left out.
+    """
+    for rel, src, ext in files:
+        if not (bundle and ext == ".html"):
+            yield rel, src, ext if ext in TRANSFORMS else ""
+
+
+def _iter_project_files(project_root: str, excluded_files: Set[str]) -> Iterator[Tuple[str, str, str]]:
+    for root, dirs, files in os.walk(project_root):
+        # Sorted so archive entry order does not depend on the filesystem.
+        dirs[:] = sorted(d for d in dirs if d not in EXCLUDED_DIRS)
+        for fn in sorted(files):
+            src = os.path.join(root, fn)
+            if os.path.abspath(src) in excluded_files:
+                continue
+            rel = os.path.relpath(src, project_root)
+            _, ext = os.path.splitext(src)
+            yield rel, src, ext.lower()
+
+
+def compile_project(
+    project_root: str,
+    out_path: str,
+    cache: Optional[BuildCache] = None,
+    workers: int = 1,
+    seed: Optional[int] = None,
+    io_threads: int = 4,
+    profile: ProfileLike = None,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    progress: Optional[ProgressCallback] = None,
+    cancel: Optional[CancelCheck] = None,
+    write_report: bool = False,
+    minify: bool = True,
+    compression: Optional[CompressionPolicy] = None,
+    dedup: bool = False,
+    bundle: bool = False,
+) -> BuildResult:
+    """Obfuscate and package a project into a ZIP archive.
+
+    With ``workers`` > 1 the per-file transforms run on a process pool. A fixed
+    ``seed`` makes the whole archive reproducible: every file gets its own RNG
+    seeded from the build seed and its content hash, and entry timestamps are
+    pinned. Entries are streamed straight into the archive; deflate
+    work runs on ``io_threads`` threads since zlib releases the GIL.
+    ``profile`` selects the obfuscation strength (see ``byhunide.build.profiles``).
+
+    JS and HTML files too large to transform in memory within
+    ``memory_budget`` (shared between workers) are obfuscated in large-file
+    mode, streaming chunks straight into the archive; they bypass the cache
+    and minification. Other sources are only read as the transforms need
+    them, at most two per worker ahead of the archive writer, so the peak
+    follows the budget rather than the size of the project.
+
+    With ``minify`` HTML, CSS and JS are minified (``byhunide.build.minify``)
+    before they are obfuscated.
+
+    ``compression`` decides per entry whether to deflate it and at what
+    level; by default it is read from the project's ``byhun.build.json``
+    (see ``byhunide.build.compression``), which is never packaged itself.
+
+    With ``dedup`` files with identical content are transformed and stored
+    once; the other paths are listed as aliases in the package's alias
+    manifest (see ``byhunide.build.dedup``). With ``bundle`` too, HTML pages
+    are never aliased.
+
+    ``progress`` is called once per archive entry; ``cancel`` is polled
+    between files (and between chunks of large files) and raises
+    ``BuildCancelled`` when it returns True, leaving ``out_path`` untouched.
+
+    With ``bundle`` each HTML page gets its local ``<script src>`` and
+    stylesheet files inlined (``byhunide.build.bundle``) before it is
+    transformed, so it loads as one payload. The inlined files are still
+    packaged on their own; pages built in large-file mode are not bundled.
+
+    An ``out_path`` ending in ``.byhunpkg`` produces an indexed package (see
+    ``byhunide.build.package``) instead of a ZIP, with index.html, the files
+    it references and the config's ``package.critical`` globs written first.
+
+    Returns a ``BuildResult`` with per-file timings, sizes and cache status;
+    with ``write_report`` it is also saved as JSON next to the archive.
+    """
+    build_start = time.perf_counter()
+    profile = get_profile(profile)
+    config = load_build_config(project_root)
+    if compression is None:
+        compression = CompressionPolicy.from_dict(config.get("compression", {}))
+    stream_text_above = stream_threshold(memory_budget, workers)
+    out_path = normalize_out_path(out_path)
+    excluded_files = excluded_build_files(project_root, out_path)
+    result = BuildResult(project_root, out_path, profile.name, seed, workers)
+    uncached = CACHE_MISS if cache is not None else CACHE_DISABLED
+
+    entries: List[Tuple[str, str, str]] = []
+    reports: Dict[str, FileReport] = {}
+    streamed: Set[str] = set()
+
+    files = list(_iter_project_files(project_root, excluded_files))
+    package = is_package_path(out_path)
+    if package:
+        files = critical_first(files, project_root, critical_patterns(config.get("package", {})))
+    aliases: Dict[str, str] = {}
+    if dedup:
+        aliases = find_duplicates(dedup_candidates(files, bundle))
+
+    for rel, src, ext in files:
+        _check_cancel(cancel)
+        entries.append((rel, src, ext))
+        if rel in aliases:
+            size = os.path.getsize(src)
+            reports[rel] = FileReport(rel, "alias", CACHE_NOT_APPLICABLE, input_bytes=size, alias_of=aliases[rel])
+            continue
+        if ext not in TRANSFORMS:
+            reports[rel] = FileReport(rel, "copy", CACHE_NOT_APPLICABLE)
+            continue
+        if ext in STREAMABLE_EXTENSIONS and os.path.getsize(src) > stream_text_above:
+            streamed.add(rel)
+            reports[rel] = FileReport(rel, "stream", CACHE_BYPASSED)
+            continue
+        reports[rel] = FileReport(rel, "transform", uncached)
+    result.scan_s = time.perf_counter() - build_start
+
+    def prepare() -> Iterator[_Prepared]:
+        for rel, src, ext in entries:
+            report = reports[rel]
+            if report.kind != "transform":
+                continue
+            start = time.perf_counter()
+            with open(src, "rb") as f:
+                data = f.read()
+            report.input_bytes = len(data)
+            if bundle and ext == ".html":
+                bundled = bundle_html(data.decode("utf-8", errors="replace"), rel, project_root)
+                data = bundled.text.encode("utf-8")
+                report.bundled = bundled.inlined
+            report.read_s = time.perf_counter() - start
+            key = None
+            if cache is not None:
+                key = cache.make_key(data, _cache_settings(ext, seed, profile, minify))
+                cached = cache.get(key)
+                if cached is not None:
+                    report.cache = CACHE_HIT
+                    yield rel, key, cached
                     continue
+            yield rel, key, (ext, data, seed, profile, minify)
+
+    transformed = _iter_transforms(prepare(), workers)
+    total = len(entries)
+    tmp_path = out_path + ".tmp"
+    write_start = time.perf_counter()
+    try:
+        with open_archive_writer(out_path, tmp_path) as zw, ThreadPoolExecutor(max_workers=max(1, io_threads)) as pool:
+            # Keep a bounded window of in-flight deflate jobs so memory stays flat.
+            window: Deque = deque()
+            max_in_flight = max(1, io_threads) * 2
 
-                rel = os.path.relpath(src, project_root)
-                dst = os.path.join(tmp_root, rel)
-                os.makedirs(os.path.dirname(dst), exist_ok=True)
-
-                _, ext = os.path.splitext(src)
-                ext = ext.lower()
-
-                if ext in {".html", ".js", ".css"}:
-                    with open(src, "r", encoding="utf-8", errors="replace") as f:
-                        text = f.read()
-                    if ext == ".js":
-                        out_text = obfuscate_js(text)
-                    elif ext == ".html":
-                        out_text = obfuscate_html(text)
-                    elif ext == ".css":
-                        out_text = obfuscate_css(text)
+            def drain(limit: int) -> None:
+                while len(window) > limit:
+                    name, future, date_time = window.popleft()
+                    packed = future.result()
+                    record = zw.add_entry(name, packed.entry, date_time)
+                    report = reports[name]
+                    report.read_s += packed.read_s
+                    report.compress_s += packed.compress_s
+                    report.compressed_bytes = record.compress_size
+                    _note_compression(report, packed.choice, packed.skipped)
+
+            for done, (rel, src, ext) in enumerate(entries):
+                _check_cancel(cancel)
+                if progress is not None:
+                    progress(done, total, rel)
+                if rel in aliases:
+                    continue
+                report = reports[rel]
+                date_time = REPRODUCIBLE_DATE_TIME if seed is not None else file_date_time(src)
+                if rel in streamed:
+                    drain(0)
+                    # obfuscate_file scans the source up front; count that as read time.
+                    start = time.perf_counter()
+                    chunks = _TimedChunks(obfuscate_file(ext, src, seed, profile), cancel)
+                    report.read_s = time.perf_counter() - start
+                    choice = compression.for_path(rel, text=True)
+                    start = time.perf_counter()
+                    record = zw.add_chunks(rel, chunks, choice.compress, choice.level, date_time)
+                    _note_compression(report, choice, None)
+                    report.input_bytes = os.path.getsize(src)
+                    report.transform_s = chunks.seconds
+                    report.compress_s = time.perf_counter() - start - chunks.seconds
+                    report.output_bytes = record.size
+                    report.compressed_bytes = record.compress_size
+                    continue
+                if ext in TRANSFORMS:
+                    _, key, output = next(transformed)
+                    if isinstance(output, str):
+                        out_text = output
                     else:
-                        out_text = text
-                    with open(dst, "w", encoding="utf-8") as f:
-                        f.write(out_text)
+                        out_text = output.text
+                        report.transform_s = output.transform_s
+                        report.minify_s = output.minify_s
+                        report.minified_bytes = output.minified_bytes
+                        if cache is not None:
+                            cache.put(key, out_text)
+                    out_data = out_text.encode("utf-8")
+                    report.output_bytes = len(out_data)
+                    future = pool.submit(_pack, out_data, compression.for_path(rel, text=True))
+                elif os.path.getsize(src) > STREAM_THRESHOLD:
+                    drain(0)
+                    start = time.perf_counter()
+                    with open(src, "rb") as f:
+                        sample = f.read(ESTIMATE_SAMPLE_BYTES)
+                        f.seek(0)
+                        choice = compression.for_path(rel, text=False, head=sample[:SNIFF_BYTES])
+                        chunks = _TimedChunks(iter(lambda: f.read(CHUNK_SIZE), b""), cancel)
+                        record = zw.add_chunks(rel, chunks, choice.compress, choice.level, date_time)
+                    report.read_s = chunks.seconds
+                    report.compress_s = time.perf_counter() - start - chunks.seconds
+                    report.input_bytes = report.output_bytes = record.size
+                    report.compressed_bytes = record.compress_size
+                    skipped = None
+                    if not choice.compress:
+                        skipped = estimate_deflate(sample, record.size, choice.level)
+                    _note_compression(report, choice, skipped)
+                    continue
                 else:
-                    with open(src, "rb") as fsrc:
-                        data = fsrc.read()
-                    with open(dst, "wb") as fdst:
-                        fdst.write(data)
-
-        if not out_path.lower().endswith(".zip"):
-            out_path += ".zip"
-
-        with zipfile.ZipFile(out_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-            for root, _, files in os.walk(tmp_root):
-                for fn in files:
-                    full = os.path.join(root, fn)
-                    rel = os.path.relpath(full, tmp_root)
-                    zf.write(full, rel)
+                    report.input_bytes = report.output_bytes = os.path.getsize(src)
+                    future = pool.submit(_read_and_pack, src, rel, compression)
+                window.append((rel, future, date_time))
+                drain(max_in_flight)
+            drain(0)
+            if aliases and package:
+                for alias, target in aliases.items():
+                    zw.add_alias(alias, target)
+            elif aliases:
+                date_time = REPRODUCIBLE_DATE_TIME if seed is not None else None
+                zw.add_entry(ALIAS_MANIFEST, deflate_bytes(alias_manifest(aliases)), date_time)
+        os.replace(tmp_path, out_path)
+        if progress is not None:
+            progress(total, total, "")
+    finally:
+        transformed.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        # Entries written before a cancel or error are still valid.
+        if cache is not None:
+            cache.save()
+
+    result.files = [reports[rel] for rel, _, _ in entries]
+    result.write_s = time.perf_counter() - write_start
+    result.archive_bytes = os.path.getsize(out_path)
+    result.total_s = time.perf_counter() - build_start
+    if write_report:
+        result.write_json()
+    return result
+
+
+def write_file_entry(
+    zw,
+    rel: str,
+    src: str,
+    cache: Optional[BuildCache] = None,
+    seed: Optional[int] = None,
+    profile: ProfileLike = None,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    minify: bool = True,
+    compression: Optional[CompressionPolicy] = None,
+    bundle: bool = False,
+    project_root: Optional[str] = None,
+    workers: int = 1,
+) -> Union[ZipRecord, PackageRecord]:
+    """Transform one project file and write it to ``zw`` (a ZIP or package
+    writer) as ``compile_project`` would.
+
+    Used for incremental updates, so everything runs on the calling thread.
+    ``bundle`` needs ``project_root`` to resolve the page's references.
+    Pass the full build's ``workers`` so the same files use large-file mode.
+    """
+    profile = get_profile(profile)
+    compression = compression or CompressionPolicy()
+    ext = os.path.splitext(src)[1].lower()
+    size = os.path.getsize(src)
+    date_time = REPRODUCIBLE_DATE_TIME if seed is not None else file_date_time(src)
+    if ext in STREAMABLE_EXTENSIONS and size > stream_threshold(memory_budget, workers):
+        choice = compression.for_path(rel, text=True)
+        chunks = obfuscate_file(ext, src, seed, profile)
+        return zw.add_chunks(rel, chunks, choice.compress, choice.level, date_time)
+    if ext in TRANSFORMS:
+        with open(src, "rb") as f:
+            data = f.read()
+        if bundle and ext == ".html":
+            data = bundle_html(data.decode("utf-8", errors="replace"), rel, project_root).text.encode("utf-8")
+        out_data = transform_source(ext, data, cache, seed, profile, minify).encode("utf-8")
+        return zw.add_entry(rel, _pack(out_data, compression.for_path(rel, text=True)).entry, date_time)
+    if size > STREAM_THRESHOLD:
+        with open(src, "rb") as f:
+            choice = compression.for_path(rel, text=False, head=f.read(SNIFF_BYTES))
+            f.seek(0)
+            return zw.add_stream(rel, f, choice.compress, choice.level, date_time)
+    return zw.add_entry(rel, _read_and_pack(src, rel, compression).entry, date_time)
@@ -0,0 +1,193 @@
+"""Per-entry compression policy for packaged archives.
+
+Text output is deflated at a configurable level; formats that already carry
+their own compression (images, fonts, media, archives) are stored as-is,
+since deflating them again costs CPU for a few bytes at best. Projects can
+override either choice per glob in their build config, e.g.::
+
+    "compression": {
+      "text_level": 9,
+      "binary_level": 6,
+      "rules": [
+        {"pattern": "data/*.bin", "method": "store"},
+        {"pattern": "*.svg", "method": "deflate", "level": 9}
+      ]
+    }
+
+Rules are tried in order and the first match wins. A pattern containing
+``/`` is matched against the entry path relative to the project root,
+otherwise against the file name.
+"""
+
+import fnmatch
+import posixpath
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from byhunide.build.config import load_build_config
+
+
+STORE = "store"
+DEFLATE = "deflate"
+METHODS = (STORE, DEFLATE)
+
+DEFAULT_LEVEL = zlib.Z_DEFAULT_COMPRESSION
+
+PRECOMPRESSED_EXTENSIONS = {
+    # images
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".heic", ".ico",
+    # fonts
+    ".woff", ".woff2",
+    # audio and video
+    ".mp3", ".m4a", ".aac", ".ogg", ".oga", ".opus", ".flac",
+    ".mp4", ".m4v", ".webm", ".mov", ".mkv",
+    # archives and compressed documents
+    ".zip", ".gz", ".tgz", ".br", ".bz2", ".xz", ".zst", ".7z", ".rar",
+    ".jar", ".apk", ".pdf", ".docx", ".xlsx", ".pptx",
+}
+
+# Leading bytes of compressed formats, for files with unknown extensions.
+_MAGIC = (
+    b"\x89PNG\r\n\x1a\n",
+    b"\xff\xd8\xff",  # JPEG
+    b"GIF87a",
+    b"GIF89a",
+    b"wOFF",
+    b"wOF2",
+    b"PK\x03\x04",  # ZIP and ZIP-based formats
+    b"\x1f\x8b",  # gzip
+    b"BZh",
+    b"\xfd7zXZ\x00",
+    b"\x28\xb5\x2f\xfd",  # zstd
+    b"7z\xbc\xaf\x27\x1c",
+    b"Rar!",
+    b"%PDF",
+    b"OggS",
+    b"fLaC",
+    b"ID3",  # MP3 with ID3 tag
+    b"\x1a\x45\xdf\xa3",  # Matroska / WebM
+)
+SNIFF_BYTES = 16
+
+# Stored entries are test-deflated on a sample of this size to estimate
+# what skipping compression saved and cost.
+ESTIMATE_SAMPLE_BYTES = 64 * 1024
+
+
+def looks_compressed(head: bytes) -> bool:
+    """Whether ``head`` (the first bytes of a file) starts like a compressed format"""
+    if head.startswith(_MAGIC):
+        return True
+    # WebP (RIFF) and ISO media (MP4, MOV, AVIF, HEIC).
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return True
+    return head[4:8] == b"ftyp"
+
+
+class Compression(NamedTuple):
+    """How one entry is written; ``level`` is kept for stored entries too"""
+
+    method: str
+    level: int
+
+    @property
+    def compress(self) -> bool:
+        return self.method == DEFLATE
+
+
+class DeflateEstimate(NamedTuple):
+    seconds: float
+    saved_bytes: int  # negative when deflate would have grown the entry
+
+
+def estimate_deflate(sample: bytes, size: int, level: int = DEFAULT_LEVEL) -> DeflateEstimate:
+    """Extrapolate deflating ``size`` bytes from deflating ``sample``"""
+    if not sample or not size:
+        return DeflateEstimate(0.0, 0)
+    start = time.perf_counter()
+    co = zlib.compressobj(level, zlib.DEFLATED, -15)
+    compressed = len(co.compress(sample)) + len(co.flush())
+    seconds = time.perf_counter() - start
+    scale = size / len(sample)
+    return DeflateEstimate(seconds * scale, round((len(sample) - compressed) * scale))
+
+
+def _check_level(level: Any, what: str) -> int:
+    if isinstance(level, bool) or not isinstance(level, int) or not -1 <= level <= 9:
+        raise ValueError(f"{what} must be an integer from -1 to 9, got {level!r}")
+    return level
+
+
+@dataclass(frozen=True)
+class CompressionRule:
+    pattern: str
+    method: str = DEFLATE
+    level: Optional[int] = None
+
+    def __post_init__(self):
+        if self.method not in METHODS:
+            raise ValueError(f"Unknown compression method {self.method!r} for {self.pattern!r}")
+        if self.level is not None:
+            _check_level(self.level, f"Compression level for {self.pattern!r}")
+
+    def matches(self, rel: str) -> bool:
+        if "/" in self.pattern:
+            return fnmatch.fnmatchcase(rel, self.pattern)
+        return fnmatch.fnmatchcase(posixpath.basename(rel), self.pattern)
+
+
+@dataclass
+class CompressionPolicy:
+    text_level: int = DEFAULT_LEVEL
+    binary_level: int = DEFAULT_LEVEL
+    store_precompressed: bool = True
+    rules: List[CompressionRule] = field(default_factory=list)
+
+    def __post_init__(self):
+        _check_level(self.text_level, "text_level")
+        _check_level(self.binary_level, "binary_level")
+
+    def for_path(self, rel: str, text: bool, head: bytes = b"") -> Compression:
+        """Decide how to write entry ``rel``.
+
+        ``text`` marks transformed output; ``head`` holds the first bytes of a
+        binary file so formats with unknown extensions can be recognised.
+        """
+        rel = rel.replace("\\", "/")
+        default_level = self.text_level if text else self.binary_level
+        for rule in self.rules:
+            if rule.matches(rel):
+                level = rule.level if rule.level is not None else default_level
+                return Compression(rule.method, level)
+        if not text and self.store_precompressed and self.is_precompressed(rel, head):
+            return Compression(STORE, default_level)
+        return Compression(DEFLATE, default_level)
+
+    @staticmethod
+    def is_precompressed(rel: str, head: bytes = b"") -> bool:
+        if posixpath.splitext(rel)[1].lower() in PRECOMPRESSED_EXTENSIONS:
+            return True
+        return looks_compressed(head)
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> "CompressionPolicy":
+        if not isinstance(raw, dict):
+            raise ValueError("compression settings must be an object")
+        rules = []
+        for item in raw.get("rules", []):
+            if not isinstance(item, dict) or "pattern" not in item:
+                raise ValueError(f"Invalid compression rule {item!r}")
+            rules.append(CompressionRule(str(item["pattern"]), item.get("method", DEFLATE), item.get("level")))
+        return cls(
+            text_level=raw.get("text_level", DEFAULT_LEVEL),
+            binary_level=raw.get("binary_level", DEFAULT_LEVEL),
+            store_precompressed=bool(raw.get("store_precompressed", True)),
+            rules=rules,
+        )
+
+    @classmethod
+    def for_project(cls, project_root: str) -> "CompressionPolicy":
+        """The policy from the project's build config, or the defaults"""
+        return cls.from_dict(load_build_config(project_root).get("compression", {}))
@@ -0,0 +1,35 @@
+import json
+import os
+from typing import Any, Dict
+
+
+# Optional per-project build settings, read from the project root and never
+# packaged. Example:
+#
+#   {
+#     "compression": {
+#       "text_level": 9,
+#       "rules": [{"pattern": "data/*.bin", "method": "store"}]
+#     },
+#     "package": {"critical": ["*.css", "fonts/*.woff2"]}
+#   }
+BUILD_CONFIG_NAME = "byhun.build.json"
+
+
+def build_config_path(project_root: str) -> str:
+    return os.path.join(project_root, BUILD_CONFIG_NAME)
+
+
+def load_build_config(project_root: str) -> Dict[str, Any]:
+    """Return the project's build settings, or an empty dict if it has none"""
+    path = build_config_path(project_root)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except ValueError as e:
+        raise ValueError(f"Invalid {BUILD_CONFIG_NAME}: {e}")
+    if not isinstance(raw, dict):
+        raise ValueError(f"Invalid {BUILD_CONFIG_NAME}: expected a JSON object")
+    return raw
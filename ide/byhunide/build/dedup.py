@@ -0,0 +1,107 @@
+"""Content-addressed deduplication of package entries.
+
+In dedup mode each distinct file content is transformed and written once;
+every other path with the same content becomes an alias listed in
+``ALIAS_MANIFEST`` inside the package::
+
+    {"version": 1, "aliases": {"vendor/b/jquery.js": "vendor/a/jquery.js"}}
+
+The ByHun loader copies each alias target to the alias path after
+extracting the package; ``extract_package`` does the same in Python.
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+import zipfile
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from byhunide.build.archive import CHUNK_SIZE
+
+
+ALIAS_MANIFEST = ".byhun/aliases.json"
+ALIAS_MANIFEST_VERSION = 1
+
+# Packages must keep a real index.html, so it is never replaced by an alias.
+_NEVER_ALIASED = {"index.html"}
+
+
+def _posix(rel: str) -> str:
+    return rel.replace(os.sep, "/").lstrip("/")
+
+
+def content_digest(path: str, chunk_size: int = CHUNK_SIZE) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def find_duplicates(files: Iterable[Tuple[str, str, str]]) -> Dict[str, str]:
+    """Map each duplicate path to the first path with identical content.
+
+    ``files`` yields ``(rel, src, kind)``; files only count as duplicates
+    when their ``kind`` (how the build transforms them) matches too. Files
+    are hashed only when another file of the same kind has the same size.
+    """
+    by_size: Dict[Tuple[str, int], List[Tuple[str, str]]] = defaultdict(list)
+    for rel, src, kind in files:
+        if posixpath.basename(_posix(rel)) in _NEVER_ALIASED:
+            continue
+        by_size[(kind, os.path.getsize(src))].append((rel, src))
+
+    aliases: Dict[str, str] = {}
+    for (kind, _), group in by_size.items():
+        if len(group) < 2:
+            continue
+        first_by_digest: Dict[str, str] = {}
+        for rel, src in group:
+            canonical = first_by_digest.setdefault(content_digest(src), rel)
+            if canonical != rel:
+                aliases[rel] = canonical
+    return aliases
+
+
+def alias_manifest(aliases: Dict[str, str]) -> bytes:
+    data = {
+        "version": ALIAS_MANIFEST_VERSION,
+        "aliases": {_posix(alias): _posix(target) for alias, target in sorted(aliases.items())},
+    }
+    return json.dumps(data, indent=1, sort_keys=True).encode("utf-8")
+
+
+def read_aliases(zf: zipfile.ZipFile) -> Dict[str, str]:
+    """The alias map of an open package, empty if it was built without dedup"""
+    try:
+        raw = zf.read(ALIAS_MANIFEST)
+    except KeyError:
+        return {}
+    data = json.loads(raw.decode("utf-8"))
+    if data.get("version") != ALIAS_MANIFEST_VERSION:
+        raise ValueError(f"Unsupported alias manifest version: {data.get('version')!r}")
+    return data["aliases"]
+
+
+def _safe_join(root: str, rel: str) -> str:
+    path = os.path.normpath(os.path.join(root, *rel.split("/")))
+    if os.path.commonpath([os.path.abspath(root), os.path.abspath(path)]) != os.path.abspath(root):
+        raise ValueError(f"Alias path escapes the package: {rel}")
+    return path
+
+
+def extract_package(package_path: str, dest: str) -> List[str]:
+    """Extract a package into ``dest``, materialising aliases; returns the file paths"""
+    with zipfile.ZipFile(package_path) as zf:
+        zf.extractall(dest)
+        names = [n for n in zf.namelist() if not n.endswith("/")]
+        aliases = read_aliases(zf)
+        for alias, target in aliases.items():
+            path = _safe_join(dest, alias)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with zf.open(target) as src, open(path, "wb") as out:
+                for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                    out.write(chunk)
+    return names + list(aliases)
@@ -0,0 +1,473 @@
+"""Whitespace and comment minifiers for HTML, CSS and JS.
+
+The build runs these before obfuscation; they can also be used on their own:
+
+    python -m byhunide.build.minify src/ --out dist/
+    python -m byhunide.build.minify app.js style.css
+
+Each minifier makes one pass to split out strings, template literals,
+regular expressions, comments and ``<pre>``/``<textarea>`` content, which are
+kept verbatim (comments are dropped), and squeezes whitespace in the code
+between them only where it cannot change meaning. JS keeps line breaks
+wherever automatic semicolon insertion could depend on them.
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+_JS_WS = r"[ \t\f\v\u00a0\ufeff]"
+_JS_NL = r"[\n\r\u2028\u2029]"
+
+# Everything whose content must be kept verbatim (or dropped, for comments).
+# The code between two of these matches is handled with whole-segment regex
+# passes below, so the Python-level loop runs once per string/comment rather
+# than once per token. Every branch starts with a literal character so the
+# regex engine can skip straight to candidates.
+_JS_SPECIAL = re.compile(
+    r"""
+    /(?:
+        (?P<line_comment>/[^\n\r\u2028\u2029]*)
+      | (?P<license>\*![\s\S]*?(?:\*/|\Z))
+      | (?P<block_comment>\*[\s\S]*?(?:\*/|\Z))
+      | (?P<slash>)
+    )
+  | "(?P<dq_string>(?:[^"\\\n\r]|\\[\s\S])*"?)
+  | '(?P<sq_string>(?:[^'\\\n\r]|\\[\s\S])*'?)
+  | `(?P<template>)
+    """,
+    re.VERBOSE,
+)
+_JS_REGEX_LITERAL = re.compile(r"/(?![*/])(?:[^/\\\[\n\r]|\\.|\[(?:[^\]\\\n\r]|\\.)*\])+/[\w$]*")
+_JS_TRAILING_WORD = re.compile(r"[\w$]+$")
+# The patterns below all start with a literal so the regex engine can skip
+# ahead quickly; lookbehinds come after the consumed character.
+_JS_SPACE_RUN = re.compile(f"{_JS_WS}+")
+_JS_NEWLINE_RUN = re.compile(f"{_JS_NL}[ \\n\\r\\u2028\\u2029]*")
+# A line break right after "{;,([=:?&|*%<>!~^", or right before
+# ")]},;:?=&|*%<>", can never end a statement, so it only needs to be a space.
+_JS_SOFT_NEWLINE = re.compile(r"\n(?:(?<=[{;,(\[=:?&|*%<>!~^]\n)|(?=[)\]},;:?=&|*%<>]))")
+# Spaces that must stay: between two identifier characters, in "+ +" /
+# "- -", before "/" or "*" after "/", in "1 .x", and inside "<!" / "->".
+_JS_KEEP_SPACE = re.compile(
+    r" (?:(?<=[\w$\\\x80-\U0010ffff] )(?=[\w$\\\x80-\U0010ffff])"
+    r"|(?<=[+\-] )(?=[+\-])|(?<=/ )(?=[/*])|(?<=\d )(?=\.)|(?<=< )(?=!)|(?<=- )(?=>))"
+)
+_KEPT_SPACE = "\x01"
+
+# A "/" after one of these keywords starts a regular expression, not a division.
+_JS_REGEX_KEYWORDS = {
+    "return", "typeof", "instanceof", "in", "of", "new", "delete", "void",
+    "throw", "case", "do", "else", "yield", "await",
+}
+
+
+def _scan_js_string(text: str, i: int) -> int:
+    """Return the index just past the string literal starting at ``i``"""
+    quote = text[i]
+    n = len(text)
+    i += 1
+    while i < n:
+        c = text[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == quote:
+            return i + 1
+        if c in "\n\r":
+            return i
+        i += 1
+    return n
+
+
+def _scan_js_template(text: str, i: int) -> int:
+    """Return the index just past the template literal starting at ``i``"""
+    n = len(text)
+    i += 1
+    while i < n:
+        c = text[i]
+        if c == "\\":
+            i += 2
+        elif c == "`":
+            return i + 1
+        elif c == "$" and text.startswith("{", i + 1):
+            i = _scan_js_braces(text, i + 1)
+        else:
+            i += 1
+    return n
+
+
+def _scan_js_braces(text: str, i: int) -> int:
+    """Skip a balanced ``{...}`` block (a template substitution) starting at ``i``"""
+    n = len(text)
+    depth = 0
+    while i < n:
+        c = text[i]
+        if c in "'\"":
+            i = _scan_js_string(text, i)
+            continue
+        if c == "`":
+            i = _scan_js_template(text, i)
+            continue
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return n
+
+
+def _js_regex_allowed(last: str, last_is_code: bool) -> bool:
+    """Whether a "/" following the significant text ``last`` starts a regular expression"""
+    if not last:
+        return True
+    if not last_is_code:
+        return False
+    c = last[-1]
+    if c.isalnum() or c in "_$\\" or ord(c) > 127:
+        word = _JS_TRAILING_WORD.search(last)
+        return word is not None and word.group() in _JS_REGEX_KEYWORDS
+    if c in ")]}":
+        return False
+    return not last.endswith(("++", "--"))
+
+
+def _minify_js_code(code: str, prev: str, nxt: str) -> str:
+    """Squeeze whitespace in a run of code that holds no strings, comments or regexes.
+
+    ``prev``/``nxt`` are the characters on either side of the run, so the
+    rules also see across its edges.
+    """
+    code = prev + code + nxt
+    code = _JS_SPACE_RUN.sub(" ", code)
+    code = _JS_NEWLINE_RUN.sub("\n", code).replace(" \n", "\n")
+    code = _JS_SOFT_NEWLINE.sub(" ", code)
+    if " " in code:
+        code = _JS_KEEP_SPACE.sub(_KEPT_SPACE, code)
+        code = code.replace(" ", "").replace(_KEPT_SPACE, " ")
+    return code[len(prev):len(code) - len(nxt)]
+
+
+def minify_js(text: str) -> str:
+    # Split into code runs and verbatim tokens (strings, templates, regexes,
+    # license comments); comments become whitespace inside the code runs.
+    parts: List[Tuple[bool, str]] = []  # (is_code, text)
+    code: List[str] = []
+    last = ""  # last significant code or token, for regex detection
+    last_is_code = False
+    n = len(text)
+    pos = 0
+    search = _JS_SPECIAL.search
+
+    def flush() -> None:
+        if code:
+            parts.append((True, "".join(code)))
+            code.clear()
+
+    while pos < n:
+        m = search(text, pos)
+        if m is None:
+            code.append(text[pos:])
+            break
+        start = m.start()
+        if start > pos:
+            chunk = text[pos:start]
+            code.append(chunk)
+            if not chunk.isspace():
+                last = chunk.rstrip()
+                last_is_code = True
+        kind = m.lastgroup
+        end = m.end()
+        if kind == "line_comment":
+            code.append(" ")
+        elif kind == "block_comment":
+            code.append("\n" if re.search(_JS_NL, m.group()) else " ")
+        elif kind == "slash":
+            rm = _JS_REGEX_LITERAL.match(text, start) if _js_regex_allowed(last, last_is_code) else None
+            if rm is None:
+                code.append("/")
+                last = (last + "/") if last_is_code else "/"
+                last_is_code = True
+            else:
+                end = rm.end()
+                flush()
+                parts.append((False, rm.group()))
+                last, last_is_code = rm.group(), False
+        else:
+            if kind == "template":
+                end = _scan_js_template(text, start)
+            token = text[start:end]
+            flush()
+            parts.append((False, token))
+            if kind == "license":
+                code.append("\n")
+            else:
+                last, last_is_code = token, False
+        pos = end
+    flush()
+
+    out: List[str] = []
+    for idx, (is_code, chunk) in enumerate(parts):
+        if not is_code:
+            out.append(chunk)
+            continue
+        prev = parts[idx - 1][1][-1] if idx > 0 else ";"
+        nxt = parts[idx + 1][1][0] if idx + 1 < len(parts) else ";"
+        out.append(_minify_js_code(chunk, prev, nxt))
+    return "".join(out)
+
+
+_CSS_SPECIAL = re.compile(
+    r"""
+    (?P<comment>/\*[\s\S]*?(?:\*/|\Z))
+  | (?P<string>"(?:[^"\\]|\\[\s\S])*"?|'(?:[^'\\]|\\[\s\S])*'?)
+  | (?P<url>url(?<![\w-]url)\([^)"']*\))
+    """,
+    re.VERBOSE | re.IGNORECASE,
+)
+_CSS_WS_RUN = re.compile(r"[ \t\n\r\f]+")
+_CSS_NO_SPACE = re.compile(r" (?:(?=[{};,>)!])|(?<=[{};,>(:] ))")
+# In a selector ("a :hover") the space before ":" matters; in a declaration
+# the ":" is followed by ";" or "}" before any "{".
+_CSS_DECLARATION_COLON_SPACE = re.compile(r" (?=:[^{};]*[;}])")
+_CSS_TRAILING_SEMICOLON = re.compile(r";+(?=})")
+
+
+def _minify_css_code(code: str, prev: str, nxt: str) -> str:
+    code = prev + code + nxt
+    code = _CSS_WS_RUN.sub(" ", code)
+    code = _CSS_NO_SPACE.sub("", code)
+    code = _CSS_DECLARATION_COLON_SPACE.sub("", code)
+    code = _CSS_TRAILING_SEMICOLON.sub("", code)
+    return code[len(prev):len(code) - len(nxt)]
+
+
+def minify_css(text: str) -> str:
+    parts: List[Tuple[bool, str]] = []
+    code: List[str] = []
+    pos = 0
+    for m in _CSS_SPECIAL.finditer(text):
+        code.append(text[pos:m.start()])
+        if m.lastgroup == "comment":
+            code.append(" ")
+        else:
+            parts.append((True, "".join(code)))
+            code.clear()
+            parts.append((False, m.group()))
+        pos = m.end()
+    code.append(text[pos:])
+    parts.append((True, "".join(code)))
+
+    out: List[str] = []
+    for idx, (is_code, chunk) in enumerate(parts):
+        if not is_code:
+            out.append(chunk)
+            continue
+        prev = parts[idx - 1][1][-1] if idx > 0 else "{"
+        nxt = parts[idx + 1][1][0] if idx + 1 < len(parts) else "}"
+        out.append(_minify_css_code(chunk, prev, nxt))
+    return "".join(out)
+
+
+_HTML_WS = " \t\n\r\f"
+_HTML_RAW_TAGS = {"script", "style", "pre", "textarea"}
+# Whitespace next to these tags is never rendered, so it can be dropped.
+_HTML_BLOCK_TAGS = {
+    "!doctype", "address", "article", "aside", "base", "blockquote", "body", "caption", "col",
+    "colgroup", "dd", "details", "dialog", "div", "dl", "dt", "fieldset", "figcaption", "figure",
+    "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "head", "header", "hgroup", "hr", "html",
+    "li", "link", "main", "menu", "meta", "nav", "noscript", "ol", "optgroup", "option", "p",
+    "pre", "script", "section", "style", "summary", "table", "tbody", "td", "template", "tfoot", "th",
+    "thead", "title", "tr", "ul",
+}
+_JS_SCRIPT_TYPES = {"", "text/javascript", "application/javascript", "module", "text/ecmascript"}
+
+_HTML_WS_RUN = re.compile(r"[ \t\n\r\f]+")
+_HTML_MARKUP = re.compile(
+    r"""<(?:
+        (?P<comment>!--[\s\S]*?(?:-->|\Z))
+      | (?P<close>/?)(?P<name>[A-Za-z!][^\s/>]*)(?:[^>"']|"[^"]*"|'[^']*')*>?
+    )""",
+    re.VERBOSE,
+)
+_HTML_TAG_NEEDS_WORK = re.compile(r"[\t\n\r\f]|  | >")
+_HTML_TAG_WS = re.compile(r"""("[^"]*"|'[^']*')|[ \t\n\r\f]+(?=(/?>)?)""")
+_HTML_SCRIPT_TYPE = re.compile(r"""\stype\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.IGNORECASE)
+_HTML_RAW_CLOSE = {name: re.compile(f"</{name}", re.IGNORECASE) for name in _HTML_RAW_TAGS}
+
+
+def _minify_tag(tag: str) -> str:
+    """Collapse whitespace between attributes, leaving quoted values alone"""
+    if _HTML_TAG_NEEDS_WORK.search(tag) is None:
+        return tag
+
+    def repl(m) -> str:
+        if m.group(1):
+            return m.group(1)
+        return "" if m.group(2) == ">" else " "
+
+    return _HTML_TAG_WS.sub(repl, tag)
+
+
+def _script_type(tag: str) -> str:
+    m = _HTML_SCRIPT_TYPE.search(tag)
+    if m is None:
+        return ""
+    return next(g for g in m.groups() if g is not None).strip().lower()
+
+
+def minify_html(text: str) -> str:
+    # Split into ("tag", name, text) and ("text", "", text) parts first, so
+    # whitespace handling can look at the tags on both sides of a text run.
+    parts: List[Tuple[str, str, str]] = []
+    n = len(text)
+    pos = 0
+    search = _HTML_MARKUP.search
+
+    def add_text(chunk: str) -> None:
+        # Text on both sides of a dropped comment becomes one run.
+        if parts and parts[-1][0] == "text":
+            parts[-1] = ("text", "", parts[-1][2] + chunk)
+        else:
+            parts.append(("text", "", chunk))
+
+    while pos < n:
+        m = search(text, pos)
+        if m is None:
+            add_text(text[pos:])
+            break
+        start = m.start()
+        if start > pos:
+            add_text(text[pos:start])
+        pos = m.end()
+        if m.group("comment") is not None:
+            if m.group("comment").startswith(("!--[if", "!--<![endif")):
+                parts.append(("raw", "", m.group()))
+            continue
+        tag = m.group()
+        name = m.group("name").lower()
+        parts.append(("tag", name, _minify_tag(tag)))
+        if name in _HTML_RAW_TAGS and not m.group("close"):
+            close = _HTML_RAW_CLOSE[name].search(text, pos)
+            close_at = n if close is None else close.start()
+            body = text[pos:close_at]
+            if name == "script" and _script_type(tag) in _JS_SCRIPT_TYPES:
+                body = minify_js(body)
+            elif name == "style":
+                body = minify_css(body)
+            if body:
+                parts.append(("raw", "", body))
+            pos = close_at
+
+    out: List[str] = []
+    for idx, (kind, name, chunk) in enumerate(parts):
+        if kind != "text":
+            out.append(chunk)
+            continue
+        prev_name = parts[idx - 1][1] if idx > 0 else "html"
+        next_name = parts[idx + 1][1] if idx + 1 < len(parts) else "html"
+        if prev_name in _HTML_BLOCK_TAGS:
+            chunk = chunk.lstrip(_HTML_WS)
+        if next_name in _HTML_BLOCK_TAGS:
+            chunk = chunk.rstrip(_HTML_WS)
+        if chunk:
+            out.append(_HTML_WS_RUN.sub(" ", chunk))
+    return "".join(out)
+
+
+MINIFIERS: Dict[str, Callable[[str], str]] = {
+    ".js": minify_js,
+    ".css": minify_css,
+    ".html": minify_html,
+}
+
+
+def minify_text(ext: str, text: str) -> str:
+    """Minify ``text`` by file extension; unknown extensions are returned unchanged"""
+    fn = MINIFIERS.get(ext.lower())
+    return fn(text) if fn is not None else text
+
+
+@dataclass
+class MinifyResult:
+    path: str
+    original_bytes: int
+    minified_bytes: int
+    seconds: float
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.original_bytes - self.minified_bytes
+
+    @property
+    def saved_ratio(self) -> float:
+        return self.saved_bytes / self.original_bytes if self.original_bytes else 0.0
+
+
+def minify_file(path: str, out_path: Optional[str] = None) -> MinifyResult:
+    """Minify one file, writing to ``out_path`` when given, and report the savings"""
+    _, ext = os.path.splitext(path)
+    with open(path, "rb") as f:
+        data = f.read()
+    start = time.perf_counter()
+    out = minify_text(ext, data.decode("utf-8", errors="replace")).encode("utf-8")
+    seconds = time.perf_counter() - start
+    if out_path is not None:
+        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+        with open(out_path, "wb") as f:
+            f.write(out)
+    return MinifyResult(path, len(data), len(out), seconds)
+
+
+def _iter_targets(paths: List[str]):
+    from byhunide.build.compiler import _iter_project_files
+
+    for path in paths:
+        if os.path.isdir(path):
+            for rel, src, ext in _iter_project_files(path, set()):
+                if ext in MINIFIERS:
+                    yield src, path, rel
+        else:
+            yield path, os.path.dirname(path), os.path.basename(path)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m byhunide.build.minify", description="Minify HTML, CSS and JS files.")
+    parser.add_argument("paths", nargs="+", help="files or project folders")
+    parser.add_argument("--out", help="write minified copies under this folder")
+    parser.add_argument("--in-place", action="store_true", help="overwrite the source files")
+    args = parser.parse_args(argv)
+    if args.out and args.in_place:
+        parser.error("--out and --in-place are mutually exclusive")
+
+    results = []
+    for src, base, rel in _iter_targets(args.paths):
+        out_path = None
+        if args.in_place:
+            out_path = src
+        elif args.out:
+            out_path = os.path.join(args.out, rel)
+        try:
+            results.append(minify_file(src, out_path))
+        except OSError as e:
+            print(f"{src}: {e}", file=sys.stderr)
+            return 1
+
+    print(f"{'file':<48}{'before':>10}{'after':>10}{'saved':>8}")
+    for r in results:
+        print(f"{r.path:<48}{r.original_bytes:>10}{r.minified_bytes:>10}{r.saved_ratio:>8.1%}")
+    before = sum(r.original_bytes for r in results)
+    after = sum(r.minified_bytes for r in results)
+    print(f"{'total':<48}{before:>10}{after:>10}{(1 - after / before if before else 0):>8.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
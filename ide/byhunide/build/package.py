@@ -0,0 +1,362 @@
+"""Indexed ``.byhunpkg`` packages.
+
+An alternative to the ZIP output built for random access: a fixed header
+at offset 0 points to a JSON manifest that lists every entry's offset,
+sizes, compression method and SHA-256, so a reader can memory-map the file
+and fetch (and verify) single entries on demand without scanning it.
+
+Layout::
+
+    header    MAGIC, version, flags, entry count, manifest offset, manifest size
+    payloads  raw deflate or stored bytes, index.html and critical assets first
+    manifest  {"version": 1, "entries": [{"path", "offset", "size",
+               "stored_size", "method", "crc32", "sha256"[, "alias_of"]}, ...]}
+
+All integers are little-endian. ``sha256`` covers the payload as stored, so
+an entry can be verified before it is inflated. Deduplicated paths are
+manifest entries sharing their target's payload.
+
+The ByHun app does not read this format yet. Its own ``.byhun`` files are
+AES-encrypted ZIPs, so packages use a separate extension.
+"""
+
+import fnmatch
+import hashlib
+import json
+import mmap
+import os
+import posixpath
+import re
+import struct
+import zipfile
+import zlib
+from typing import Any, BinaryIO, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from byhunide.build.archive import CHUNK_SIZE, CompressedEntry, DateTime
+
+
+PACKAGE_EXTENSION = ".byhunpkg"
+MAGIC = b"BYHUNPKG"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sHHIQQ")
+
+_METHOD_NAMES = {zipfile.ZIP_STORED: "store", zipfile.ZIP_DEFLATED: "deflate"}
+_METHODS = {name: method for method, name in _METHOD_NAMES.items()}
+
+
+class PackageError(ValueError):
+    pass
+
+
+class PackageRecord(NamedTuple):
+    name: str
+    offset: int
+    size: int
+    compress_size: int
+    method: int
+    crc: int
+    sha256: str
+    alias_of: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        d = {
+            "path": self.name,
+            "offset": self.offset,
+            "size": self.size,
+            "stored_size": self.compress_size,
+            "method": _METHOD_NAMES[self.method],
+            "crc32": self.crc,
+            "sha256": self.sha256,
+        }
+        if self.alias_of is not None:
+            d["alias_of"] = self.alias_of
+        return d
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "PackageRecord":
+        try:
+            return cls(
+                d["path"], d["offset"], d["size"], d["stored_size"], _METHODS[d["method"]],
+                d["crc32"], d["sha256"], d.get("alias_of"),
+            )
+        except (KeyError, TypeError) as e:
+            raise PackageError(f"Invalid manifest entry {d!r}") from e
+
+
+def _entry_name(name: str) -> str:
+    return name.replace(os.sep, "/").lstrip("/")
+
+
+def _read_manifest(fp: BinaryIO) -> Tuple[int, List[PackageRecord]]:
+    header = fp.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise PackageError("Not a ByHun package: file too short")
+    magic, version, _, count, offset, size = _HEADER.unpack(header)
+    if magic != MAGIC:
+        raise PackageError("Not a ByHun package")
+    if version != FORMAT_VERSION:
+        raise PackageError(f"Unsupported ByHun package version {version}")
+    fp.seek(offset)
+    raw = fp.read(size)
+    if len(raw) != size:
+        raise PackageError("Truncated ByHun package manifest")
+    records = [PackageRecord.from_dict(d) for d in json.loads(raw.decode("utf-8"))["entries"]]
+    if len(records) != count:
+        raise PackageError("ByHun package manifest does not match its header")
+    return offset, records
+
+
+class PackageWriter:
+    """Write a ``.byhunpkg`` package; same entry interface as ``ZipStreamWriter``.
+
+    Entry timestamps are not stored, so ``date_time`` arguments are ignored.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fp: BinaryIO = open(path, "wb")
+        self._fp.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, 0, 0, 0))
+        self._records: Dict[str, PackageRecord] = {}
+        self._close_on_error = False
+
+    @classmethod
+    def append(cls, path: str) -> "PackageWriter":
+        """Reopen a package to replace, remove or add entries in place.
+
+        New payloads overwrite the old manifest, which is rewritten on close;
+        superseded payloads stay in the file, unreferenced.
+        """
+        writer = cls.__new__(cls)
+        writer.path = path
+        writer._fp = open(path, "r+b")
+        try:
+            offset, records = _read_manifest(writer._fp)
+        except Exception:
+            writer._fp.close()
+            raise
+        writer._records = {r.name: r for r in records}
+        writer._fp.seek(offset)
+        writer._fp.truncate()
+        writer._close_on_error = True
+        return writer
+
+    def __enter__(self) -> "PackageWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None or self._close_on_error:
+            self.close()
+        else:
+            self._fp.close()
+
+    def _claim(self, name: str) -> str:
+        name = _entry_name(name)
+        if name in self._records:
+            raise ValueError(f"Duplicate package entry: {name}")
+        return name
+
+    def add_entry(self, name: str, entry: CompressedEntry, date_time: Optional[DateTime] = None) -> PackageRecord:
+        name = self._claim(name)
+        offset = self._fp.tell()
+        self._fp.write(entry.payload)
+        digest = hashlib.sha256(entry.payload).hexdigest()
+        record = PackageRecord(name, offset, entry.size, len(entry.payload), entry.method, entry.crc, digest)
+        self._records[name] = record
+        return record
+
+    def add_chunks(
+        self,
+        name: str,
+        chunks: Iterable[bytes],
+        compress: bool = True,
+        level: int = zlib.Z_DEFAULT_COMPRESSION,
+        date_time: Optional[DateTime] = None,
+    ) -> PackageRecord:
+        name = self._claim(name)
+        offset = self._fp.tell()
+        co = zlib.compressobj(level, zlib.DEFLATED, -15) if compress else None
+        hasher = hashlib.sha256()
+        crc = 0
+        size = 0
+        compress_size = 0
+        for chunk in chunks:
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+            out = co.compress(chunk) if co is not None else chunk
+            hasher.update(out)
+            compress_size += len(out)
+            self._fp.write(out)
+        if co is not None:
+            tail = co.flush()
+            hasher.update(tail)
+            compress_size += len(tail)
+            self._fp.write(tail)
+        method = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+        record = PackageRecord(name, offset, size, compress_size, method, crc, hasher.hexdigest())
+        self._records[name] = record
+        return record
+
+    def add_stream(
+        self,
+        name: str,
+        src: BinaryIO,
+        compress: bool = True,
+        level: int = zlib.Z_DEFAULT_COMPRESSION,
+        date_time: Optional[DateTime] = None,
+    ) -> PackageRecord:
+        return self.add_chunks(name, iter(lambda: src.read(CHUNK_SIZE), b""), compress, level, date_time)
+
+    def add_alias(self, name: str, target: str) -> PackageRecord:
+        """List ``name`` in the manifest as another path for ``target``'s payload"""
+        name = self._claim(name)
+        target_record = self._records[_entry_name(target)]
+        record = target_record._replace(name=name, alias_of=target_record.name)
+        self._records[name] = record
+        return record
+
+    def remove(self, name: str) -> Optional[PackageRecord]:
+        return self._records.pop(_entry_name(name), None)
+
+    def unreferenced_bytes(self) -> int:
+        """Payload data written so far that no current entry points to"""
+        live = {(r.offset, r.compress_size) for r in self._records.values()}
+        return self._fp.tell() - _HEADER.size - sum(size for _, size in live)
+
+    def close(self) -> None:
+        if self._fp.closed:
+            return
+        manifest = json.dumps(
+            {"version": FORMAT_VERSION, "entries": [r.to_dict() for r in self._records.values()]},
+            separators=(",", ":"),
+        ).encode("utf-8")
+        offset = self._fp.tell()
+        self._fp.write(manifest)
+        self._fp.seek(0)
+        self._fp.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(self._records), offset, len(manifest)))
+        self._fp.close()
+
+
+class PackageReader:
+    """Random access to a ``.byhunpkg`` package through a memory map.
+
+    Only the header and manifest are read up front. Each payload is checked
+    against its SHA-256 the first time it is read.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            _, records = _read_manifest(self._file)
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        self._records = {r.name: r for r in records}
+        self._verified: Set[Tuple[int, int]] = set()
+
+    def __enter__(self) -> "PackageReader":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def namelist(self) -> List[str]:
+        return list(self._records)
+
+    def __contains__(self, name: str) -> bool:
+        return _entry_name(name) in self._records
+
+    def info(self, name: str) -> PackageRecord:
+        try:
+            return self._records[_entry_name(name)]
+        except KeyError:
+            raise KeyError(f"No entry named {name!r} in {self.path}") from None
+
+    def read_payload(self, name: str, verify: bool = True) -> bytes:
+        """The entry's bytes as stored (possibly deflated)"""
+        r = self.info(name)
+        if r.offset + r.compress_size > len(self._map):
+            raise PackageError(f"Entry {r.name} lies outside the package")
+        payload = self._map[r.offset:r.offset + r.compress_size]
+        key = (r.offset, r.compress_size)
+        if verify and key not in self._verified:
+            if hashlib.sha256(payload).hexdigest() != r.sha256:
+                raise PackageError(f"Entry {r.name} failed its integrity check")
+            self._verified.add(key)
+        return payload
+
+    def read(self, name: str, verify: bool = True) -> bytes:
+        r = self.info(name)
+        payload = self.read_payload(name, verify)
+        data = zlib.decompress(payload, -15) if r.method == zipfile.ZIP_DEFLATED else payload
+        if len(data) != r.size:
+            raise PackageError(f"Entry {r.name} has the wrong size")
+        return data
+
+    def extract(self, dest: str) -> List[str]:
+        paths = []
+        for name in self._records:
+            path = os.path.normpath(os.path.join(dest, *name.split("/")))
+            if os.path.commonpath([os.path.abspath(dest), os.path.abspath(path)]) != os.path.abspath(dest):
+                raise PackageError(f"Entry path escapes the package: {name}")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(self.read(name))
+            paths.append(path)
+        return paths
+
+
+_LOCAL_REF = re.compile(r"""\b(?:src|href)\s*=\s*["']([^"'#?]+)""", re.IGNORECASE)
+
+
+def _index_references(index_path: str) -> List[str]:
+    """Project-relative paths that the root index.html loads directly"""
+    try:
+        with open(index_path, "r", encoding="utf-8", errors="replace") as f:
+            html = f.read()
+    except OSError:
+        return []
+    refs = []
+    for ref in _LOCAL_REF.findall(html):
+        ref = ref.strip()
+        if not ref or ref.startswith(("//", "data:")) or re.match(r"[a-zA-Z][a-zA-Z0-9+.-]*:", ref):
+            continue
+        refs.append(posixpath.normpath(ref.lstrip("/")))
+    return refs
+
+
+def critical_patterns(raw: Dict[str, Any]) -> List[str]:
+    """The ``critical`` globs of a build config's ``package`` section"""
+    if not isinstance(raw, dict):
+        raise ValueError("package settings must be an object")
+    patterns = raw.get("critical", [])
+    if not isinstance(patterns, list) or not all(isinstance(p, str) for p in patterns):
+        raise ValueError(f"package.critical must be a list of glob patterns, not {patterns!r}")
+    return patterns
+
+
+def critical_first(
+    files: Sequence[Tuple[str, str, str]],
+    project_root: str,
+    patterns: Sequence[str] = (),
+) -> List[Tuple[str, str, str]]:
+    """Reorder ``(rel, src, ext)`` so index.html, then what it references, then ``patterns`` come first"""
+    rank: Dict[str, int] = {"index.html": 0}
+    for ref in _index_references(os.path.join(project_root, "index.html")):
+        rank.setdefault(ref, 1)
+
+    def key(item: Tuple[int, Tuple[str, str, str]]) -> Tuple[int, int]:
+        i, (rel, _, _) = item
+        rel = rel.replace(os.sep, "/")
+        if rel in rank:
+            return rank[rel], i
+        if any(fnmatch.fnmatchcase(rel if "/" in p else posixpath.basename(rel), p) for p in patterns):
+            return 2, i
+        return 3, i
+
+    return [f for _, f in sorted(enumerate(files), key=key)]
@@ -0,0 +1,197 @@
+"""Named obfuscation profiles trading protection for app start-up latency.
+
+Run ``python -m byhunide.build.profiles`` to print the measured output size
+and decode cost of each profile.
+"""
+
+import random
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional, Tuple, Union
+
+
+# Rough decode throughput of a low-end Android WebView, used to turn the
+# measured decode work into a millisecond estimate. ``atob`` is native; the
+# ROT13/XOR decoders are character-at-a-time JS loops.
+NATIVE_DECODE_CHARS_PER_MS = 100_000
+SCRIPT_DECODE_CHARS_PER_MS = 5_000
+EVAL_COST_MS = 2.0
+
+
+@dataclass(frozen=True)
+class ObfuscationProfile:
+    name: str
+    description: str
+    # Payload encoding layers: 1 = base64, 2 = +ROT13, 3 = +XOR, 4 = +base64.
+    payload_layers: int
+    # Extra eval wrappers around the decoder (0-2).
+    wrapper_layers: int
+    # Range of dead-code statements injected into JS and CSS decoders.
+    js_dead_code: Tuple[int, int]
+    css_dead_code: Tuple[int, int]
+    # Whether to inject the anti-debug timers and integrity checks.
+    anti_debug: bool
+    # HTML chunk size range and whether odd chunks get an extra ROT13 pass.
+    html_chunk_size: Tuple[int, int]
+    html_rot13: bool
+
+
+PROFILES: Dict[str, ObfuscationProfile] = {
+    "fast": ObfuscationProfile(
+        name="fast",
+        description="Single base64 layer, no dead code or anti-debug timers.",
+        payload_layers=1,
+        wrapper_layers=0,
+        js_dead_code=(0, 0),
+        css_dead_code=(0, 0),
+        anti_debug=False,
+        html_chunk_size=(4096, 8192),
+        html_rot13=False,
+    ),
+    "balanced": ObfuscationProfile(
+        name="balanced",
+        description="Base64 + ROT13 payload, one wrapper, light dead code, no timers.",
+        payload_layers=2,
+        wrapper_layers=1,
+        js_dead_code=(2, 4),
+        css_dead_code=(1, 3),
+        anti_debug=False,
+        html_chunk_size=(512, 2048),
+        html_rot13=True,
+    ),
+    "max": ObfuscationProfile(
+        name="max",
+        description="All encoding layers, two wrappers, dead code and anti-debug timers.",
+        payload_layers=4,
+        wrapper_layers=2,
+        js_dead_code=(5, 10),
+        css_dead_code=(3, 6),
+        anti_debug=True,
+        html_chunk_size=(100, 500),
+        html_rot13=True,
+    ),
+}
+
+DEFAULT_PROFILE = "max"
+
+ProfileLike = Union[None, str, ObfuscationProfile]
+
+
+def get_profile(profile: ProfileLike = None) -> ObfuscationProfile:
+    if profile is None:
+        return PROFILES[DEFAULT_PROFILE]
+    if isinstance(profile, ObfuscationProfile):
+        return profile
+    try:
+        return PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown obfuscation profile: {profile!r} (expected one of {', '.join(PROFILES)})")
+
+
+class DecodeCost:
+    """Tally of the work the generated code does at page load"""
+
+    def __init__(self):
+        self.native_chars = 0
+        self.script_chars = 0
+        self.evals = 0
+        self.timers = 0
+
+    def atob(self, n: int) -> None:
+        self.native_chars += n
+
+    def loop(self, n: int) -> None:
+        self.script_chars += n
+
+    @property
+    def estimated_ms(self) -> float:
+        return (
+            self.native_chars / NATIVE_DECODE_CHARS_PER_MS
+            + self.script_chars / SCRIPT_DECODE_CHARS_PER_MS
+            + self.evals * EVAL_COST_MS
+        )
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "native_decode_chars": self.native_chars,
+            "script_decode_chars": self.script_chars,
+            "evals": self.evals,
+            "timers": self.timers,
+            "estimated_decode_ms": round(self.estimated_ms, 3),
+        }
+
+
+class NullDecodeCost(DecodeCost):
+    """Discards the tally; used when streaming, where layer sizes are unknown up front"""
+
+    def atob(self, n: Optional[int]) -> None:
+        pass
+
+    def loop(self, n: Optional[int]) -> None:
+        pass
+
+
+_SAMPLE_JS = (
+    "function greet(name){\n  var el=document.getElementById('out');\n"
+    "  el.textContent='Hello, '+name+'!';\n  return el;\n}\n"
+    "window.addEventListener('load',function(){greet('ByHun');});\n"
+)
+_SAMPLE_CSS = "body{margin:0;font-family:sans-serif}\n.card{padding:12px;border-radius:8px;color:#333}\n"
+_SAMPLE_HTML = (
+    "<!doctype html><html><head><meta charset=\"utf-8\"><title>App</title></head>"
+    "<body><main class=\"card\"><h1>Hello</h1><p id=\"out\"></p></main></body></html>\n"
+)
+
+
+def measure_profile(
+    profile: ProfileLike,
+    samples: Optional[Dict[str, str]] = None,
+    seed: int = 0,
+) -> Dict[str, Dict[str, float]]:
+    """Obfuscate sample sources with ``profile`` and report output size and decode cost.
+
+    ``samples`` maps an extension (".js", ".css", ".html") to source text; a
+    small built-in sample is used for any extension left out.
+    """
+    from byhunide.build.compiler import obfuscate_text
+
+    profile = get_profile(profile)
+    sources = {".js": _SAMPLE_JS, ".css": _SAMPLE_CSS, ".html": _SAMPLE_HTML}
+    if samples:
+        sources.update(samples)
+
+    results: Dict[str, Dict[str, float]] = {}
+    for ext, text in sources.items():
+        cost = DecodeCost()
+        out = obfuscate_text(ext, text, random.Random(seed), profile, cost)
+        in_size = len(text.encode("utf-8"))
+        out_size = len(out.encode("utf-8"))
+        entry: Dict[str, float] = {
+            "input_bytes": in_size,
+            "output_bytes": out_size,
+            "size_ratio": round(out_size / in_size, 2) if in_size else 0.0,
+        }
+        entry.update(cost.to_dict())
+        results[ext] = entry
+    return results
+
+
+def profile_summary() -> Dict[str, Dict]:
+    return {
+        name: {"profile": asdict(p), "measured": measure_profile(p)}
+        for name, p in PROFILES.items()
+    }
+
+
+def main() -> int:
+    print(f"{'profile':<10}{'type':<7}{'in':>8}{'out':>9}{'ratio':>8}{'evals':>7}{'timers':>8}{'decode ms':>11}")
+    for name, summary in profile_summary().items():
+        for ext, m in summary["measured"].items():
+            print(
+                f"{name:<10}{ext:<7}{m['input_bytes']:>8}{m['output_bytes']:>9}{m['size_ratio']:>8}"
+                f"{m['evals']:>7}{m['timers']:>8}{m['estimated_decode_ms']:>11}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,200 @@
+"""Structured results of a project build."""
+
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+
+# FileReport.cache values
+CACHE_HIT = "hit"
+CACHE_MISS = "miss"
+CACHE_DISABLED = "disabled"
+CACHE_BYPASSED = "bypassed"  # large-file mode never uses the cache
+CACHE_NOT_APPLICABLE = "n/a"  # files copied without transformation
+
+
+@dataclass
+class FileReport:
+    path: str
+    kind: str  # "transform", "stream" (large-file mode), "copy" or "alias" (dedup)
+    cache: str
+    input_bytes: int = 0
+    # Size after minification, when the file was minified in this build.
+    minified_bytes: Optional[int] = None
+    output_bytes: int = 0
+    compressed_bytes: int = 0
+    read_s: float = 0.0
+    minify_s: float = 0.0
+    transform_s: float = 0.0
+    compress_s: float = 0.0
+    compression: str = ""  # "deflate" or "store"
+    compression_level: Optional[int] = None
+    # Stored entries only: estimated deflate time skipped, and the bytes
+    # deflate would have saved (negative if it would have grown the entry).
+    skipped_deflate_s: float = 0.0
+    skipped_deflate_bytes: int = 0
+    # Path of the identical file this one was deduplicated against.
+    alias_of: Optional[str] = None
+    # Scripts and stylesheets inlined into this page by the bundling stage.
+    bundled: List[str] = field(default_factory=list)
+
+    @property
+    def total_s(self) -> float:
+        return self.read_s + self.minify_s + self.transform_s + self.compress_s
+
+    @property
+    def minify_saved_bytes(self) -> int:
+        return self.input_bytes - self.minified_bytes if self.minified_bytes is not None else 0
+
+    @property
+    def compression_ratio(self) -> float:
+        """Compressed size as a fraction of the (transformed) output size"""
+        return self.compressed_bytes / self.output_bytes if self.output_bytes else 0.0
+
+    def to_dict(self) -> Dict:
+        d = asdict(self)
+        for k in ("read_s", "minify_s", "transform_s", "compress_s", "skipped_deflate_s"):
+            d[k] = round(d[k], 6)
+        d["minify_saved_bytes"] = self.minify_saved_bytes
+        d["total_s"] = round(self.total_s, 6)
+        d["compression_ratio"] = round(self.compression_ratio, 4)
+        return d
+
+
+@dataclass
+class BuildResult:
+    project_root: str
+    out_path: str
+    profile: str
+    seed: Optional[int] = None
+    workers: int = 1
+    started_at: float = field(default_factory=time.time)
+    scan_s: float = 0.0
+    write_s: float = 0.0
+    total_s: float = 0.0
+    archive_bytes: int = 0
+    files: List[FileReport] = field(default_factory=list)
+
+    @property
+    def input_bytes(self) -> int:
+        return sum(f.input_bytes for f in self.files)
+
+    @property
+    def output_bytes(self) -> int:
+        return sum(f.output_bytes for f in self.files)
+
+    @property
+    def compressed_bytes(self) -> int:
+        return sum(f.compressed_bytes for f in self.files)
+
+    @property
+    def minify_saved_bytes(self) -> int:
+        return sum(f.minify_saved_bytes for f in self.files)
+
+    @property
+    def aliases(self) -> List[FileReport]:
+        return [f for f in self.files if f.kind == "alias"]
+
+    @property
+    def stored(self) -> List[FileReport]:
+        return [f for f in self.files if f.compression == "store"]
+
+    def cache_count(self, status: str) -> int:
+        return sum(1 for f in self.files if f.cache == status)
+
+    def slowest(self, n: int = 5) -> List[FileReport]:
+        return sorted(self.files, key=lambda f: f.total_s, reverse=True)[:n]
+
+    def largest(self, n: int = 5) -> List[FileReport]:
+        return sorted(self.files, key=lambda f: f.compressed_bytes, reverse=True)[:n]
+
+    def to_dict(self) -> Dict:
+        return {
+            "project_root": self.project_root,
+            "out_path": self.out_path,
+            "profile": self.profile,
+            "seed": self.seed,
+            "workers": self.workers,
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(self.started_at)),
+            "scan_s": round(self.scan_s, 6),
+            "write_s": round(self.write_s, 6),
+            "total_s": round(self.total_s, 6),
+            "archive_bytes": self.archive_bytes,
+            "totals": {
+                "files": len(self.files),
+                "input_bytes": self.input_bytes,
+                "output_bytes": self.output_bytes,
+                "compressed_bytes": self.compressed_bytes,
+                "minify_saved_bytes": self.minify_saved_bytes,
+                "read_s": round(sum(f.read_s for f in self.files), 6),
+                "minify_s": round(sum(f.minify_s for f in self.files), 6),
+                "transform_s": round(sum(f.transform_s for f in self.files), 6),
+                "compress_s": round(sum(f.compress_s for f in self.files), 6),
+                "aliased_files": len(self.aliases),
+                "aliased_bytes": sum(f.input_bytes for f in self.aliases),
+                "stored_files": len(self.stored),
+                "skipped_deflate_s": round(sum(f.skipped_deflate_s for f in self.files), 6),
+                "skipped_deflate_bytes": sum(f.skipped_deflate_bytes for f in self.files),
+                "cache_hits": self.cache_count(CACHE_HIT),
+                "cache_misses": self.cache_count(CACHE_MISS),
+            },
+            "files": [f.to_dict() for f in self.files],
+        }
+
+    def write_json(self, path: Optional[str] = None) -> str:
+        """Write the result to ``path`` (default: next to the archive) and return the path"""
+        path = path or report_path(self.out_path)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+    def summary(self, top: int = 3) -> str:
+        lines = [
+            f"{len(self.files)} files, {_mb(self.input_bytes)} in -> {_mb(self.archive_bytes)} archive "
+            f"in {self.total_s:.2f} s",
+        ]
+        if self.cache_count(CACHE_DISABLED):
+            lines.append("Cache: disabled")
+        else:
+            lines.append(f"Cache: {self.cache_count(CACHE_HIT)} hits, {self.cache_count(CACHE_MISS)} misses")
+        minified = [f for f in self.files if f.minified_bytes is not None]
+        if minified:
+            lines.append(f"Minify: saved {_mb(self.minify_saved_bytes)} across {len(minified)} files")
+        pages = [f for f in self.files if f.bundled]
+        if pages:
+            inlined = sum(len(f.bundled) for f in pages)
+            lines.append(f"Bundle: inlined {inlined} scripts and stylesheets into {len(pages)} pages")
+        aliases = self.aliases
+        if aliases:
+            lines.append(
+                f"Dedup: {len(aliases)} duplicate files ({_mb(sum(f.input_bytes for f in aliases))}) stored once"
+            )
+        stored = self.stored
+        if stored:
+            skipped_s = sum(f.skipped_deflate_s for f in stored)
+            skipped_bytes = sum(f.skipped_deflate_bytes for f in stored)
+            lines.append(
+                f"Stored {len(stored)} files as-is: skipped ~{skipped_s:.2f} s of deflate "
+                f"for {skipped_bytes / 1024:+.1f} KB archive size"
+            )
+        lines += _top_lines("Slowest", self.slowest(top), lambda f: f"{f.total_s:.2f} s")
+        lines += _top_lines("Largest", self.largest(top), lambda f: _mb(f.compressed_bytes))
+        return "\n".join(lines)
+
+
+def report_path(out_path: str) -> str:
+    """``build.zip`` -> ``build.report.json``"""
+    return os.path.splitext(out_path)[0] + ".report.json"
+
+
+def _mb(n: int) -> str:
+    return f"{n / (1024 * 1024):.2f} MB"
+
+
+def _top_lines(title: str, files: Iterable[FileReport], fmt) -> List[str]:
+    files = list(files)
+    if not files:
+        return []
+    return [f"{title}:"] + [f"  {f.path} ({fmt(f)})" for f in files]
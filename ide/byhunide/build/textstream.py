@@ -0,0 +1,183 @@
+"""Lazily evaluated byte streams used to build obfuscated output.
+
+Each obfuscation layer (base64, ROT13, XOR, literal wrappers) is a node over
+other streams. Evaluating a node yields output in bounded chunks, so a large
+source can be encoded through every layer without ever holding the source,
+an intermediate layer or the result in memory at once. ``length`` is the
+exact output size in bytes when it can be known up front, otherwise None.
+"""
+
+import base64
+import codecs
+from typing import Iterable, Iterator, List, Optional
+
+from byhunide.build import codec
+
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def char_sum(text: str) -> int:
+    """Sum of the code points in ``text``"""
+    try:
+        return sum(text.encode("latin-1"))
+    except UnicodeEncodeError:
+        return sum(map(ord, text))
+
+
+class ByteStream:
+    length: Optional[int] = None
+
+    def chunks(self) -> Iterator[bytes]:
+        raise NotImplementedError
+
+    def read_all(self) -> bytes:
+        return b"".join(self.chunks())
+
+
+class Literal(ByteStream):
+    def __init__(self, text: str):
+        self.data = text.encode("utf-8")
+        self.length = len(self.data)
+
+    def chunks(self) -> Iterator[bytes]:
+        if self.data:
+            yield self.data
+
+
+class Concat(ByteStream):
+    def __init__(self, parts: List[ByteStream]):
+        self.parts = parts
+        lengths = [p.length for p in parts]
+        self.length = None if None in lengths else sum(lengths)
+
+    def chunks(self) -> Iterator[bytes]:
+        for part in self.parts:
+            yield from part.chunks()
+
+
+class Base64(ByteStream):
+    def __init__(self, inner: ByteStream):
+        self.inner = inner
+        n = inner.length
+        self.length = None if n is None else 4 * ((n + 2) // 3)
+
+    def chunks(self) -> Iterator[bytes]:
+        # Encode on 3-byte boundaries so chunked output equals one-shot output.
+        rest = b""
+        for chunk in self.inner.chunks():
+            if rest:
+                chunk = rest + chunk
+            cut = len(chunk) - len(chunk) % 3
+            rest = chunk[cut:]
+            if cut:
+                yield base64.b64encode(chunk[:cut] if rest else chunk)
+        if rest:
+            yield base64.b64encode(rest)
+
+
+class Rot13(ByteStream):
+    def __init__(self, inner: ByteStream):
+        self.inner = inner
+        self.length = inner.length
+
+    def chunks(self) -> Iterator[bytes]:
+        # Only ASCII letters change, so ROT13 over UTF-8 bytes equals ROT13 over text.
+        for chunk in self.inner.chunks():
+            yield codec.rot13_bytes(chunk)
+
+
+class Xor(ByteStream):
+    def __init__(self, inner: ByteStream, key: int):
+        self.inner = inner
+        self.key = key
+        self.length = inner.length
+
+    def chunks(self) -> Iterator[bytes]:
+        for chunk in self.inner.chunks():
+            yield codec.xor_bytes(chunk, self.key)
+
+
+class TextSource(ByteStream):
+    """UTF-8 source text, either held in memory or re-read from a file"""
+
+    def __init__(self, text: Optional[str] = None, path: Optional[str] = None, chunk_size: int = CHUNK_SIZE):
+        self.text = text
+        self.path = path
+        self.chunk_size = chunk_size
+        self.char_count = 0
+        self.checksum = 0
+        if text is not None:
+            self.data: Optional[bytes] = text.encode("utf-8")
+            self.length = len(self.data)
+            self.char_count = len(text)
+            self.checksum = char_sum(text)
+        else:
+            self.data = None
+
+    @classmethod
+    def from_text(cls, text: str) -> "TextSource":
+        return cls(text=text)
+
+    @classmethod
+    def from_file(cls, path: str, hasher=None, chunk_size: int = CHUNK_SIZE) -> "TextSource":
+        """Scan ``path`` once for its size, character count and checksum.
+
+        Raw bytes are also fed to ``hasher`` when given, so callers can derive
+        a content hash in the same pass.
+        """
+        source = cls(path=path, chunk_size=chunk_size)
+        length = 0
+        for raw, text in source._read():
+            if hasher is not None:
+                hasher.update(raw)
+            length += len(text.encode("utf-8"))
+            source.char_count += len(text)
+            source.checksum += char_sum(text)
+        source.length = length
+        return source
+
+    def _read(self) -> Iterable:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        with open(self.path, "rb") as f:
+            while True:
+                raw = f.read(self.chunk_size)
+                text = decoder.decode(raw, final=not raw)
+                if raw or text:
+                    yield raw, text
+                if not raw:
+                    break
+
+    def iter_text(self) -> Iterator[str]:
+        if self.text is not None:
+            if self.text:
+                yield self.text
+            return
+        for _, text in self._read():
+            if text:
+                yield text
+
+    def chunks(self) -> Iterator[bytes]:
+        if self.data is not None:
+            if self.data:
+                yield self.data
+            return
+        for text in self.iter_text():
+            yield text.encode("utf-8")
+
+
+def iter_sized_pieces(texts: Iterable[str], sizes: List[int]) -> Iterator[str]:
+    """Re-slice a stream of text chunks into consecutive pieces of ``sizes`` characters"""
+    buf = ""
+    it = iter(sizes)
+    want = next(it, None)
+    for text in texts:
+        buf = buf + text if buf else text
+        pos = 0
+        while want is not None and len(buf) - pos >= want:
+            yield buf[pos:pos + want]
+            pos += want
+            want = next(it, None)
+        buf = buf[pos:]
+    if buf and want is not None:
+        yield buf
@@ -0,0 +1,253 @@
+"""Keep a project's archive up to date while its files change.
+
+``ProjectWatcher`` polls the project tree. The first build is a regular
+``compile_project``. After that only changed and added files are
+re-transformed, and the archive is patched in place: their new entries are
+appended and the central directory (or package manifest) is rewritten
+(``ZipStreamWriter.append``, ``PackageWriter.append``). Superseded entry data is left behind and
+reclaimed by a full rebuild once it exceeds ``compaction_ratio`` of the
+archive.
+
+With bundling on, a page is rebuilt whenever a script or stylesheet it
+inlines changes. Pages are then never deduplicated, since identical page
+sources can inline different files.
+
+A full rebuild also happens when the build config changes, when a change
+touches a deduplicated file or makes a file identical to another one (so
+aliases always match a full build), and whenever an in-place update fails.
+"""
+
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from byhunide.build.bundle import bundle_dependencies
+from byhunide.build.cache import BuildCache
+from byhunide.build.compiler import (
+    DEFAULT_MEMORY_BUDGET,
+    _iter_project_files,
+    compile_project,
+    dedup_candidates,
+    excluded_build_files,
+    normalize_out_path,
+    reopen_archive_writer,
+    write_file_entry,
+)
+from byhunide.build.compression import CompressionPolicy
+from byhunide.build.config import build_config_path
+from byhunide.build.dedup import find_duplicates
+from byhunide.build.profiles import ProfileLike, get_profile
+from byhunide.build.report import BuildResult
+
+
+DEFAULT_INTERVAL = 0.5
+DEFAULT_COMPACTION_RATIO = 0.5
+
+# rel path -> (absolute path, mtime_ns, size)
+Snapshot = Dict[str, Tuple[str, int, int]]
+
+
+class WatchUpdate(NamedTuple):
+    changed: List[str]  # changed or added, relative to the project root
+    removed: List[str]
+    full_rebuild: bool
+    seconds: float
+    archive_bytes: int
+    # Set for full rebuilds.
+    result: Optional[BuildResult] = None
+
+
+def _stat_key(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class ProjectWatcher:
+    def __init__(
+        self,
+        project_root: str,
+        out_path: str,
+        cache: Optional[BuildCache] = None,
+        workers: int = 1,
+        seed: Optional[int] = None,
+        profile: ProfileLike = None,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+        minify: bool = True,
+        dedup: bool = False,
+        bundle: bool = False,
+        compaction_ratio: float = DEFAULT_COMPACTION_RATIO,
+    ):
+        self.project_root = project_root
+        self.out_path = normalize_out_path(out_path)
+        self.cache = cache
+        self.workers = workers
+        self.seed = seed
+        self.profile = get_profile(profile)
+        self.memory_budget = memory_budget
+        self.minify = minify
+        self.dedup = dedup
+        self.bundle = bundle
+        self.compaction_ratio = compaction_ratio
+        self._excluded = excluded_build_files(project_root, self.out_path)
+        self._snapshot: Snapshot = {}
+        self._config_key: Optional[Tuple[int, int]] = None
+        self._compression = CompressionPolicy()
+        self._deduplicated: Set[str] = set()
+        # Inlined file -> pages that inline it (bundle mode).
+        self._bundled_into: Dict[str, Set[str]] = {}
+        self._built = False
+        # Unreferenced entry data left in the archive by in-place updates.
+        self.dead_bytes = 0
+
+    def scan(self) -> Snapshot:
+        snapshot = {}
+        for rel, src, _ in _iter_project_files(self.project_root, self._excluded):
+            key = _stat_key(src)
+            if key is not None:
+                snapshot[rel] = (src, key[0], key[1])
+        return snapshot
+
+    def build(self) -> WatchUpdate:
+        """Rebuild the whole archive and start tracking changes from here"""
+        start = time.perf_counter()
+        # Snapshot first, so edits made during the build show up in the next poll.
+        snapshot = self.scan()
+        self._config_key = _stat_key(build_config_path(self.project_root))
+        self._compression = CompressionPolicy.for_project(self.project_root)
+        result = compile_project(
+            self.project_root,
+            self.out_path,
+            cache=self.cache,
+            workers=self.workers,
+            seed=self.seed,
+            profile=self.profile,
+            memory_budget=self.memory_budget,
+            minify=self.minify,
+            compression=self._compression,
+            dedup=self.dedup,
+            bundle=self.bundle,
+        )
+        self._deduplicated = set()
+        self._bundled_into = {}
+        for f in result.files:
+            if f.alias_of is not None:
+                self._deduplicated.update((f.path, f.alias_of))
+            self._track_bundled(f.path, f.bundled)
+        self._snapshot = snapshot
+        self._built = True
+        self.dead_bytes = 0
+        return WatchUpdate(sorted(snapshot), [], True, time.perf_counter() - start, result.archive_bytes, result)
+
+    def _track_bundled(self, page: str, inlined: List[str]) -> None:
+        for pages in self._bundled_into.values():
+            pages.discard(page)
+        for rel in inlined:
+            self._bundled_into.setdefault(rel, set()).add(page)
+
+    def _makes_duplicates(self, changed: List[str], snapshot: Snapshot) -> bool:
+        """Whether a changed or added file now has the same content as another file"""
+        files = [(rel, src, os.path.splitext(rel)[1].lower()) for rel, (src, _, _) in snapshot.items()]
+        groups: Dict[Tuple[str, int], List[Tuple[str, str, str]]] = defaultdict(list)
+        kinds = {}
+        for rel, src, kind in dedup_candidates(files, self.bundle):
+            groups[(kind, snapshot[rel][2])].append((rel, src, kind))
+            kinds[rel] = kind
+        for rel in changed:
+            if rel not in kinds:
+                continue
+            group = groups[(kinds[rel], snapshot[rel][2])]
+            # Only files of the same kind and size are hashed.
+            if len(group) > 1 and any(rel in pair for pair in find_duplicates(group).items()):
+                return True
+        return False
+
+    def _needs_full_build(self, changed: List[str], removed: List[str], snapshot: Snapshot) -> bool:
+        if not self._built or not os.path.exists(self.out_path):
+            return True
+        if _stat_key(build_config_path(self.project_root)) != self._config_key:
+            return True
+        if not self._deduplicated.isdisjoint(changed + removed):
+            return True
+        return self.dedup and self._makes_duplicates(changed, snapshot)
+
+    def update(self, changed: List[str], removed: List[str], snapshot: Snapshot) -> WatchUpdate:
+        """Patch the archive in place for the given changes"""
+        start = time.perf_counter()
+        with reopen_archive_writer(self.out_path) as zw:
+            for rel in removed:
+                zw.remove(rel)
+            for rel in changed:
+                zw.remove(rel)
+                write_file_entry(
+                    zw,
+                    rel,
+                    snapshot[rel][0],
+                    cache=self.cache,
+                    seed=self.seed,
+                    profile=self.profile,
+                    memory_budget=self.memory_budget,
+                    minify=self.minify,
+                    compression=self._compression,
+                    bundle=self.bundle,
+                    project_root=self.project_root,
+                    workers=self.workers,
+                )
+                self._snapshot[rel] = snapshot[rel]
+                if self.bundle and rel.lower().endswith(".html"):
+                    with open(snapshot[rel][0], "r", encoding="utf-8", errors="replace") as f:
+                        self._track_bundled(rel, bundle_dependencies(f.read(), rel, self.project_root))
+            self.dead_bytes = zw.unreferenced_bytes()
+        for rel in removed:
+            self._snapshot.pop(rel, None)
+        if self.cache is not None:
+            self.cache.save()
+        archive_bytes = os.path.getsize(self.out_path)
+        return WatchUpdate(changed, removed, False, time.perf_counter() - start, archive_bytes)
+
+    def poll(self) -> Optional[WatchUpdate]:
+        """Bring the archive up to date; returns None when nothing changed"""
+        if not self._built:
+            return self.build()
+        snapshot = self.scan()
+        old = self._snapshot
+        changed = sorted(rel for rel, value in snapshot.items() if old.get(rel) != value)
+        removed = sorted(rel for rel in old if rel not in snapshot)
+        pages = {page for rel in changed + removed for page in self._bundled_into.get(rel, ())}
+        changed = sorted(set(changed) | {page for page in pages if page in snapshot})
+        config_changed = _stat_key(build_config_path(self.project_root)) != self._config_key
+        if not changed and not removed and not config_changed:
+            return None
+        if self._needs_full_build(changed, removed, snapshot):
+            return self.build()
+        try:
+            update = self.update(changed, removed, snapshot)
+        except Exception:
+            return self.build()
+        if self.dead_bytes > self.compaction_ratio * update.archive_bytes:
+            return self.build()._replace(changed=changed, removed=removed)
+        return update
+
+    def run(
+        self,
+        stop: threading.Event,
+        interval: float = DEFAULT_INTERVAL,
+        on_update: Optional[Callable[[WatchUpdate], None]] = None,
+        on_error: Optional[Callable[[Exception], None]] = None,
+    ) -> None:
+        """Poll every ``interval`` seconds until ``stop`` is set"""
+        while not stop.is_set():
+            try:
+                update = self.poll()
+            except Exception as e:
+                if on_error is None:
+                    raise
+                on_error(e)
+            else:
+                if update is not None and on_update is not None:
+                    on_update(update)
+            stop.wait(interval)
@@ -1,20 +1,36 @@
-from typing import List
+from typing import List, Optional
 
-from PySide6.QtCore import Qt, QStringListModel
+from PySide6.QtCore import Qt, QStringListModel, QTimer
 from PySide6.QtGui import QFont, QKeySequence, QTextCursor
 from PySide6.QtWidgets import QCompleter, QPlainTextEdit, QSizePolicy
 
+from byhunide.editor.completion import language_key
+from byhunide.editor.completion_service import CompletionService
+
+
+# Typing pauses shorter than this do not start a completion query.
+COMPLETION_DELAY_MS = 60
+
 
 class ByHunCodeEditor(QPlainTextEdit):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, completion: Optional[CompletionService] = None):
         super().__init__(parent)
-        self._language = ""
+        self._language = language_key("")
+        self._completion_enabled = True
+        self._completion = completion if completion is not None else CompletionService(self)
+        # Bumped to cancel the query in flight, if any.
+        self._query_generation = 0
+        self._query_timer = QTimer(self)
+        self._query_timer.setSingleShot(True)
+        self._query_timer.setInterval(COMPLETION_DELAY_MS)
+        self._query_timer.timeout.connect(self._start_query)
         self._completer = QCompleter(self)
-        self._completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
-        self._completer.setFilterMode(Qt.MatchFlag.MatchContains)
+        # The popup shows query results as ranked; the completer must not re-filter them.
+        self._completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
         self._completer.setWidget(self)
         self._completer.activated.connect(self._insert_completion)
-        self._completer.setModel(QStringListModel([]))
+        self._results = QStringListModel([], self._completer)
+        self._completer.setModel(self._results)
 
         font = QFont("Consolas")
         font.setStyleHint(QFont.StyleHint.Monospace)
@@ -25,132 +41,13 @@ class ByHunCodeEditor(QPlainTextEdit):
         self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
 
     def set_language(self, ext: str) -> None:
-        ext = ext.lower().strip()
-        self._language = ext
-        words: List[str]
-
-        if ext == ".html":
-            words = [
-                "div",
-                "span",
-                "a",
-                "img",
-                "script",
-                "link",
-                "meta",
-                "head",
-                "body",
-                "html",
-                "input",
-                "button",
-                "form",
-                "label",
-                "section",
-                "header",
-                "footer",
-                "main",
-                "nav",
-                "ul",
-                "ol",
-                "li",
-                "p",
-                "h1",
-                "h2",
-                "h3",
-                "h4",
-                "h5",
-                "h6",
-                "class",
-                "id",
-                "src",
-                "href",
-                "style",
-                "type",
-                "rel",
-                "charset",
-                "content",
-                "name",
-                "value",
-                "placeholder",
-                "onclick",
-                "onload",
-            ]
-        elif ext == ".css":
-            words = [
-                "display",
-                "flex",
-                "grid",
-                "position",
-                "absolute",
-                "relative",
-                "fixed",
-                "sticky",
-                "margin",
-                "padding",
-                "width",
-                "height",
-                "min-width",
-                "min-height",
-                "max-width",
-                "max-height",
-                "color",
-                "background",
-                "background-color",
-                "border",
-                "border-radius",
-                "font-size",
-                "font-family",
-                "font-weight",
-                "line-height",
-                "text-align",
-                "justify-content",
-                "align-items",
-                "gap",
-                "top",
-                "left",
-                "right",
-                "bottom",
-                "z-index",
-                "overflow",
-                "cursor",
-                "transition",
-                "transform",
-            ]
-        else:
-            words = [
-                "console",
-                "log",
-                "warn",
-                "error",
-                "document",
-                "window",
-                "querySelector",
-                "querySelectorAll",
-                "getElementById",
-                "addEventListener",
-                "removeEventListener",
-                "setTimeout",
-                "setInterval",
-                "fetch",
-                "then",
-                "catch",
-                "async",
-                "await",
-                "function",
-                "return",
-                "const",
-                "let",
-                "var",
-                "if",
-                "else",
-                "for",
-                "while",
-                "class",
-                "new",
-                "this",
-            ]
-
-        self._completer.setModel(QStringListModel(words))
+        self._language = language_key(ext)
+        self.cancel_completion()
+
+    def set_completion_enabled(self, enabled: bool) -> None:
+        self._completion_enabled = enabled
+        if not enabled:
+            self.cancel_completion()
 
     def _insert_completion(self, completion: str) -> None:
         tc = self.textCursor()
@@ -178,14 +75,42 @@ class ByHunCodeEditor(QPlainTextEdit):
             self._show_completer(force=False)
 
     def _show_completer(self, force: bool) -> None:
+        if not self._completion_enabled:
+            return
         prefix = self._current_word_prefix()
         if not force and len(prefix) < 2:
-            self._completer.popup().hide()
+            self.cancel_completion()
             return
+        if force:
+            self._start_query()
+        else:
+            self._query_timer.start()
+
+    def cancel_completion(self) -> None:
+        """Drop any pending or running query and hide the popup"""
+        self._query_timer.stop()
+        self._query_generation += 1
+        self._completer.popup().hide()
+
+    def _start_query(self) -> None:
+        self._query_generation += 1
+        generation = self._query_generation
+        prefix = self._current_word_prefix()
+        self._completion.query(
+            self._language,
+            prefix,
+            lambda words: self._on_query_done(generation, prefix, words),
+            cancelled=lambda: generation != self._query_generation,
+        )
 
-        model = self._completer.model()
-        if isinstance(model, QStringListModel):
-            self._completer.setCompletionPrefix(prefix)
-            rect = self.cursorRect()
-            rect.setWidth(self._completer.popup().sizeHintForColumn(0) + 24)
-            self._completer.complete(rect)
+    def _on_query_done(self, generation: int, prefix: str, words: Optional[List[str]]) -> None:
+        if words is None or generation != self._query_generation or not self._completion_enabled:
+            return
+        if not words:
+            self._completer.popup().hide()
+            return
+        self._results.setStringList(words)
+        self._completer.setCompletionPrefix(prefix)
+        rect = self.cursorRect()
+        rect.setWidth(self._completer.popup().sizeHintForColumn(0) + 24)
+        self._completer.complete(rect)
@@ -0,0 +1,126 @@
+"""Completion word lists and a ranked prefix/trigram index over them.
+
+``CompletionIndex`` is immutable once built, so queries may run on any
+thread while a replacement index is being built on another.
+"""
+
+import heapq
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+DEFAULT_LIMIT = 50
+# Prefix matches looked at per query; enough to fill the popup after ranking.
+_PREFIX_SCAN = 2000
+
+# Built-in words per language, before any project symbols.
+BUILTIN_WORDS: Dict[str, List[str]] = {
+    ".html": [
+        "div", "span", "a", "img", "script", "link", "meta", "head", "body", "html",
+        "input", "button", "form", "label", "section", "header", "footer", "main", "nav",
+        "ul", "ol", "li", "p", "h1", "h2", "h3", "h4", "h5", "h6",
+        "class", "id", "src", "href", "style", "type", "rel", "charset", "content", "name",
+        "value", "placeholder", "onclick", "onload",
+    ],
+    ".css": [
+        "display", "flex", "grid", "position", "absolute", "relative", "fixed", "sticky",
+        "margin", "padding", "width", "height", "min-width", "min-height", "max-width",
+        "max-height", "color", "background", "background-color", "border", "border-radius",
+        "font-size", "font-family", "font-weight", "line-height", "text-align",
+        "justify-content", "align-items", "gap", "top", "left", "right", "bottom", "z-index",
+        "overflow", "cursor", "transition", "transform",
+    ],
+    ".js": [
+        "console", "log", "warn", "error", "document", "window", "querySelector",
+        "querySelectorAll", "getElementById", "addEventListener", "removeEventListener",
+        "setTimeout", "setInterval", "fetch", "then", "catch", "async", "await", "function",
+        "return", "const", "let", "var", "if", "else", "for", "while", "class", "new", "this",
+    ],
+}
+
+
+def language_key(ext: str) -> str:
+    """The word-list language for a file extension; anything else completes as JS"""
+    ext = ext.lower().strip()
+    return ext if ext in BUILTIN_WORDS else ".js"
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _is_subsequence(needle: str, haystack: str) -> bool:
+    it = iter(haystack)
+    return all(c in it for c in needle)
+
+
+class CompletionIndex:
+    """Ranks words against a typed prefix.
+
+    Prefix matches come from a sorted list, fuzzy ones (substrings, typos,
+    skipped letters) from a trigram index, so a query never scans every
+    word. Matches rank as: case-sensitive prefix, prefix, substring at a
+    word boundary, other substring, then fuzzy by shared trigrams; ties go
+    to shorter words.
+    """
+
+    def __init__(self, words: Iterable[str]):
+        self.words: List[str] = list(dict.fromkeys(w for w in words if w))
+        self._lower = [w.lower() for w in self.words]
+        self._order = sorted(range(len(self.words)), key=self._lower.__getitem__)
+        self._sorted = [self._lower[i] for i in self._order]
+        self._postings: Dict[str, array] = {}
+        for i, word in enumerate(self._lower):
+            for gram in _trigrams(word):
+                postings = self._postings.get(gram)
+                if postings is None:
+                    postings = self._postings[gram] = array("i")
+                postings.append(i)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def _rank(self, i: int, text: str, lower: str, grams: Set[str]) -> Tuple:
+        word, word_lower = self.words[i], self._lower[i]
+        if word.startswith(text):
+            tier, quality = 0, 0.0
+        elif word_lower.startswith(lower):
+            tier, quality = 1, 0.0
+        else:
+            pos = word_lower.find(lower)
+            if pos > 0:
+                boundary = not word[pos - 1].isalnum() or word[pos].isupper()
+                tier, quality = (2 if boundary else 3), 0.0
+            else:
+                tier = 4
+                quality = -len(grams & _trigrams(word_lower)) / len(grams)
+                if _is_subsequence(lower, word_lower):
+                    quality -= 1.0
+        return tier, quality, len(word), word_lower
+
+    def query(self, text: str, limit: int = DEFAULT_LIMIT) -> List[str]:
+        """Up to ``limit`` words matching ``text``, best first"""
+        lower = text.lower()
+        if not lower:
+            return [self.words[i] for i in self._order[:limit]]
+
+        candidates: Set[int] = set()
+        start = bisect_left(self._sorted, lower)
+        for pos in range(start, min(start + _PREFIX_SCAN, len(self._sorted))):
+            if not self._sorted[pos].startswith(lower):
+                break
+            candidates.add(self._order[pos])
+
+        grams = _trigrams(lower)
+        if grams:
+            shared: Counter = Counter()
+            for gram in grams:
+                shared.update(self._postings.get(gram, ()))
+            # Allow roughly one typo per three letters.
+            needed = max(1, len(grams) - max(1, len(lower) // 3))
+            candidates.update(i for i, n in shared.items() if n >= needed)
+
+        ranked = heapq.nsmallest(limit, candidates, key=lambda i: self._rank(i, text, lower, grams))
+        return [self.words[i] for i in ranked]
@@ -0,0 +1,69 @@
+import itertools
+from typing import Callable, Dict, List, Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from byhunide.editor.completion import BUILTIN_WORDS, DEFAULT_LIMIT, CompletionIndex, language_key
+from byhunide.editor.io_worker import TabIO
+
+
+# Called on the GUI thread with the ranked words, or None if the query was cancelled.
+QueryCallback = Callable[[Optional[List[str]]], None]
+
+
+class CompletionService(QObject):
+    """One completion index per language, shared by every editor.
+
+    Queries and index rebuilds run on their own single-thread pools, so a
+    rebuild after a project change never delays typing. A query whose
+    ``cancelled()`` returns True by the time it starts is skipped.
+    """
+
+    index_changed = Signal(str)  # language extension
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._queries = TabIO(self, max_threads=1)
+        self._builds = TabIO(self, max_threads=1)
+        self._indexes: Dict[str, CompletionIndex] = {
+            lang: CompletionIndex(words) for lang, words in BUILTIN_WORDS.items()
+        }
+        self._generations = itertools.count(1)
+        self._build_generation = 0
+
+    def index(self, ext: str) -> CompletionIndex:
+        return self._indexes[language_key(ext)]
+
+    def set_project_words(self, words: Dict[str, List[str]]) -> None:
+        """Rebuild the indexes with project symbols (by extension) after the built-in words"""
+        generation = self._build_generation = next(self._generations)
+        for lang, builtin in BUILTIN_WORDS.items():
+            project = words.get(lang, [])
+            self._builds.submit(
+                lambda builtin=builtin, project=project: CompletionIndex(builtin + project),
+                lambda index, error, lang=lang: self._on_built(generation, lang, index, error),
+            )
+
+    def _on_built(self, generation: int, lang: str, index: Optional[CompletionIndex], error) -> None:
+        # A newer set of words supersedes this build; keep the old index on errors.
+        if generation != self._build_generation or error is not None:
+            return
+        self._indexes[lang] = index
+        self.index_changed.emit(lang)
+
+    def query(
+        self,
+        ext: str,
+        text: str,
+        callback: QueryCallback,
+        cancelled: Callable[[], bool] = lambda: False,
+        limit: int = DEFAULT_LIMIT,
+    ) -> int:
+        index = self.index(ext)
+
+        def run() -> Optional[List[str]]:
+            if cancelled():
+                return None
+            return index.query(text, limit)
+
+        return self._queries.submit(run, lambda words, error: callback(None if error else words))
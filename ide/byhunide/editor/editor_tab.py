@@ -1,18 +1,88 @@
 import os
-from typing import Optional
+import time
+from typing import NamedTuple, Optional, Tuple
 
-from PySide6.QtWidgets import QHBoxLayout, QWidget
+from PySide6.QtCore import QTimer, Signal
+from PySide6.QtGui import QTextCursor
+from PySide6.QtWidgets import QHBoxLayout, QPlainTextEdit, QWidget
 
 from byhunide.editor.code_editor import ByHunCodeEditor
+from byhunide.editor.completion_service import CompletionService
+from byhunide.editor.file_io import DiskState, LoadedText, SaveResult, read_text, write_text_atomic
 from byhunide.editor.highlighters import CssHighlighter, HtmlHighlighter, JsHighlighter
+from byhunide.editor.io_worker import TabIO
+
+
+# Files at least this big open in large-file mode.
+LARGE_FILE_BYTES = 2 * 1024 * 1024
+# Characters appended per event-loop turn while showing a large file.
+LOAD_CHUNK_CHARS = 256 * 1024
+
+
+class ViewState(NamedTuple):
+    """What a hibernated tab keeps to put the view back where it was"""
+
+    cursor: int
+    anchor: int
+    vertical: int
+    horizontal: int
+
+
+def _utf16_len(text: str) -> int:
+    return len(text.encode("utf-16-le", "surrogatepass")) // 2
 
 
 class EditorTab(QWidget):
-    def __init__(self, file_path: Optional[str], parent=None):
+    """An open file. Disk I/O runs on ``io`` when given, else inline.
+
+    Loads and saves report back through signals; ``wait_for_io`` blocks
+    (while still processing events) until they have.
+    """
+
+    # Emitted as (characters shown, total characters) while a large file loads.
+    load_progress = Signal(int, int)
+    load_finished = Signal()
+    load_failed = Signal(str)
+    # True if the file was written, False if the save was skipped as unchanged.
+    saved = Signal(bool)
+    save_failed = Signal(str)
+
+    def __init__(
+        self,
+        file_path: Optional[str],
+        parent=None,
+        large_file_bytes: int = LARGE_FILE_BYTES,
+        io: Optional[TabIO] = None,
+        completion: Optional[CompletionService] = None,
+        lazy_highlighting: bool = True,
+    ):
         super().__init__(parent)
         self.file_path = file_path
-        self.editor = ByHunCodeEditor(self)
+        self.editor = ByHunCodeEditor(self, completion)
         self._highlighter = None
+        self.large_file_bytes = large_file_bytes
+        self.large_file = False
+        self.lazy_highlighting = lazy_highlighting
+        self._io = io
+        self._io_job: Optional[int] = None
+        # What the file on disk holds, as of the last load or save.
+        self._disk: Optional[DiskState] = None
+        self._save_again = False
+        self._loading = False
+        self._load_generation = 0
+        self._load_text: Optional[str] = None
+        self._load_pos = 0
+        self._load_timer = QTimer(self)
+        self._load_timer.setInterval(0)
+        self._load_timer.timeout.connect(self._load_next_chunk)
+        # (line, column, length) to select once loading finishes.
+        self._pending_go_to: Optional[Tuple[int, int, int]] = None
+        self.hibernated = False
+        # View to restore when a hibernated tab finishes reloading.
+        self._resume: Optional[ViewState] = None
+        self.load_finished.connect(self._on_load_finished)
+        # time.monotonic() of when the tab was last shown, for hibernation.
+        self.last_active = time.monotonic()
 
         layout = QHBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
@@ -22,6 +92,8 @@ class EditorTab(QWidget):
         self.set_file_path(file_path)
 
     def set_file_path(self, file_path: Optional[str]) -> None:
+        if file_path != self.file_path:
+            self._disk = None
         self.file_path = file_path
         ext = ""
         if file_path:
@@ -29,15 +101,85 @@ class EditorTab(QWidget):
 
         self.editor.set_language(ext or ".js")
 
-        if self._highlighter is not None:
-            self._highlighter.setDocument(None)
-
+        self._release_highlighter()
+        if self.large_file or self.hibernated:
+            return
         if ext.lower() == ".html":
             self._highlighter = HtmlHighlighter(self.editor.document())
         elif ext.lower() == ".css":
             self._highlighter = CssHighlighter(self.editor.document())
         else:
             self._highlighter = JsHighlighter(self.editor.document())
+        if self.lazy_highlighting:
+            self._highlighter.set_view(self.editor)
+
+    def _release_highlighter(self) -> None:
+        if self._highlighter is not None:
+            self._highlighter.setDocument(None)
+            self._highlighter.deleteLater()
+            self._highlighter = None
+
+    def can_hibernate(self) -> bool:
+        return (
+            not self.hibernated
+            and bool(self.file_path)
+            and not self.is_modified()
+            and not self.is_loading()
+            and not self.is_busy()
+        )
+
+    def hibernate(self) -> bool:
+        """Drop the text, undo history and highlighter of an unmodified tab.
+
+        Only the path and the cursor and scroll positions are kept; ``wake``
+        reloads the file from disk. Returns whether the tab hibernated.
+        """
+        if not self.can_hibernate():
+            return False
+        cursor = self.editor.textCursor()
+        self._resume = ViewState(
+            cursor.position(),
+            cursor.anchor(),
+            self.editor.verticalScrollBar().value(),
+            self.editor.horizontalScrollBar().value(),
+        )
+        self.editor.cancel_completion()
+        self.hibernated = True
+        self._release_highlighter()
+        self.editor.setUndoRedoEnabled(False)
+        self.editor.setPlainText("")
+        self.editor.setUndoRedoEnabled(True)
+        self.editor.setReadOnly(True)
+        self.set_modified(False)
+        return True
+
+    def wake(self) -> None:
+        """Reload a hibernated tab and restore its view once loaded"""
+        if not self.hibernated:
+            return
+        self.hibernated = False
+        self.editor.setReadOnly(False)
+        self.set_file_path(self.file_path)
+        self.load_from_disk()
+
+    def set_lazy_highlighting(self, lazy: bool) -> None:
+        """Highlight only around the viewport (and the rest when idle), or all at once"""
+        if lazy == self.lazy_highlighting:
+            return
+        self.lazy_highlighting = lazy
+        if self._highlighter is not None:
+            self._highlighter.set_view(self.editor if lazy else None)
+
+    def set_large_file(self, large: bool) -> None:
+        """Large-file mode: no highlighting, completion or line wrapping"""
+        if large == self.large_file:
+            return
+        self.large_file = large
+        self.editor.set_completion_enabled(not large)
+        self.editor.setLineWrapMode(
+            QPlainTextEdit.LineWrapMode.NoWrap if large else QPlainTextEdit.LineWrapMode.WidgetWidth
+        )
+        self.set_file_path(self.file_path)
 
     def is_modified(self) -> bool:
         return self.editor.document().isModified()
@@ -45,16 +187,180 @@ class EditorTab(QWidget):
     def set_modified(self, modified: bool) -> None:
         self.editor.document().setModified(modified)
 
+    def _run_io(self, fn, callback) -> None:
+        if self._io is None:
+            try:
+                result = fn()
+            except Exception as e:
+                callback(None, e)
+            else:
+                callback(result, None)
+            return
+        self._io_job = self._io.submit(fn, callback)
+
+    def is_busy(self) -> bool:
+        """True while a load or save runs on the I/O pool"""
+        return self._io_job is not None and self._io is not None and self._io.is_pending(self._io_job)
+
+    def is_loading(self) -> bool:
+        return self._loading
+
+    def wait_for_io(self) -> None:
+        """Process events until no load or save (including a queued one) is in flight"""
+        while self.is_busy():
+            self._io.wait(self._io_job)
+
+    def go_to(self, line: int, column: int = 0, length: int = 0) -> None:
+        """Select ``length`` characters at a 1-based line and 0-based column, once loaded"""
+        if self.is_loading():
+            self._pending_go_to = (line, column, length)
+            return
+        block = self.editor.document().findBlockByNumber(max(0, line - 1))
+        if not block.isValid():
+            return
+        # Columns count characters; document positions count UTF-16 units.
+        text = block.text()
+        start = block.position() + _utf16_len(text[:column])
+        cursor = QTextCursor(block)
+        cursor.setPosition(start)
+        cursor.setPosition(start + _utf16_len(text[column:column + length]), QTextCursor.MoveMode.KeepAnchor)
+        self.editor.setTextCursor(cursor)
+        self.editor.centerCursor()
+        self.editor.setFocus()
+
+    def _on_load_finished(self) -> None:
+        resume, self._resume = self._resume, None
+        if self._pending_go_to is not None:
+            location, self._pending_go_to = self._pending_go_to, None
+            self.go_to(*location)
+        elif resume is not None:
+            self._restore_view(resume)
+
+    def _restore_view(self, view: ViewState) -> None:
+        end = max(0, self.editor.document().characterCount() - 1)
+        cursor = self.editor.textCursor()
+        cursor.setPosition(min(view.anchor, end))
+        cursor.setPosition(min(view.cursor, end), QTextCursor.MoveMode.KeepAnchor)
+        self.editor.setTextCursor(cursor)
+        # After the new text is laid out, or showing the cursor scrolls again.
+        QTimer.singleShot(0, self, lambda: self._restore_scroll(view))
+
+    def _restore_scroll(self, view: ViewState) -> None:
+        self.editor.verticalScrollBar().setValue(view.vertical)
+        self.editor.horizontalScrollBar().setValue(view.horizontal)
+
+    def load_state(self) -> Tuple[int, int]:
+        """(characters shown, total characters) of a large file being loaded"""
+        if self._load_text is None:
+            return 0, 0
+        return self._load_pos, len(self._load_text)
+
     def load_from_disk(self) -> None:
-        if not self.file_path:
+        """Read the file on the I/O pool, then show it.
+
+        Large files are appended in chunks from the event loop. Until
+        ``load_finished`` the editor is read-only and ``is_loading()`` is
+        true, so the partial text must not be saved. Hibernated tabs are
+        only read when they wake.
+        """
+        if not self.file_path or self.hibernated:
+            return
+        self.cancel_loading()
+        self._loading = True
+        self._load_generation += 1
+        self.editor.setReadOnly(True)
+        path, generation = self.file_path, self._load_generation
+        self._run_io(lambda: read_text(path), lambda loaded, error: self._on_read(generation, loaded, error))
+
+    def _on_read(self, generation: int, loaded: Optional[LoadedText], error: Optional[BaseException]) -> None:
+        self._io_job = None
+        if not self._loading or generation != self._load_generation:
+            return  # cancelled or superseded
+        if error is not None:
+            self._finish_loading()
+            self.load_failed.emit(str(error))
+            return
+        self._disk = loaded.state
+        size = loaded.state.stat[1] if loaded.state.stat is not None else len(loaded.text)
+        self.set_large_file(size >= self.large_file_bytes)
+        if not self.large_file:
+            self.editor.setPlainText(loaded.text)
+            self._finish_loading()
+            self.set_modified(False)
+            self.load_finished.emit()
+            return
+        self._load_text = loaded.text
+        self._load_pos = 0
+        self.editor.clear()
+        self.editor.setUndoRedoEnabled(False)
+        self._load_timer.start()
+
+    def _load_next_chunk(self) -> None:
+        text = self._load_text
+        end = min(self._load_pos + LOAD_CHUNK_CHARS, len(text))
+        cursor = QTextCursor(self.editor.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text[self._load_pos:end])
+        self._load_pos = end
+        if end < len(text):
+            self.load_progress.emit(end, len(text))
             return
-        with open(self.file_path, "r", encoding="utf-8", errors="replace") as f:
-            self.editor.setPlainText(f.read())
+        self._finish_loading()
         self.set_modified(False)
+        self.editor.moveCursor(QTextCursor.MoveOperation.Start)
+        self.load_finished.emit()
+
+    def _finish_loading(self) -> None:
+        self._load_timer.stop()
+        self._loading = False
+        self._load_text = None
+        self._load_pos = 0
+        self.editor.setReadOnly(False)
+        self.editor.setUndoRedoEnabled(True)
+
+    def cancel_loading(self) -> None:
+        if self._loading:
+            self._finish_loading()
 
     def save_to_disk(self) -> None:
-        if not self.file_path:
+        """Save atomically on the I/O pool; skipped when nothing changed.
+
+        A save requested while another is running follows once it is done,
+        so writes to the file never overlap.
+        """
+        if not self.file_path or self.hibernated:
+            return  # a hibernated tab has no changes to save
+        if self.is_loading():
+            raise RuntimeError("The file is still loading.")
+        if self.is_busy():
+            self._save_again = True
             return
-        with open(self.file_path, "w", encoding="utf-8") as f:
-            f.write(self.editor.toPlainText())
-        self.set_modified(False)
+        text = self.editor.toPlainText()
+        revision = self.editor.document().revision()
+        path, previous = self.file_path, self._disk
+        self._run_io(
+            lambda: write_text_atomic(path, text, previous),
+            lambda result, error: self._on_saved(path, revision, result, error),
+        )
+
+    def _on_saved(
+        self,
+        path: str,
+        revision: int,
+        result: Optional[SaveResult],
+        error: Optional[BaseException],
+    ) -> None:
+        self._io_job = None
+        if error is not None:
+            self._save_again = False
+            self.save_failed.emit(str(error))
+            return
+        if path == self.file_path:
+            self._disk = result.state
+            # Edits made while the save ran still need saving.
+            if self.editor.document().revision() == revision:
+                self.set_modified(False)
+        self.saved.emit(result.written)
+        if self._save_again:
+            self._save_again = False
+            self.save_to_disk()
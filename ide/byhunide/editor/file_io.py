@@ -0,0 +1,86 @@
+"""Blocking file I/O for editor tabs, meant to run on a worker thread.
+
+Saves are atomic: the text goes to a temporary file in the same folder,
+which then replaces the original, so a crash mid-save never leaves a
+truncated file. A save is skipped when the text matches what was last
+loaded or saved and the file has not changed on disk since.
+"""
+
+import hashlib
+import os
+import stat
+import tempfile
+from typing import NamedTuple, Optional, Tuple
+
+
+# Files created by a save get the mode a plain open() would give them.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# (mtime_ns, size) of a file as last seen
+StatKey = Tuple[int, int]
+
+
+class DiskState(NamedTuple):
+    digest: str  # of the text as the editor holds it
+    stat: Optional[StatKey]
+
+
+class LoadedText(NamedTuple):
+    text: str
+    state: DiskState
+
+
+class SaveResult(NamedTuple):
+    written: bool
+    state: DiskState
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def stat_key(path: str) -> Optional[StatKey]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def read_text(path: str) -> LoadedText:
+    """Read a file as the editor shows it: UTF-8, "\\r\\n" folded to "\\n" """
+    key = stat_key(path)
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        text = f.read().replace("\r\n", "\n")
+    return LoadedText(text, DiskState(text_digest(text), key))
+
+
+def write_text_atomic(path: str, text: str, previous: Optional[DiskState] = None) -> SaveResult:
+    """Write ``text`` to ``path`` unless it is unchanged since ``previous``"""
+    digest = text_digest(text)
+    if previous is not None and previous.digest == digest:
+        key = stat_key(path)
+        if key is not None and key == previous.stat:
+            return SaveResult(False, previous)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        mode = 0o666 & ~_UMASK
+    fd, tmp = tempfile.mkstemp(prefix=".tmp_", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return SaveResult(True, DiskState(digest, stat_key(path)))
@@ -1,136 +1,237 @@
-from typing import List, Tuple
-
-from PySide6.QtCore import QRegularExpression
-from PySide6.QtGui import QColor, QFont, QTextCharFormat, QSyntaxHighlighter
+import re
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from PySide6.QtCore import QTimer
+from PySide6.QtGui import QColor, QFont, QTextBlock, QTextCharFormat, QSyntaxHighlighter
+from PySide6.QtWidgets import QPlainTextEdit
+
+from byhunide.editor import tokenizers
+from byhunide.editor.tokenizers import INITIAL_STATE, Tokenizer
+
+# Qt positions count UTF-16 code units; Python ones count code points.
+_ASTRAL = re.compile("[\U00010000-\U0010ffff]")
+
+# Only this much of a longer line is highlighted; the rest stays plain.
+MAX_LINE_CHARS = 10_000
+# In lazy mode, blocks this far above and below the viewport are highlighted right away.
+VIEWPORT_MARGIN_BLOCKS = 100
+# Catch-up highlighting of the other blocks runs in slices of about this long,
+# formatting up to CATCH_UP_BLOCKS consecutive blocks per step.
+IDLE_SLICE_SECONDS = 0.008
+CATCH_UP_BLOCKS = 64
+
+# Block state of a block not highlighted yet (Qt's default for new blocks).
+_PENDING = -1
+
+
+def _fmt(color: str, bold: bool = False) -> QTextCharFormat:
+    fmt = QTextCharFormat()
+    fmt.setForeground(QColor(color))
+    if bold:
+        fmt.setFontWeight(QFont.Weight.Bold)
+    return fmt
+
+
+def _utf16_offsets(text: str) -> Optional[List[int]]:
+    """UTF-16 position of each code point of ``text``, or None when they are equal"""
+    if text.isascii() or _ASTRAL.search(text) is None:
+        return None
+    offsets = []
+    pos = 0
+    for ch in text:
+        offsets.append(pos)
+        pos += 2 if ord(ch) > 0xFFFF else 1
+    offsets.append(pos)
+    return offsets
 
 
 class BaseHighlighter(QSyntaxHighlighter):
-    def __init__(self, document):
+    """Highlights with a single-pass ``Tokenizer``; the block state carries its state across lines.
+
+    After ``set_view``, highlighting is lazy: only blocks in or near the
+    view's viewport are formatted as they are shown or edited, and the
+    rest are caught up in short slices while the event loop is idle.
+    Lines longer than ``max_line_chars`` are only highlighted up to there.
+    """
+
+    def __init__(
+        self,
+        document,
+        tokenizer: Tokenizer,
+        formats: Dict[str, QTextCharFormat],
+        max_line_chars: int = MAX_LINE_CHARS,
+    ):
         super().__init__(document)
-        self._rules: List[Tuple[QRegularExpression, QTextCharFormat]] = []
-
-    def add_rule(self, pattern: str, fmt: QTextCharFormat) -> None:
-        self._rules.append((QRegularExpression(pattern), fmt))
+        self._tokenizer = tokenizer
+        self._formats = formats
+        self.max_line_chars = max_line_chars
+        self._view: Optional[QPlainTextEdit] = None
+        # Block numbers highlighted even when lazy; (0, -1) is empty.
+        self._window = (0, -1)
+        # Block numbers catch-up is formatting outside the window; (0, -1) is empty.
+        self._forced = (0, -1)
+        # Lowest block number that may still be pending.
+        self._pending_from: Optional[int] = None
+        self._visible_timer = QTimer(self)
+        self._visible_timer.setSingleShot(True)
+        self._visible_timer.setInterval(0)
+        self._visible_timer.timeout.connect(self._highlight_visible)
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setInterval(0)
+        self._idle_timer.timeout.connect(self._catch_up)
+
+    def set_view(self, view: Optional[QPlainTextEdit]) -> None:
+        """Highlight lazily around ``view``'s viewport, or eagerly again with None"""
+        if self._view is not None:
+            self._view.updateRequest.disconnect(self._schedule_visible)
+        self._view = view
+        if view is None:
+            self._idle_timer.stop()
+            self._pending_from = None
+            self.rehighlight()
+            return
+        view.updateRequest.connect(self._schedule_visible)
+        self._update_window()
+
+    def is_lazy(self) -> bool:
+        return self._view is not None
+
+    def _schedule_visible(self, *_args) -> None:
+        self._visible_timer.start()
+
+    def _update_window(self) -> None:
+        view = self._view
+        first = view.firstVisibleBlock().blockNumber()
+        visible = view.viewport().height() // max(1, view.fontMetrics().height()) + 1
+        self._window = (max(0, first - VIEWPORT_MARGIN_BLOCKS), first + visible + VIEWPORT_MARGIN_BLOCKS)
+
+    def _highlight_visible(self) -> None:
+        if self._view is None or self.document() is None:
+            return
+        self._update_window()
+        first, last = self._window
+        block = self.document().findBlockByNumber(first)
+        while block.isValid() and block.blockNumber() <= last:
+            if block.userState() == _PENDING:
+                # Also formats the following pending blocks in the window.
+                self.rehighlightBlock(block)
+            block = block.next()
+
+    def _mark_pending(self, number: int) -> None:
+        if self._pending_from is None or number < self._pending_from:
+            self._pending_from = number
+        if not self._idle_timer.isActive():
+            self._idle_timer.start()
+
+    def _catch_up(self) -> None:
+        document = self.document()
+        if document is None or self._pending_from is None:
+            self._idle_timer.stop()
+            return
+        deadline = time.perf_counter() + IDLE_SLICE_SECONDS
+        block = document.findBlockByNumber(self._pending_from)
+        while block.isValid() and time.perf_counter() < deadline:
+            if block.userState() != _PENDING:
+                block = block.next()
+                continue
+            number = block.blockNumber()
+            self._forced = (number, number + CATCH_UP_BLOCKS - 1)
+            # Formats the following pending blocks in the forced range too.
+            self.rehighlightBlock(block)
+            self._forced = (0, -1)
+            block = document.findBlockByNumber(number + CATCH_UP_BLOCKS)
+        if block.isValid():
+            self._pending_from = block.blockNumber()
+        else:
+            self._pending_from = None
+            self._idle_timer.stop()
+
+    def _state_before(self, block: QTextBlock) -> int:
+        """The state a block starts in, tokenizing back to the last highlighted block if needed"""
+        skipped: List[QTextBlock] = []
+        previous = block.previous()
+        while previous.isValid() and previous.userState() == _PENDING:
+            skipped.append(previous)
+            previous = previous.previous()
+        state = previous.userState() if previous.isValid() else INITIAL_STATE
+        for pending in reversed(skipped):
+            _, state = self._tokenizer.tokenize(pending.text()[:self.max_line_chars], state)
+        return state
 
     def highlightBlock(self, text: str) -> None:
-        for regex, fmt in self._rules:
-            it = regex.globalMatch(text)
-            while it.hasNext():
-                m = it.next()
-                self.setFormat(m.capturedStart(), m.capturedLength(), fmt)
+        if self._view is not None:
+            number = self.currentBlock().blockNumber()
+            first, last = self._window
+            forced_first, forced_last = self._forced
+            if not (first <= number <= last or forced_first <= number <= forced_last):
+                self._mark_pending(number)
+                self.setCurrentBlockState(_PENDING)
+                return
+        state = self.previousBlockState()
+        if state == _PENDING:
+            state = self._state_before(self.currentBlock())
+        if len(text) > self.max_line_chars:
+            text = text[:self.max_line_chars]
+        tokens, state = self._tokenizer.tokenize(text, state)
+        offsets = _utf16_offsets(text)
+        formats = self._formats
+        set_format = self.setFormat
+        for start, length, kind in tokens:
+            fmt = formats.get(kind)
+            if fmt is None:
+                continue
+            if offsets is not None:
+                start, length = offsets[start], offsets[start + length] - offsets[start]
+            set_format(start, length, fmt)
+        self.setCurrentBlockState(state)
+
+
+@lru_cache(maxsize=None)
+def _html_formats() -> Dict[str, QTextCharFormat]:
+    return {
+        tokenizers.TAG: _fmt("#7dcfff", bold=True),
+        tokenizers.ATTRIBUTE: _fmt("#bb9af7"),
+        tokenizers.STRING: _fmt("#9ece6a"),
+        tokenizers.COMMENT: _fmt("#565f89"),
+    }
+
+
+@lru_cache(maxsize=None)
+def _css_formats() -> Dict[str, QTextCharFormat]:
+    return {
+        tokenizers.SELECTOR: _fmt("#7dcfff", bold=True),
+        tokenizers.PROPERTY: _fmt("#bb9af7"),
+        tokenizers.VALUE: _fmt("#9ece6a"),
+        tokenizers.COMMENT: _fmt("#565f89"),
+    }
+
+
+@lru_cache(maxsize=None)
+def _js_formats() -> Dict[str, QTextCharFormat]:
+    return {
+        tokenizers.KEYWORD: _fmt("#7dcfff", bold=True),
+        tokenizers.STRING: _fmt("#9ece6a"),
+        tokenizers.NUMBER: _fmt("#ff9e64"),
+        tokenizers.COMMENT: _fmt("#565f89"),
+    }
+
+
+# Every instance of a language shares its module-level tokenizer (compiled
+# rules and line cache) and one set of formats.
 
 
 class HtmlHighlighter(BaseHighlighter):
     def __init__(self, document):
-        super().__init__(document)
-
-        tag_fmt = QTextCharFormat()
-        tag_fmt.setForeground(QColor("#7dcfff"))
-        tag_fmt.setFontWeight(QFont.Weight.Bold)
-
-        attr_fmt = QTextCharFormat()
-        attr_fmt.setForeground(QColor("#bb9af7"))
-
-        str_fmt = QTextCharFormat()
-        str_fmt.setForeground(QColor("#9ece6a"))
-
-        cmt_fmt = QTextCharFormat()
-        cmt_fmt.setForeground(QColor("#565f89"))
-
-        self.add_rule(r"</?\s*[A-Za-z][A-Za-z0-9:-]*", tag_fmt)
-        self.add_rule(r"\b[A-Za-z_:][A-Za-z0-9_:\-\.]*\b(?=\=)", attr_fmt)
-        self.add_rule(r"\"[^\"]*\"", str_fmt)
-        self.add_rule(r"\'[^\']*\'", str_fmt)
-        self.add_rule(r"<!--[^>]*?-->", cmt_fmt)
+        super().__init__(document, tokenizers.HTML_TOKENIZER, _html_formats())
 
 
 class CssHighlighter(BaseHighlighter):
     def __init__(self, document):
-        super().__init__(document)
-
-        selector_fmt = QTextCharFormat()
-        selector_fmt.setForeground(QColor("#7dcfff"))
-        selector_fmt.setFontWeight(QFont.Weight.Bold)
-
-        prop_fmt = QTextCharFormat()
-        prop_fmt.setForeground(QColor("#bb9af7"))
-
-        value_fmt = QTextCharFormat()
-        value_fmt.setForeground(QColor("#9ece6a"))
-
-        cmt_fmt = QTextCharFormat()
-        cmt_fmt.setForeground(QColor("#565f89"))
-
-        self.add_rule(r"^[^\{]+(?=\{)", selector_fmt)
-        self.add_rule(r"\b[a-zA-Z\-]+(?=\s*:)", prop_fmt)
-        self.add_rule(r":\s*[^;]+(?=;)", value_fmt)
-        self.add_rule(r"/\*.*?\*/", cmt_fmt)
+        super().__init__(document, tokenizers.CSS_TOKENIZER, _css_formats())
 
 
 class JsHighlighter(BaseHighlighter):
     def __init__(self, document):
-        super().__init__(document)
-
-        kw_fmt = QTextCharFormat()
-        kw_fmt.setForeground(QColor("#7dcfff"))
-        kw_fmt.setFontWeight(QFont.Weight.Bold)
-
-        str_fmt = QTextCharFormat()
-        str_fmt.setForeground(QColor("#9ece6a"))
-
-        num_fmt = QTextCharFormat()
-        num_fmt.setForeground(QColor("#ff9e64"))
-
-        cmt_fmt = QTextCharFormat()
-        cmt_fmt.setForeground(QColor("#565f89"))
-
-        keywords = [
-            "break",
-            "case",
-            "catch",
-            "class",
-            "const",
-            "continue",
-            "debugger",
-            "default",
-            "delete",
-            "do",
-            "else",
-            "export",
-            "extends",
-            "finally",
-            "for",
-            "function",
-            "if",
-            "import",
-            "in",
-            "instanceof",
-            "let",
-            "new",
-            "return",
-            "super",
-            "switch",
-            "this",
-            "throw",
-            "try",
-            "typeof",
-            "var",
-            "void",
-            "while",
-            "with",
-            "yield",
-            "await",
-            "async",
-            "true",
-            "false",
-            "null",
-            "undefined",
-        ]
-
-        self.add_rule(r"\\b(" + "|".join(keywords) + r")\\b", kw_fmt)
-        self.add_rule(r"\"[^\"]*\"", str_fmt)
-        self.add_rule(r"\'[^\']*\'", str_fmt)
-        self.add_rule(r"`[^`]*`", str_fmt)
-        self.add_rule(r"\\b[0-9]+(\\.[0-9]+)?\\b", num_fmt)
-        self.add_rule(r"//.*$", cmt_fmt)
-        self.add_rule(r"/\*.*?\*/", cmt_fmt)
+        super().__init__(document, tokenizers.JS_TOKENIZER, _js_formats())
@@ -0,0 +1,57 @@
+import itertools
+from typing import Any, Callable, Dict, Optional
+
+from PySide6.QtCore import QCoreApplication, QEventLoop, QObject, QThreadPool, Signal, Slot
+
+
+DEFAULT_IO_THREADS = 4
+
+# Called on the GUI thread with (result, error); error is None on success.
+IOCallback = Callable[[Any, Optional[BaseException]], None]
+
+
+class TabIO(QObject):
+    """Runs blocking tab I/O on a small thread pool.
+
+    Jobs run concurrently, up to ``max_threads`` at once; each callback is
+    delivered on the thread that owns this object (the GUI thread).
+    """
+
+    _finished = Signal(int, object, object)
+
+    def __init__(self, parent=None, max_threads: int = DEFAULT_IO_THREADS):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_threads)
+        self._ids = itertools.count(1)
+        self._callbacks: Dict[int, IOCallback] = {}
+        self._finished.connect(self._dispatch)
+
+    def submit(self, fn: Callable[[], Any], callback: IOCallback) -> int:
+        job = next(self._ids)
+        self._callbacks[job] = callback
+
+        def run() -> None:
+            try:
+                result = fn()
+            except BaseException as e:
+                self._finished.emit(job, None, e)
+            else:
+                self._finished.emit(job, result, None)
+
+        self._pool.start(run)
+        return job
+
+    def is_pending(self, job: int) -> bool:
+        return job in self._callbacks
+
+    def wait(self, job: int) -> None:
+        """Keep the event loop running until ``job``'s callback has been called"""
+        while self.is_pending(job):
+            QCoreApplication.processEvents(QEventLoop.ProcessEventsFlag.WaitForMoreEvents)
+
+    @Slot(int, object, object)
+    def _dispatch(self, job: int, result: Any, error: Optional[BaseException]) -> None:
+        callback = self._callbacks.pop(job, None)
+        if callback is not None:
+            callback(result, error)
@@ -0,0 +1,32 @@
+import threading
+
+from PySide6.QtCore import QObject, Signal, Slot
+
+from byhunide.editor.symbols import DEFAULT_INTERVAL, SymbolIndex
+
+
+class SymbolIndexWorker(QObject):
+    """Keeps a ``SymbolIndex`` up to date off the GUI thread until stopped"""
+
+    updated = Signal(object)  # completion words per language extension
+    failed = Signal(str)
+    done = Signal()
+
+    def __init__(self, index: SymbolIndex, interval: float = DEFAULT_INTERVAL):
+        super().__init__()
+        self.index = index
+        self.interval = interval
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        """Request the index loop to end; safe to call from any thread"""
+        self._stop.set()
+
+    @Slot()
+    def run(self) -> None:
+        try:
+            self.index.run(self._stop, self.interval, self.updated.emit, lambda e: self.failed.emit(str(e)))
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            self.done.emit()
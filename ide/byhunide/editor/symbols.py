@@ -0,0 +1,235 @@
+"""Project-wide index of symbols for completion.
+
+``SymbolIndex`` extracts element ids and class names (from HTML attributes
+and CSS selectors) and JavaScript names (functions, classes, variables and
+methods) from every .html, .css and .js file in a project. Each
+``update()`` re-reads only files whose mtime or size changed.
+
+Symbol names are interned and reference-counted across files, and the
+estimated size of the index is kept under ``memory_budget``: when it is
+exceeded, the largest files are dropped from the index first, as they are
+usually vendored libraries. Files above ``max_file_bytes`` are never read.
+"""
+
+import re
+import sys
+import threading
+from collections import Counter
+from typing import Callable, Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple
+
+from byhunide.build.compiler import _iter_project_files
+from byhunide.editor.file_io import StatKey, stat_key
+
+
+ID = "id"
+CLASS = "class"
+JS = "js"
+
+INDEXED_EXTENSIONS = {".html", ".css", ".js"}
+# Symbol kinds offered when completing in each language.
+LANGUAGE_KINDS: Dict[str, Tuple[str, ...]] = {
+    ".html": (ID, CLASS, JS),
+    ".css": (ID, CLASS),
+    ".js": (JS, ID, CLASS),
+}
+
+DEFAULT_MEMORY_BUDGET = 32 * 1024 * 1024
+DEFAULT_MAX_FILE_BYTES = 1024 * 1024
+DEFAULT_INTERVAL = 2.0
+
+# Rough per-entry costs used to estimate the index size.
+_SYMBOL_OVERHEAD = 120  # set and Counter slots for a distinct name
+_REFERENCE_BYTES = 40  # a name in one file's symbol set
+_FILE_OVERHEAD = 600
+
+_HTML_ID = re.compile(r"""\bid\s*=\s*["']?([^\s"'<>]+)""", re.IGNORECASE)
+_HTML_CLASS = re.compile(r"""\bclass\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'<>]+))""", re.IGNORECASE)
+_HTML_STYLE = re.compile(r"<style\b[^>]*>(.*?)</style", re.IGNORECASE | re.DOTALL)
+_HTML_SCRIPT = re.compile(r"<script\b[^>]*>(.*?)</script", re.IGNORECASE | re.DOTALL)
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+# Anchored after a delimiter so a failed match never rescans the same text.
+_CSS_PRELUDE = re.compile(r"(?:^|(?<=[{};]))([^{};]+)\{")
+_CSS_ID = re.compile(r"#(-?[A-Za-z_][\w-]*)")
+_CSS_CLASS = re.compile(r"\.(-?[A-Za-z_][\w-]*)")
+_JS_NAME = r"[A-Za-z_$][\w$]*"
+_JS_DEFINITIONS = re.compile(
+    rf"""\b(?:function\s*\*?\s*|class\s+|(?:const|let|var)\s+)({_JS_NAME})
+      | ({_JS_NAME})\s*[:=]\s*(?:async\s+)?(?:function\b|\([^()]*\)\s*=>|{_JS_NAME}\s*=>)
+      | ^[ \t]*(?:static\s+|async\s+|get\s+|set\s+)*({_JS_NAME})\s*\([^()]*\)\s*\{{
+    """,
+    re.VERBOSE | re.MULTILINE,
+)
+_JS_RESERVED = {
+    "if", "for", "while", "switch", "catch", "function", "return", "with", "else", "do", "try",
+}
+
+
+Symbols = Dict[str, FrozenSet[str]]
+
+
+def extract_symbols(text: str, ext: str) -> Symbols:
+    """Symbols defined in one file, by kind"""
+    ids: Set[str] = set()
+    classes: Set[str] = set()
+    names: Set[str] = set()
+    ext = ext.lower()
+    css, js = "", ""
+    if ext == ".html":
+        ids.update(_HTML_ID.findall(text))
+        for groups in _HTML_CLASS.findall(text):
+            classes.update("".join(groups).split())
+        css = "\n".join(_HTML_STYLE.findall(text))
+        js = "\n".join(_HTML_SCRIPT.findall(text))
+    elif ext == ".css":
+        css = text
+    elif ext == ".js":
+        js = text
+    if css:
+        css = _CSS_COMMENT.sub("", css)
+        for prelude in _CSS_PRELUDE.findall(css):
+            if prelude.lstrip().startswith("@"):
+                continue
+            ids.update(_CSS_ID.findall(prelude))
+            classes.update(_CSS_CLASS.findall(prelude))
+    if js:
+        for groups in _JS_DEFINITIONS.findall(js):
+            name = groups[0] or groups[1] or groups[2]
+            if name not in _JS_RESERVED:
+                names.add(name)
+    symbols = {ID: ids, CLASS: classes, JS: names}
+    return {kind: frozenset(map(sys.intern, values)) for kind, values in symbols.items() if values}
+
+
+class _FileEntry(NamedTuple):
+    stat: Optional[StatKey]
+    size: int
+    symbols: Symbols
+    # False when the file is too big or was dropped to stay within the budget.
+    indexed: bool
+
+
+def _entry_bytes(symbols: Symbols) -> int:
+    return _FILE_OVERHEAD + _REFERENCE_BYTES * sum(len(names) for names in symbols.values())
+
+
+def _read_symbols(src: str, ext: str) -> Symbols:
+    with open(src, "r", encoding="utf-8", errors="replace") as f:
+        return extract_symbols(f.read(), ext)
+
+
+class SymbolIndex:
+    def __init__(
+        self,
+        project_root: str,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+        max_file_bytes: int = DEFAULT_MAX_FILE_BYTES,
+    ):
+        self.project_root = project_root
+        self.memory_budget = memory_budget
+        self.max_file_bytes = max_file_bytes
+        self._files: Dict[str, _FileEntry] = {}
+        self._counts: Dict[str, Counter] = {ID: Counter(), CLASS: Counter(), JS: Counter()}
+        self._bytes = 0
+
+    @property
+    def estimated_bytes(self) -> int:
+        return self._bytes
+
+    @property
+    def skipped_files(self) -> List[str]:
+        return sorted(rel for rel, entry in self._files.items() if not entry.indexed)
+
+    def _add(self, symbols: Symbols, sign: int) -> None:
+        for kind, names in symbols.items():
+            counts = self._counts[kind]
+            for name in names:
+                before = counts[name]
+                counts[name] = before + sign
+                if before == 0:
+                    self._bytes += sys.getsizeof(name) + _SYMBOL_OVERHEAD
+                elif before + sign == 0:
+                    del counts[name]
+                    self._bytes -= sys.getsizeof(name) + _SYMBOL_OVERHEAD
+        self._bytes += sign * _entry_bytes(symbols)
+
+    def _set(self, rel: str, entry: Optional[_FileEntry]) -> None:
+        old = self._files.pop(rel, None)
+        if old is not None:
+            self._add(old.symbols, -1)
+        if entry is not None:
+            self._files[rel] = entry
+            self._add(entry.symbols, +1)
+
+    def update(self) -> bool:
+        """Re-index changed files and forget removed ones; returns whether anything changed"""
+        seen: Dict[str, Tuple[str, str, Optional[StatKey]]] = {}
+        for rel, src, ext in _iter_project_files(self.project_root, set()):
+            if ext in INDEXED_EXTENSIONS:
+                seen[rel] = (src, ext, stat_key(src))
+
+        changed = False
+        for rel in [rel for rel in self._files if rel not in seen]:
+            self._set(rel, None)
+            changed = True
+        for rel, (src, ext, key) in seen.items():
+            old = self._files.get(rel)
+            if old is not None and old.stat == key:
+                continue
+            changed = True
+            size = key[1] if key is not None else 0
+            symbols: Symbols = {}
+            indexed = key is not None and size <= self.max_file_bytes
+            if indexed:
+                try:
+                    symbols = _read_symbols(src, ext)
+                except OSError:
+                    indexed = False
+            self._set(rel, _FileEntry(key, size, symbols, indexed))
+        if changed:
+            self._enforce_budget()
+        return changed
+
+    def _enforce_budget(self) -> None:
+        if self._bytes <= self.memory_budget:
+            return
+        largest_first = sorted(
+            (rel for rel, entry in self._files.items() if entry.symbols),
+            key=lambda rel: self._files[rel].size,
+            reverse=True,
+        )
+        for rel in largest_first:
+            if self._bytes <= self.memory_budget:
+                break
+            entry = self._files[rel]
+            self._set(rel, entry._replace(symbols={}, indexed=False))
+
+    def words(self, kinds: Tuple[str, ...]) -> List[str]:
+        """Distinct symbol names of the given kinds, sorted"""
+        names: Set[str] = set()
+        for kind in kinds:
+            names.update(self._counts[kind])
+        return sorted(names, key=str.lower)
+
+    def snapshot(self) -> Dict[str, List[str]]:
+        """Completion words per language extension, safe to hand to another thread"""
+        return {ext: self.words(kinds) for ext, kinds in LANGUAGE_KINDS.items()}
+
+    def run(
+        self,
+        stop: threading.Event,
+        interval: float = DEFAULT_INTERVAL,
+        on_update: Optional[Callable[[Dict[str, List[str]]], None]] = None,
+        on_error: Optional[Callable[[Exception], None]] = None,
+    ) -> None:
+        """Update every ``interval`` seconds until ``stop`` is set"""
+        while not stop.is_set():
+            try:
+                changed = self.update()
+            except Exception as e:
+                if on_error is None:
+                    raise
+                on_error(e)
+            else:
+                if changed and on_update is not None:
+                    on_update(self.snapshot())
+            stop.wait(interval)
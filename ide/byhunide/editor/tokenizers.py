@@ -0,0 +1,285 @@
+"""Single-pass, line-at-a-time tokenizers for the editor highlighters.
+
+Each language is a small state machine. A state has one combined regex
+whose alternatives are that state's rules, so a line is scanned once and
+each stretch of text gets exactly one token. The state left at the end of
+a line is carried into the next one, which is how block comments, template
+strings and tags spanning several lines are highlighted correctly.
+
+This module does not import Qt; ``byhunide.editor.highlighters`` maps the
+token kinds to text formats.
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+KEYWORD = "keyword"
+STRING = "string"
+NUMBER = "number"
+COMMENT = "comment"
+TAG = "tag"
+ATTRIBUTE = "attribute"
+SELECTOR = "selector"
+PROPERTY = "property"
+VALUE = "value"
+
+# Start of a document.
+INITIAL_STATE = 0
+# Characters of tokenized lines remembered per tokenizer.
+DEFAULT_CACHE_CHARS = 4_000_000
+
+
+# (start, length, kind); plain tuples, as lines can have hundreds of tokens.
+Token = Tuple[int, int, str]
+
+
+# (pattern, token kind or None for no token, next state or None to stay)
+Rule = Tuple[str, Optional[str], Optional[int]]
+
+
+class Tokenizer:
+    """A set of states, each a list of rules tried together in one scan.
+
+    ``starts`` optionally gives, per state, a character class every token
+    of that state starts with; the scan skips other characters cheaply.
+    Results are cached per ``(state, line)``, since real files repeat many
+    lines and re-highlighting after a state change revisits all of them.
+    """
+
+    def __init__(
+        self,
+        states: Dict[int, Sequence[Rule]],
+        starts: Optional[Dict[int, str]] = None,
+        cache_chars: int = DEFAULT_CACHE_CHARS,
+    ):
+        starts = starts or {}
+        self._states: Dict[int, Tuple["re.Pattern[str]", List[Tuple[Optional[str], Optional[int]]]]] = {}
+        for state, rules in states.items():
+            for pattern, _, _ in rules:
+                if re.compile(pattern).groups:
+                    raise ValueError(f"Tokenizer rules must not use capturing groups: {pattern!r}")
+            combined = "|".join(f"({pattern})" for pattern, _, _ in rules)
+            if state in starts:
+                combined = f"(?={starts[state]})(?:{combined})"
+            self._states[state] = (re.compile(combined), [(kind, nxt) for _, kind, nxt in rules])
+        self._cache: Dict[Tuple[int, str], Tuple[List[Token], int]] = {}
+        self._cache_chars = cache_chars
+        self._cached_chars = 0
+
+    def tokenize(self, text: str, state: int = INITIAL_STATE) -> Tuple[List[Token], int]:
+        """Tokens of one line and the state to start the next line in.
+
+        The token list may be shared with other callers; do not modify it.
+        """
+        if state not in self._states:
+            state = INITIAL_STATE
+        key = (state, text)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        tokens: List[Token] = []
+        pos = 0
+        end = len(text)
+        while pos < end:
+            regex, actions = self._states[state]
+            for m in regex.finditer(text, pos):
+                kind, nxt = actions[m.lastindex - 1]
+                start, stop = m.span()
+                if kind is not None and stop > start:
+                    last = tokens[-1] if tokens else None
+                    if last is not None and last[2] == kind and last[0] + last[1] == start:
+                        # One span instead of two, e.g. "<p" and ">".
+                        tokens[-1] = (last[0], stop - last[0], kind)
+                    else:
+                        tokens.append((start, stop - start, kind))
+                if nxt is not None:
+                    state = nxt
+                    pos = stop
+                    break
+            else:
+                break
+        if self._cached_chars + end > self._cache_chars:
+            self._cache.clear()
+            self._cached_chars = 0
+        self._cached_chars += end
+        result = self._cache[key] = (tokens, state)
+        return result
+
+
+JS_KEYWORDS = (
+    "break",
+    "case",
+    "catch",
+    "class",
+    "const",
+    "continue",
+    "debugger",
+    "default",
+    "delete",
+    "do",
+    "else",
+    "export",
+    "extends",
+    "finally",
+    "for",
+    "function",
+    "if",
+    "import",
+    "in",
+    "instanceof",
+    "let",
+    "new",
+    "return",
+    "super",
+    "switch",
+    "this",
+    "throw",
+    "try",
+    "typeof",
+    "var",
+    "void",
+    "while",
+    "with",
+    "yield",
+    "await",
+    "async",
+    "true",
+    "false",
+    "null",
+    "undefined",
+)
+
+_JS_CODE, _JS_COMMENT, _JS_TEMPLATE = 0, 1, 2
+
+JS_TOKENIZER = Tokenizer(
+    {
+        _JS_CODE: [
+            (r"//.*", COMMENT, None),
+            (r"/\*.*?\*/", COMMENT, None),
+            (r"/\*.*", COMMENT, _JS_COMMENT),
+            (r'"(?:[^"\\]|\\.)*(?:"|\\?$)', STRING, None),
+            (r"'(?:[^'\\]|\\.)*(?:'|\\?$)", STRING, None),
+            (r"`(?:[^`\\]|\\.)*`", STRING, None),
+            (r"`.*", STRING, _JS_TEMPLATE),
+            (r"(?<![\w$])(?:" + "|".join(JS_KEYWORDS) + r")(?![\w$])", KEYWORD, None),
+            (r"(?<![\w$])(?:0[xXbBoO][0-9a-fA-F_]+|[0-9][0-9_]*(?:\.[0-9_]+)?(?:[eE][+-]?[0-9]+)?)n?(?![\w$])", NUMBER, None),
+        ],
+        _JS_COMMENT: [
+            (r".*?\*/", COMMENT, _JS_CODE),
+            (r".+", COMMENT, None),
+        ],
+        _JS_TEMPLATE: [
+            (r"(?:[^`\\]|\\.)*`", STRING, _JS_CODE),
+            (r".+", STRING, None),
+        ],
+    },
+    # Where a token can start: quotes, slashes and the first letter or digit of a word.
+    starts={_JS_CODE: r"""[/"'`]|(?<![\w$])[0-9a-y]"""},
+)
+
+
+def _tag_states(tag: int, dq: int, sq: int, body: int) -> Dict[int, List[Rule]]:
+    """Inside a start or end tag, returning to ``body`` after the ``>``"""
+    return {
+        tag: [
+            (r"/?>", TAG, body),
+            (r"[A-Za-z_:@][\w:.\-@]*(?=\s*=)", ATTRIBUTE, None),
+            (r'"[^"]*"', STRING, None),
+            (r'".*', STRING, dq),
+            (r"'[^']*'", STRING, None),
+            (r"'.*", STRING, sq),
+        ],
+        dq: [(r'[^"]*"', STRING, tag), (r".+", STRING, None)],
+        sq: [(r"[^']*'", STRING, tag), (r".+", STRING, None)],
+    }
+
+
+(
+    _HTML_TEXT,
+    _HTML_COMMENT,
+    _HTML_TAG,
+    _HTML_TAG_DQ,
+    _HTML_TAG_SQ,
+    _HTML_SCRIPT_TAG,
+    _HTML_SCRIPT_DQ,
+    _HTML_SCRIPT_SQ,
+    _HTML_SCRIPT,
+    _HTML_STYLE_TAG,
+    _HTML_STYLE_DQ,
+    _HTML_STYLE_SQ,
+    _HTML_STYLE,
+) = range(13)
+
+_HTML_STATES: Dict[int, List[Rule]] = {
+    _HTML_TEXT: [
+        (r"<!--.*?-->", COMMENT, None),
+        (r"<!--.*", COMMENT, _HTML_COMMENT),
+        (r"<![A-Za-z][^>]*>?", TAG, None),
+        # Script and style bodies are raw text up to their end tag.
+        (r"<\s*(?i:script)\b", TAG, _HTML_SCRIPT_TAG),
+        (r"<\s*(?i:style)\b", TAG, _HTML_STYLE_TAG),
+        (r"</?\s*[A-Za-z][A-Za-z0-9:-]*", TAG, _HTML_TAG),
+    ],
+    _HTML_COMMENT: [
+        (r".*?-->", COMMENT, _HTML_TEXT),
+        (r".+", COMMENT, None),
+    ],
+    _HTML_SCRIPT: [(r"</\s*(?i:script)\b", TAG, _HTML_TAG)],
+    _HTML_STYLE: [(r"</\s*(?i:style)\b", TAG, _HTML_TAG)],
+}
+_HTML_STATES.update(_tag_states(_HTML_TAG, _HTML_TAG_DQ, _HTML_TAG_SQ, _HTML_TEXT))
+_HTML_STATES.update(_tag_states(_HTML_SCRIPT_TAG, _HTML_SCRIPT_DQ, _HTML_SCRIPT_SQ, _HTML_SCRIPT))
+_HTML_STATES.update(_tag_states(_HTML_STYLE_TAG, _HTML_STYLE_DQ, _HTML_STYLE_SQ, _HTML_STYLE))
+
+HTML_TOKENIZER = Tokenizer(
+    _HTML_STATES,
+    starts={
+        _HTML_TEXT: "<",
+        _HTML_TAG: r"""[/>"'A-Za-z_:@]""",
+        _HTML_SCRIPT_TAG: r"""[/>"'A-Za-z_:@]""",
+        _HTML_STYLE_TAG: r"""[/>"'A-Za-z_:@]""",
+        _HTML_SCRIPT: "<",
+        _HTML_STYLE: "<",
+    },
+)
+
+
+_CSS_TOP, _CSS_COMMENT, _CSS_BLOCK, _CSS_BLOCK_COMMENT = 0, 1, 2, 3
+
+CSS_TOKENIZER = Tokenizer(
+    {
+        _CSS_TOP: [
+            (r"/\*.*?\*/", COMMENT, None),
+            (r"/\*.*", COMMENT, _CSS_COMMENT),
+            (r"\{", None, _CSS_BLOCK),
+            (r"[^\s{}/](?:[^{}/]|/(?!\*))*?(?=\s*(?:\{|/\*|$))", SELECTOR, None),
+        ],
+        _CSS_COMMENT: [
+            (r".*?\*/", COMMENT, _CSS_TOP),
+            (r".+", COMMENT, None),
+        ],
+        _CSS_BLOCK: [
+            (r"/\*.*?\*/", COMMENT, None),
+            (r"/\*.*", COMMENT, _CSS_BLOCK_COMMENT),
+            # A nested rule (inside @media and the like) ends the outer block
+            # as far as highlighting is concerned.
+            (r"[^\s{};:](?:[^{};/]|/(?!\*))*?(?=\s*\{)", SELECTOR, None),
+            (r"\}", None, _CSS_TOP),
+            (r"[A-Za-z-]+(?=\s*:)", PROPERTY, None),
+            (r":\s*[^;{}\s](?:[^;{}/]|/(?!\*))*?(?=\s*(?:[;{}]|/\*|$))", VALUE, None),
+        ],
+        _CSS_BLOCK_COMMENT: [
+            (r".*?\*/", COMMENT, _CSS_BLOCK),
+            (r".+", COMMENT, None),
+        ],
+    }
+)
+
+
+_TOKENIZERS = {".js": JS_TOKENIZER, ".html": HTML_TOKENIZER, ".css": CSS_TOKENIZER}
+
+
+def tokenizer_for(ext: str) -> Tokenizer:
+    """Tokenizer for a file extension; JavaScript for anything unknown"""
+    return _TOKENIZERS.get(ext.lower(), JS_TOKENIZER)
@@ -0,0 +1,328 @@
+"""Find and replace across a project.
+
+Files are listed with the compiler's walker, so the same directories are
+skipped, and searched on a thread pool; each file's matches are reported
+as soon as it is done. An optional ``TrigramIndex`` narrows a search to
+the files that can contain the pattern, so repeated searches only read a
+handful of files.
+"""
+
+import os
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, NamedTuple, Optional, Pattern, Set, Tuple
+
+from byhunide.build.compiler import _iter_project_files
+from byhunide.editor.file_io import StatKey, read_text, stat_key, write_text_atomic
+
+
+DEFAULT_THREADS = 4
+DEFAULT_MAX_FILE_BYTES = 16 * 1024 * 1024
+DEFAULT_MAX_RESULTS = 10_000
+MAX_MATCHES_PER_FILE = 1000
+# Characters of context kept on each side of a match in its preview.
+PREVIEW_CONTEXT = 80
+
+# Files with a NUL byte in their first block are treated as binary.
+_BINARY_SNIFF_BYTES = 8192
+_REGEX_SPECIAL = set(".^$*+?{}[]()|\\")
+
+
+class SearchQuery(NamedTuple):
+    pattern: str
+    regex: bool = False
+    case_sensitive: bool = False
+    whole_word: bool = False
+
+    def compile(self) -> Pattern:
+        """Raises ``re.error`` for an invalid regular expression"""
+        source = self.pattern if self.regex else re.escape(self.pattern)
+        if self.whole_word:
+            source = rf"\b(?:{source})\b"
+        return re.compile(source, 0 if self.case_sensitive else re.IGNORECASE)
+
+    def literals(self) -> Optional[List[str]]:
+        """Substrings every match must contain, or None if unknown"""
+        if not self.regex:
+            return [self.pattern]
+        return _regex_literals(self.pattern)
+
+
+class Match(NamedTuple):
+    line: int  # 1-based
+    column: int  # 0-based, in characters
+    length: int
+    preview: str  # the line, clipped around the match
+    preview_column: int
+
+
+class FileMatches(NamedTuple):
+    rel: str
+    path: str
+    matches: List[Match]
+    truncated: bool  # more than MAX_MATCHES_PER_FILE matches
+
+
+class SearchSummary(NamedTuple):
+    files_searched: int
+    files_matched: int
+    matches: int
+    seconds: float
+    truncated: bool  # stopped at max_results
+    indexed: bool  # narrowed by a TrigramIndex
+
+
+class ReplaceResult(NamedTuple):
+    changed: List[str]  # relative paths
+    replacements: int
+    errors: List[Tuple[str, str]]  # (relative path, message)
+
+
+def _regex_literals(pattern: str) -> Optional[List[str]]:
+    # Conservative: only plain sequences, escaped punctuation, classes and
+    # simple quantifiers are understood; groups and alternatives give up.
+    runs: List[str] = []
+    current: List[str] = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            escaped = pattern[i + 1:i + 2]
+            i += 2
+            if escaped and not escaped.isalnum():
+                current.append(escaped)
+                continue
+            runs.append("".join(current))
+            current = []
+        elif c in "(|":
+            return None
+        elif c in "*?{":
+            if current:
+                current.pop()  # the previous character is optional
+            runs.append("".join(current))
+            current = []
+            if c == "{":
+                end = pattern.find("}", i)
+                i = len(pattern) if end < 0 else end + 1
+            else:
+                i += 1
+        elif c in _REGEX_SPECIAL:
+            runs.append("".join(current))
+            current = []
+            if c == "[":
+                end = pattern.find("]", i + 2)
+                i = len(pattern) if end < 0 else end + 1
+            else:
+                i += 1
+        else:
+            current.append(c)
+            i += 1
+    runs.append("".join(current))
+    return [run for run in runs if run]
+
+
+def read_searchable(path: str, max_file_bytes: int = DEFAULT_MAX_FILE_BYTES) -> Optional[str]:
+    """The file's text as the editor would show it, or None for binary or oversized files"""
+    key = stat_key(path)
+    if key is None or key[1] > max_file_bytes:
+        return None
+    with open(path, "rb") as f:
+        data = f.read()
+    if b"\0" in data[:_BINARY_SNIFF_BYTES]:
+        return None
+    return data.decode("utf-8", errors="replace").replace("\r\n", "\n")
+
+
+def find_in_text(text: str, regex: Pattern, limit: int = MAX_MATCHES_PER_FILE) -> Tuple[List[Match], bool]:
+    """Matches of ``regex`` in ``text`` and whether there were more than ``limit``"""
+    matches: List[Match] = []
+    line, line_start, line_end, counted = 1, 0, -1, 0
+    for m in regex.finditer(text):
+        start, end = m.span()
+        if start == end:
+            continue  # empty matches are not useful results
+        if len(matches) == limit:
+            return matches, True
+        # Only the text since the previous match is scanned, so many
+        # matches on one long (minified) line stay linear.
+        newlines = text.count("\n", counted, start)
+        if newlines:
+            line += newlines
+            line_start = text.rfind("\n", counted, start) + 1
+        counted = start
+        if line_end < start:
+            line_end = text.find("\n", start)
+            if line_end < 0:
+                line_end = len(text)
+        clip_start = max(line_start, start - PREVIEW_CONTEXT)
+        clip_end = min(line_end, end + PREVIEW_CONTEXT)
+        matches.append(
+            Match(line, start - line_start, end - start, text[clip_start:clip_end], start - clip_start)
+        )
+    return matches, False
+
+
+class TrigramIndex:
+    """Which files can contain a string, by the trigrams of their lowercased UTF-8 bytes.
+
+    Each file keeps a sorted array of its distinct trigrams (about 4 bytes
+    per trigram); ``update()`` only re-reads files whose mtime or size
+    changed. Safe to share between threads.
+    """
+
+    def __init__(self, project_root: str, max_file_bytes: int = DEFAULT_MAX_FILE_BYTES):
+        self.project_root = project_root
+        self.max_file_bytes = max_file_bytes
+        self._files: Dict[str, Tuple[Optional[StatKey], Optional[array]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _grams(text: str) -> array:
+        data = text.lower().encode("utf-8", "surrogatepass")
+        grams = {data[i:i + 3] for i in range(len(data) - 2)}
+        return array("I", sorted(int.from_bytes(g, "big") for g in grams))
+
+    def update(self, files: Optional[List[Tuple[str, str]]] = None) -> None:
+        """Re-index changed files among ``files`` ((rel, path) pairs; default: all)"""
+        if files is None:
+            files = [(rel, src) for rel, src, _ in _iter_project_files(self.project_root, set())]
+        with self._lock:
+            current = {rel for rel, _ in files}
+            for rel in [rel for rel in self._files if rel not in current]:
+                del self._files[rel]
+            for rel, src in files:
+                key = stat_key(src)
+                old = self._files.get(rel)
+                if old is not None and old[0] == key:
+                    continue
+                try:
+                    text = read_searchable(src, self.max_file_bytes)
+                except OSError:
+                    text = None
+                # Unreadable, binary and oversized files have no trigrams: never filtered out.
+                self._files[rel] = (key, None if text is None else self._grams(text))
+
+    def candidates(self, query: SearchQuery, rels: List[str]) -> Optional[List[str]]:
+        """The subset of ``rels`` that may match ``query``, or None if the index cannot tell"""
+        literals = [lit for lit in query.literals() or [] if len(lit.encode("utf-8")) >= 3]
+        if not literals:
+            return None
+        needed = set()
+        for literal in literals:
+            data = literal.lower().encode("utf-8", "surrogatepass")
+            needed.update(int.from_bytes(data[i:i + 3], "big") for i in range(len(data) - 2))
+        with self._lock:
+            result = []
+            for rel in rels:
+                entry = self._files.get(rel)
+                grams = entry[1] if entry is not None else None
+                if grams is None or all(_contains(grams, g) for g in needed):
+                    result.append(rel)
+        return result
+
+
+def _contains(sorted_array: array, value: int) -> bool:
+    pos = bisect_left(sorted_array, value)
+    return pos < len(sorted_array) and sorted_array[pos] == value
+
+
+def search_project(
+    project_root: str,
+    query: SearchQuery,
+    on_file: Callable[[FileMatches], None],
+    cancel: Optional[threading.Event] = None,
+    threads: int = DEFAULT_THREADS,
+    index: Optional[TrigramIndex] = None,
+    max_results: int = DEFAULT_MAX_RESULTS,
+    max_file_bytes: int = DEFAULT_MAX_FILE_BYTES,
+    extensions: Optional[Set[str]] = None,
+) -> SearchSummary:
+    """Search project files (all, or those with ``extensions``), calling
+    ``on_file`` on this thread for each file with matches"""
+    started = time.perf_counter()
+    regex = query.compile()
+    files = [
+        (rel, src)
+        for rel, src, ext in _iter_project_files(project_root, set())
+        if extensions is None or ext in extensions
+    ]
+    indexed = False
+    if index is not None:
+        index.update(files)
+        narrowed = index.candidates(query, [rel for rel, _ in files])
+        if narrowed is not None:
+            keep = set(narrowed)
+            files = [(rel, src) for rel, src in files if rel in keep]
+            indexed = True
+
+    def search_one(rel: str, src: str) -> Optional[FileMatches]:
+        if cancel is not None and cancel.is_set():
+            return None
+        try:
+            text = read_searchable(src, max_file_bytes)
+        except OSError:
+            return None
+        if text is None:
+            return None
+        matches, truncated = find_in_text(text, regex)
+        return FileMatches(rel, src, matches, truncated) if matches else None
+
+    searched = matched = total = 0
+    truncated = False
+    with ThreadPoolExecutor(max_workers=max(1, threads)) as pool:
+        futures = [pool.submit(search_one, rel, src) for rel, src in files]
+        try:
+            for future in as_completed(futures):
+                searched += 1
+                result = future.result()
+                if result is not None:
+                    matched += 1
+                    total += len(result.matches)
+                    on_file(result)
+                if total >= max_results:
+                    truncated = True
+                if truncated or (cancel is not None and cancel.is_set()):
+                    break
+        finally:
+            for future in futures:
+                future.cancel()
+    return SearchSummary(searched, matched, total, time.perf_counter() - started, truncated, indexed)
+
+
+def replace_in_files(
+    project_root: str,
+    query: SearchQuery,
+    replacement: str,
+    rels: List[str],
+    max_file_bytes: int = DEFAULT_MAX_FILE_BYTES,
+) -> ReplaceResult:
+    """Replace every match in the given files; files are written atomically.
+
+    In regex mode ``replacement`` may use group references (``\\1``,
+    ``\\g<name>``); otherwise it is inserted literally.
+    """
+    regex = query.compile()
+    repl = replacement if query.regex else (lambda _m: replacement)
+    changed: List[str] = []
+    errors: List[Tuple[str, str]] = []
+    count = 0
+    for rel in rels:
+        path = os.path.join(project_root, rel)
+        try:
+            if read_searchable(path, max_file_bytes) is None:
+                continue
+            loaded = read_text(path)
+            text, n = regex.subn(repl, loaded.text)
+            if n == 0:
+                continue
+            write_text_atomic(path, text, loaded.state)
+        except (OSError, re.error) as e:
+            errors.append((rel, str(e)))
+            continue
+        changed.append(rel)
+        count += n
+    return ReplaceResult(changed, count, errors)
@@ -0,0 +1,101 @@
+import threading
+from typing import Optional
+
+from PySide6.QtCore import QObject, Signal, Slot
+
+from byhunide.build.cache import BuildCache
+from byhunide.build.compiler import BuildCancelled, compile_project
+from byhunide.build.watch import DEFAULT_INTERVAL, ProjectWatcher
+
+
+class BuildWorker(QObject):
+    """Runs ``compile_project`` off the GUI thread and reports back through signals"""
+
+    progress = Signal(int, int, str)
+    succeeded = Signal(object)  # BuildResult
+    failed = Signal(str)
+    cancelled = Signal()
+    done = Signal()
+
+    def __init__(
+        self,
+        project_root: str,
+        out_path: str,
+        cache: Optional[BuildCache],
+        profile: str,
+        workers: int,
+        write_report: bool = False,
+        minify: bool = True,
+        dedup: bool = False,
+        bundle: bool = False,
+    ):
+        super().__init__()
+        self.project_root = project_root
+        self.out_path = out_path
+        self.cache = cache
+        self.profile = profile
+        self.workers = workers
+        self.write_report = write_report
+        self.minify = minify
+        self.dedup = dedup
+        self.bundle = bundle
+        self._cancel = threading.Event()
+
+    def cancel(self) -> None:
+        """Request cancellation; safe to call from any thread"""
+        self._cancel.set()
+
+    def is_cancelling(self) -> bool:
+        return self._cancel.is_set()
+
+    @Slot()
+    def run(self) -> None:
+        try:
+            result = compile_project(
+                self.project_root,
+                self.out_path,
+                cache=self.cache,
+                workers=self.workers,
+                profile=self.profile,
+                progress=self.progress.emit,
+                cancel=self._cancel.is_set,
+                write_report=self.write_report,
+                minify=self.minify,
+                dedup=self.dedup,
+                bundle=self.bundle,
+            )
+        except BuildCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.succeeded.emit(result)
+        finally:
+            self.done.emit()
+
+
+class WatchWorker(QObject):
+    """Runs a ``ProjectWatcher`` off the GUI thread until stopped"""
+
+    updated = Signal(object)  # WatchUpdate
+    failed = Signal(str)
+    done = Signal()
+
+    def __init__(self, watcher: ProjectWatcher, interval: float = DEFAULT_INTERVAL):
+        super().__init__()
+        self.watcher = watcher
+        self.interval = interval
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        """Request the watch loop to end; safe to call from any thread"""
+        self._stop.set()
+
+    @Slot()
+    def run(self) -> None:
+        try:
+            self.watcher.run(self._stop, self.interval, self.updated.emit, lambda e: self.failed.emit(str(e)))
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            self.done.emit()
@@ -1,16 +1,20 @@
 import os
-from typing import Optional
+import time
+from typing import Dict, List, Optional, Set
 
-from PySide6.QtCore import QDir, QModelIndex, Qt
-from PySide6.QtGui import QAction, QKeySequence
+from PySide6.QtCore import QDir, QModelIndex, Qt, QThread, QTimer
+from PySide6.QtGui import QAction, QActionGroup, QCloseEvent, QKeySequence
 from PySide6.QtWidgets import (
     QAbstractItemView,
+    QDockWidget,
     QFileDialog,
     QFileSystemModel,
     QHBoxLayout,
     QInputDialog,
+    QLabel,
     QMainWindow,
     QMessageBox,
+    QProgressBar,
     QSplitter,
     QStatusBar,
     QTabWidget,
@@ -19,12 +23,32 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
-from byhunide.build.compiler import compile_project
-from byhunide.editor.editor_tab import EditorTab
+from byhunide.build.cache import BuildCache
+from byhunide.build.package import PACKAGE_EXTENSION
+from byhunide.build.profiles import DEFAULT_PROFILE, PROFILES
+from byhunide.build.report import BuildResult, report_path
+from byhunide.build.watch import ProjectWatcher, WatchUpdate
+from byhunide.editor.completion_service import CompletionService
+from byhunide.editor.editor_tab import LARGE_FILE_BYTES, EditorTab
+from byhunide.editor.io_worker import TabIO
+from byhunide.editor.symbol_worker import SymbolIndexWorker
+from byhunide.editor.symbols import SymbolIndex
 from byhunide.file_types import ALLOWED_EXTENSIONS, is_allowed_file
+from byhunide.ui.build_worker import BuildWorker, WatchWorker
+from byhunide.ui.search_panel import SearchPanel
+from byhunide.ui.workers import start_worker_thread
 from byhunide.ui.theme import apply_dark_theme
 
 
+# Unmodified tabs not shown for this long release their document; 0 disables it.
+DEFAULT_HIBERNATE_MINUTES = 10
+# How often background tabs are checked for hibernation.
+HIBERNATE_CHECK_MS = 30_000
+
+_ZIP_FILTER = "ZIP (*.zip)"
+_PACKAGE_FILTER = f"Indexed ByHun package (*{PACKAGE_EXTENSION})"
+
+
 class ByHunIDE(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -32,6 +56,37 @@ class ByHunIDE(QMainWindow):
         self.setMinimumSize(1000, 650)
 
         self.project_root: Optional[str] = None
+        self.build_cache = BuildCache()
+        self.build_profile = DEFAULT_PROFILE
+        self.write_build_report = False
+        self.minify_sources = True
+        self.dedup_files = False
+        self.bundle_assets = False
+        self.large_file_bytes = LARGE_FILE_BYTES
+        self.lazy_highlighting = True
+        self.hibernate_minutes = DEFAULT_HIBERNATE_MINUTES
+        self.tab_io = TabIO(self)
+        self.completion = CompletionService(self)
+        self._build_worker: Optional[BuildWorker] = None
+        self._build_thread: Optional[QThread] = None
+        self._build_progress = (0, 0)
+        self._watch_worker: Optional[WatchWorker] = None
+        self._watch_thread: Optional[QThread] = None
+        self._symbol_worker: Optional[SymbolIndexWorker] = None
+        self._symbol_thread: Optional[QThread] = None
+
+        # Build requests go through a zero-delay timer so a burst of F5
+        # presses queued in the event loop starts at most one build.
+        self._build_request = QTimer(self)
+        self._build_request.setSingleShot(True)
+        self._build_request.setInterval(0)
+        self._build_request.timeout.connect(self._start_build)
+
+        self._active_tab: Optional[EditorTab] = None
+        self._hibernate_timer = QTimer(self)
+        self._hibernate_timer.setInterval(HIBERNATE_CHECK_MS)
+        self._hibernate_timer.timeout.connect(self.hibernate_idle_tabs)
+        self._hibernate_timer.start()
 
         self._setup_ui()
         self._setup_actions()
@@ -41,6 +96,16 @@ class ByHunIDE(QMainWindow):
         self.status = QStatusBar(self)
         self.setStatusBar(self.status)
 
+        self.build_progress_bar = QProgressBar(self)
+        self.build_progress_bar.setMaximumWidth(200)
+        self.build_progress_bar.setTextVisible(True)
+        self.build_progress_bar.hide()
+        self.status.addPermanentWidget(self.build_progress_bar)
+
+        self.editor_mode_label = QLabel(self)
+        self.editor_mode_label.hide()
+        self.status.addPermanentWidget(self.editor_mode_label)
+
         splitter = QSplitter(Qt.Orientation.Horizontal, self)
 
         self.fs_model = QFileSystemModel(self)
@@ -58,6 +123,7 @@ class ByHunIDE(QMainWindow):
         self.tabs.setDocumentMode(True)
         self.tabs.setTabsClosable(True)
         self.tabs.tabCloseRequested.connect(self._close_tab)
+        self.tabs.currentChanged.connect(self._on_current_tab_changed)
 
         splitter.addWidget(self.tree)
         splitter.addWidget(self.tabs)
@@ -72,6 +138,15 @@ class ByHunIDE(QMainWindow):
         central.setLayout(layout)
         self.setCentralWidget(central)
 
+        self.search_panel = SearchPanel(self.tab_io, self._modified_paths, self)
+        self.search_panel.open_location.connect(self._open_location)
+        self.search_panel.files_replaced.connect(self._reload_unmodified)
+        self.search_dock = QDockWidget("Find in Files", self)
+        self.search_dock.setObjectName("search_dock")
+        self.search_dock.setWidget(self.search_panel)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.search_dock)
+        self.search_dock.hide()
+
         self.toolbar = QToolBar("Main", self)
         self.toolbar.setMovable(False)
         self.addToolBar(Qt.ToolBarArea.TopToolBarArea, self.toolbar)
@@ -96,10 +171,19 @@ class ByHunIDE(QMainWindow):
         self.action_save_as.setShortcut(QKeySequence.StandardKey.SaveAs)
         self.action_save_as.triggered.connect(self.save_current_as)
 
+        self.action_save_all = QAction("Save All", self)
+        self.action_save_all.setShortcut(QKeySequence("Ctrl+Alt+S"))
+        self.action_save_all.triggered.connect(self.save_all)
+
         self.action_compile = QAction("Build", self)
         self.action_compile.setShortcut(QKeySequence(Qt.Key.Key_F5))
         self.action_compile.triggered.connect(self.build_project)
 
+        self.action_cancel_build = QAction("Cancel Build", self)
+        self.action_cancel_build.setShortcut(QKeySequence("Shift+F5"))
+        self.action_cancel_build.setEnabled(False)
+        self.action_cancel_build.triggered.connect(self.cancel_build)
+
         self.toolbar.addAction(self.action_open_folder)
         self.toolbar.addAction(self.action_open_file)
         self.toolbar.addAction(self.action_new_file)
@@ -108,6 +192,7 @@ class ByHunIDE(QMainWindow):
         self.toolbar.addAction(self.action_save_as)
         self.toolbar.addSeparator()
         self.toolbar.addAction(self.action_compile)
+        self.toolbar.addAction(self.action_cancel_build)
 
         menu_file = self.menuBar().addMenu("File")
         menu_file.addAction(self.action_open_folder)
@@ -116,11 +201,79 @@ class ByHunIDE(QMainWindow):
         menu_file.addSeparator()
         menu_file.addAction(self.action_save)
         menu_file.addAction(self.action_save_as)
+        menu_file.addAction(self.action_save_all)
         menu_file.addSeparator()
         menu_file.addAction("Exit", self.close)
 
+        menu_editor = self.menuBar().addMenu("Editor")
+        action_large_file = QAction("Large File Threshold...", self)
+        action_large_file.setStatusTip("Files at least this big open without highlighting or completion")
+        action_large_file.triggered.connect(self._ask_large_file_threshold)
+        menu_editor.addAction(action_large_file)
+
+        self.action_lazy_highlighting = QAction("Lazy Highlighting", self, checkable=True)
+        self.action_lazy_highlighting.setStatusTip(
+            "Highlight only what is on screen right away and the rest of the file when idle"
+        )
+        self.action_lazy_highlighting.setChecked(self.lazy_highlighting)
+        self.action_lazy_highlighting.toggled.connect(self._set_lazy_highlighting)
+        menu_editor.addAction(self.action_lazy_highlighting)
+
+        action_hibernate = QAction("Hibernate Idle Tabs After...", self)
+        action_hibernate.setStatusTip("Unmodified background tabs release their memory and reload when shown")
+        action_hibernate.triggered.connect(self._ask_hibernate_minutes)
+        menu_editor.addAction(action_hibernate)
+
+        self.action_find_in_files = QAction("Find in Files...", self)
+        self.action_find_in_files.setShortcut(QKeySequence("Ctrl+Shift+F"))
+        self.action_find_in_files.setStatusTip("Search and replace across the project")
+        self.action_find_in_files.triggered.connect(self.show_find_in_files)
+        menu_editor.addAction(self.action_find_in_files)
+
         menu_build = self.menuBar().addMenu("Build")
         menu_build.addAction(self.action_compile)
+        menu_build.addAction(self.action_cancel_build)
+
+        self.action_watch = QAction("Watch Mode", self, checkable=True)
+        self.action_watch.setStatusTip("Keep the build archive up to date as project files change")
+        self.action_watch.toggled.connect(self._set_watch_mode)
+        menu_build.addAction(self.action_watch)
+        menu_build.addSeparator()
+
+        self.action_build_report = QAction("Write Build Report", self, checkable=True)
+        self.action_build_report.setStatusTip("Save per-file timings and sizes as JSON next to the archive")
+        self.action_build_report.setChecked(self.write_build_report)
+        self.action_build_report.toggled.connect(self._set_write_build_report)
+        menu_build.addAction(self.action_build_report)
+
+        self.action_minify = QAction("Minify Sources", self, checkable=True)
+        self.action_minify.setStatusTip("Strip comments and whitespace from HTML, CSS and JS before obfuscation")
+        self.action_minify.setChecked(self.minify_sources)
+        self.action_minify.toggled.connect(self._set_minify_sources)
+        menu_build.addAction(self.action_minify)
+
+        self.action_dedup = QAction("Deduplicate Identical Files", self, checkable=True)
+        self.action_dedup.setStatusTip("Store files with identical content once and alias the other paths")
+        self.action_dedup.setChecked(self.dedup_files)
+        self.action_dedup.toggled.connect(self._set_dedup_files)
+        menu_build.addAction(self.action_dedup)
+
+        self.action_bundle = QAction("Bundle Scripts and Styles", self, checkable=True)
+        self.action_bundle.setStatusTip("Inline local scripts and stylesheets into each HTML page")
+        self.action_bundle.setChecked(self.bundle_assets)
+        self.action_bundle.toggled.connect(self._set_bundle_assets)
+        menu_build.addAction(self.action_bundle)
+
+        menu_profile = menu_build.addMenu("Protection Profile")
+        self.profile_actions = QActionGroup(self)
+        self.profile_actions.setExclusive(True)
+        for name, profile in PROFILES.items():
+            action = QAction(name.capitalize(), self, checkable=True)
+            action.setStatusTip(profile.description)
+            action.setChecked(name == self.build_profile)
+            action.triggered.connect(lambda _=False, n=name: self.set_build_profile(n))
+            self.profile_actions.addAction(action)
+            menu_profile.addAction(action)
 
     def open_folder(self) -> None:
         folder = QFileDialog.getExistingDirectory(self, "Open Project Folder")
@@ -129,10 +282,97 @@ class ByHunIDE(QMainWindow):
         self.set_project_root(folder)
 
     def set_project_root(self, folder: str) -> None:
+        self.stop_watch()
         self.project_root = folder
         root_index = self.fs_model.setRootPath(folder)
         self.tree.setRootIndex(root_index)
         self.status.showMessage(f"Project: {folder}", 5000)
+        self.search_panel.set_project_root(folder)
+        self._start_symbol_index()
+
+    def set_build_profile(self, name: str) -> None:
+        self.build_profile = name
+        self.status.showMessage(f"Protection profile: {name} - {PROFILES[name].description}", 5000)
+
+    def _set_write_build_report(self, enabled: bool) -> None:
+        self.write_build_report = enabled
+
+    def _set_minify_sources(self, enabled: bool) -> None:
+        self.minify_sources = enabled
+
+    def _set_dedup_files(self, enabled: bool) -> None:
+        self.dedup_files = enabled
+
+    def _set_bundle_assets(self, enabled: bool) -> None:
+        self.bundle_assets = enabled
+
+    def _ask_large_file_threshold(self) -> None:
+        mb, ok = QInputDialog.getInt(
+            self,
+            "Large File Threshold",
+            "Open files of at least this many MB in large-file mode:",
+            max(1, self.large_file_bytes // (1024 * 1024)),
+            1,
+            1024,
+        )
+        if ok:
+            self.large_file_bytes = mb * 1024 * 1024
+
+    def _ask_hibernate_minutes(self) -> None:
+        minutes, ok = QInputDialog.getInt(
+            self,
+            "Tab Hibernation",
+            "Hibernate unmodified tabs not viewed for this many minutes (0 = never):",
+            self.hibernate_minutes,
+            0,
+            24 * 60,
+        )
+        if ok:
+            self.hibernate_minutes = minutes
+
+    def _on_current_tab_changed(self, _index: int) -> None:
+        now = time.monotonic()
+        if self._active_tab is not None:
+            self._active_tab.last_active = now
+        tab = self.current_tab()
+        self._active_tab = tab
+        if tab is not None:
+            tab.last_active = now
+            tab.wake()
+        self._update_editor_mode()
+
+    def hibernate_idle_tabs(self, idle_seconds: Optional[float] = None) -> int:
+        """Hibernate background tabs idle for ``idle_seconds`` (default: the configured
+        minutes); returns how many were hibernated"""
+        if idle_seconds is None:
+            if self.hibernate_minutes <= 0:
+                return 0
+            idle_seconds = self.hibernate_minutes * 60
+        now = time.monotonic()
+        current = self.current_tab()
+        count = 0
+        for tab in self._editor_tabs():
+            if tab is not current and now - tab.last_active >= idle_seconds and tab.hibernate():
+                count += 1
+        return count
+
+    def _set_lazy_highlighting(self, enabled: bool) -> None:
+        self.lazy_highlighting = enabled
+        for tab in self._editor_tabs():
+            tab.set_lazy_highlighting(enabled)
+
+    def _update_editor_mode(self) -> None:
+        tab = self.current_tab()
+        if tab is None or not tab.large_file:
+            self.editor_mode_label.hide()
+            return
+        if tab.is_loading():
+            done, total = tab.load_state()
+            text = f"Large file: loading {done * 100 // max(total, 1)}%"
+        else:
+            text = "Large file: highlighting and completion off"
+        self.editor_mode_label.setText(text)
+        self.editor_mode_label.show()
 
     def _on_tree_double_clicked(self, index: QModelIndex) -> None:
         if not index.isValid():
@@ -171,11 +411,51 @@ class ByHunIDE(QMainWindow):
                 self.tabs.setCurrentIndex(i)
                 return
 
-        tab = EditorTab(file_path, self)
+        tab = EditorTab(
+            file_path,
+            self,
+            large_file_bytes=self.large_file_bytes,
+            io=self.tab_io,
+            completion=self.completion,
+            lazy_highlighting=self.lazy_highlighting,
+        )
+        tab.load_progress.connect(lambda *_: self._update_editor_mode())
+        tab.load_finished.connect(self._update_editor_mode)
+        tab.load_failed.connect(lambda message, t=tab: self._on_tab_load_failed(t, message))
+        tab.saved.connect(lambda written, t=tab: self._on_tab_saved(t, written))
+        tab.save_failed.connect(lambda message: QMessageBox.critical(self, "Save error", message))
         tab.load_from_disk()
         name = os.path.basename(file_path)
         self.tabs.addTab(tab, name)
         self.tabs.setCurrentWidget(tab)
+        self._update_editor_mode()
+
+    def _editor_tabs(self) -> List[EditorTab]:
+        return [w for w in (self.tabs.widget(i) for i in range(self.tabs.count())) if isinstance(w, EditorTab)]
+
+    def _modified_paths(self) -> Set[str]:
+        return {tab.file_path for tab in self._editor_tabs() if tab.file_path and tab.is_modified()}
+
+    def show_find_in_files(self) -> None:
+        tab = self.current_tab()
+        selected = tab.editor.textCursor().selectedText() if tab is not None else ""
+        self.search_dock.show()
+        # A multi-line selection is not a useful search term.
+        self.search_panel.focus_find(selected if "\u2029" not in selected else "")
+
+    def _open_location(self, path: str, line: int, column: int, length: int) -> None:
+        self.open_file(path)
+        tab = self.current_tab()
+        if tab is not None and tab.file_path == path:
+            tab.go_to(line, column, length)
+
+    def _reload_unmodified(self, paths: List[str]) -> None:
+        """Reload open tabs whose files were rewritten on disk"""
+        changed = {os.path.normcase(os.path.abspath(p)) for p in paths}
+        for tab in self._editor_tabs():
+            if tab.file_path and os.path.normcase(os.path.abspath(tab.file_path)) in changed:
+                if not tab.is_modified() and not tab.is_busy():
+                    tab.load_from_disk()
 
     def _confirm_discard_if_modified(self, tab: EditorTab) -> bool:
         if not tab.is_modified():
@@ -193,9 +473,22 @@ class ByHunIDE(QMainWindow):
         if resp == QMessageBox.StandardButton.Cancel:
             return False
         if resp == QMessageBox.StandardButton.Yes:
-            return self._save_tab(tab)
+            if not self._save_tab(tab):
+                return False
+            tab.wait_for_io()
+            return not tab.is_modified()
         return True
 
+    def _on_tab_load_failed(self, tab: EditorTab, message: str) -> None:
+        index = self.tabs.indexOf(tab)
+        if index >= 0:
+            self.tabs.removeTab(index)
+        QMessageBox.warning(self, "Open error", message)
+
+    def _on_tab_saved(self, tab: EditorTab, written: bool) -> None:
+        name = os.path.basename(tab.file_path or "")
+        self.status.showMessage(f"Saved {name}." if written else f"{name}: no changes to save.", 2000)
+
     def _close_tab(self, index: int) -> None:
         w = self.tabs.widget(index)
         if not isinstance(w, EditorTab):
@@ -203,6 +496,8 @@ class ByHunIDE(QMainWindow):
             return
         if not self._confirm_discard_if_modified(w):
             return
+        w.cancel_loading()
+        w.editor.cancel_completion()
         self.tabs.removeTab(index)
 
     def new_file(self) -> None:
@@ -233,9 +528,11 @@ class ByHunIDE(QMainWindow):
     def _save_tab(self, tab: EditorTab) -> bool:
         if tab.file_path is None:
             return self.save_current_as()
+        if tab.is_loading():
+            self.status.showMessage("Wait for the file to finish loading before saving.", 3000)
+            return False
         try:
             tab.save_to_disk()
-            self.status.showMessage("Saved.", 2000)
             return True
         except Exception as e:
             QMessageBox.critical(self, "Save error", str(e))
@@ -247,10 +544,25 @@ class ByHunIDE(QMainWindow):
             return
         self._save_tab(tab)
 
+    def save_all(self) -> None:
+        """Save every modified tab; the writes run concurrently on the I/O pool"""
+        tabs = [
+            w
+            for w in (self.tabs.widget(i) for i in range(self.tabs.count()))
+            if isinstance(w, EditorTab) and w.file_path and w.is_modified() and not w.is_loading()
+        ]
+        for tab in tabs:
+            self._save_tab(tab)
+        if len(tabs) > 1:
+            self.status.showMessage(f"Saving {len(tabs)} files...", 2000)
+
     def save_current_as(self) -> bool:
         tab = self.current_tab()
         if not tab:
             return False
+        if tab.is_loading():
+            self.status.showMessage("Wait for the file to finish loading before saving.", 3000)
+            return False
 
         start_dir = self.project_root or os.getcwd()
         file_path, _ = QFileDialog.getSaveFileName(
@@ -269,24 +581,216 @@ class ByHunIDE(QMainWindow):
         self.tabs.setTabText(self.tabs.currentIndex(), os.path.basename(file_path))
         return self._save_tab(tab)
 
+    def is_building(self) -> bool:
+        return self._build_worker is not None
+
     def build_project(self) -> None:
-        if not self.project_root:
-            QMessageBox.information(self, "Project", "Open a project folder first.")
+        if self.is_building():
+            # Reuse the running build instead of starting another one.
+            done, total = self._build_progress
+            self.status.showMessage(f"Build already running ({done}/{total} files)", 3000)
+            return
+        self._build_request.start()
+
+    def _start_build(self) -> None:
+        if self.is_building():
+            return
+        out_path = self._ask_build_path()
+        if not out_path:
             return
 
-        out_path, _ = QFileDialog.getSaveFileName(
+        self.build_cache.reset_stats()
+        worker = BuildWorker(
+            self.project_root,
+            out_path,
+            self.build_cache,
+            self.build_profile,
+            os.cpu_count() or 1,
+            self.write_build_report,
+            self.minify_sources,
+            self.dedup_files,
+            self.bundle_assets,
+        )
+        worker.progress.connect(self._on_build_progress)
+        worker.succeeded.connect(self._on_build_succeeded)
+        worker.failed.connect(self._on_build_failed)
+        worker.cancelled.connect(self._on_build_cancelled)
+        worker.done.connect(self._on_build_done)
+
+        self._build_worker = worker
+        self._build_progress = (0, 0)
+        self.action_cancel_build.setEnabled(True)
+        self.build_progress_bar.setRange(0, 0)
+        self.build_progress_bar.show()
+        self.status.showMessage("Building...")
+        self._build_thread = start_worker_thread(worker, self)
+
+    def _ask_build_path(self) -> Optional[str]:
+        if not self.project_root:
+            QMessageBox.information(self, "Project", "Open a project folder first.")
+            return None
+        out_path, selected_filter = QFileDialog.getSaveFileName(
             self,
-            "Save Build (ZIP)",
+            "Save Build",
             os.path.join(self.project_root, "build.zip"),
-            "ZIP (*.zip)",
+            f"{_ZIP_FILTER};;{_PACKAGE_FILTER}",
+        )
+        if not out_path:
+            return None
+        if not out_path.lower().endswith((".zip", PACKAGE_EXTENSION)):
+            out_path += PACKAGE_EXTENSION if selected_filter == _PACKAGE_FILTER else ".zip"
+        return out_path
+
+    def cancel_build(self) -> None:
+        if self._build_worker is None:
+            return
+        self._build_worker.cancel()
+        self.action_cancel_build.setEnabled(False)
+        self.status.showMessage("Cancelling build...")
+
+    def _on_build_progress(self, done: int, total: int, rel_path: str) -> None:
+        self._build_progress = (done, total)
+        self.build_progress_bar.setRange(0, max(total, 1))
+        self.build_progress_bar.setValue(done)
+        if self._build_worker is not None and not self._build_worker.is_cancelling() and rel_path:
+            self.status.showMessage(f"Building {done + 1}/{total}: {rel_path}")
+
+    def _on_build_succeeded(self, result: BuildResult) -> None:
+        self.status.showMessage(
+            f"Build finished in {result.total_s:.1f} s - cache: {self.build_cache.hits} hits, "
+            f"{self.build_cache.misses} misses",
+            5000,
         )
+        message = f"Build saved to:\n{result.out_path}\n\n{result.summary()}"
+        if self.write_build_report:
+            message += f"\n\nReport: {report_path(result.out_path)}"
+        QMessageBox.information(self, "Build complete", message)
+
+    def _on_build_failed(self, message: str) -> None:
+        self.status.clearMessage()
+        QMessageBox.critical(self, "Build error", message)
+
+    def _on_build_cancelled(self) -> None:
+        self.status.showMessage("Build cancelled.", 5000)
+
+    def _on_build_done(self) -> None:
+        self._build_worker = None
+        self._build_thread = None
+        self.action_cancel_build.setEnabled(False)
+        self.build_progress_bar.hide()
+
+    def is_watching(self) -> bool:
+        return self._watch_worker is not None
+
+    def _set_watch_mode(self, enabled: bool) -> None:
+        if enabled:
+            self.start_watch()
+        else:
+            self.stop_watch()
+
+    def start_watch(self) -> None:
+        if self.is_watching():
+            return
+        if self.is_building():
+            self.status.showMessage("Wait for the running build to finish before watching.", 5000)
+            self._uncheck_watch_action()
+            return
+        out_path = self._ask_build_path()
         if not out_path:
+            self._uncheck_watch_action()
             return
-        if not out_path.lower().endswith(".zip"):
-            out_path += ".zip"
 
-        try:
-            compile_project(self.project_root, out_path)
-            QMessageBox.information(self, "Build complete", f"Build saved to:\n{out_path}")
-        except Exception as e:
-            QMessageBox.critical(self, "Build error", str(e))
+        watcher = ProjectWatcher(
+            self.project_root,
+            out_path,
+            cache=self.build_cache,
+            workers=os.cpu_count() or 1,
+            profile=self.build_profile,
+            minify=self.minify_sources,
+            dedup=self.dedup_files,
+            bundle=self.bundle_assets,
+        )
+        worker = WatchWorker(watcher)
+        worker.updated.connect(self._on_watch_update)
+        worker.failed.connect(self._on_watch_failed)
+        worker.done.connect(self._on_watch_done)
+        self._watch_worker = worker
+        # Builds would race the watcher for the same archive.
+        self.action_compile.setEnabled(False)
+        self.status.showMessage(f"Watching {self.project_root} -> {out_path}")
+        self._watch_thread = start_worker_thread(worker, self)
+
+    def stop_watch(self, wait: bool = False) -> None:
+        if self._watch_worker is None:
+            return
+        self._watch_worker.stop()
+        if wait and self._watch_thread is not None:
+            self._watch_thread.wait()
+
+    def _uncheck_watch_action(self) -> None:
+        self.action_watch.blockSignals(True)
+        self.action_watch.setChecked(False)
+        self.action_watch.blockSignals(False)
+
+    def _on_watch_update(self, update: WatchUpdate) -> None:
+        if update.full_rebuild:
+            what = f"rebuilt {len(update.changed)} files"
+        else:
+            what = ", ".join(update.changed + [f"removed {rel}" for rel in update.removed])
+        self.status.showMessage(f"Watch: {what} ({update.seconds:.2f} s)")
+
+    def _on_watch_failed(self, message: str) -> None:
+        # Shown in the status bar: a dialog on every failing poll would be unusable.
+        self.status.showMessage(f"Watch build error: {message}")
+
+    def _on_watch_done(self) -> None:
+        self._watch_worker = None
+        self._watch_thread = None
+        self.action_compile.setEnabled(True)
+        self._uncheck_watch_action()
+        self.status.showMessage("Watch mode stopped.", 3000)
+
+    def _start_symbol_index(self) -> None:
+        self.stop_symbol_index()
+        self.completion.set_project_words({})
+        worker = SymbolIndexWorker(SymbolIndex(self.project_root))
+        worker.updated.connect(self._on_symbols_updated)
+        worker.failed.connect(self._on_symbols_failed)
+        worker.done.connect(self._on_symbols_done)
+        self._symbol_worker = worker
+        self._symbol_thread = start_worker_thread(worker, self)
+
+    def stop_symbol_index(self, wait: bool = False) -> None:
+        if self._symbol_worker is None:
+            return
+        self._symbol_worker.stop()
+        if wait and self._symbol_thread is not None:
+            self._symbol_thread.wait()
+        self._symbol_worker = None
+        self._symbol_thread = None
+
+    def _on_symbols_updated(self, words: Dict[str, List[str]]) -> None:
+        # A stopped index may still deliver one last update for the old project.
+        if self.sender() is self._symbol_worker:
+            self.completion.set_project_words(words)
+
+    def _on_symbols_failed(self, message: str) -> None:
+        self.status.showMessage(f"Symbol index error: {message}", 5000)
+
+    def _on_symbols_done(self) -> None:
+        if self.sender() is self._symbol_worker:
+            self._symbol_worker = None
+            self._symbol_thread = None
+
+    def closeEvent(self, event: QCloseEvent) -> None:
+        for i in range(self.tabs.count()):
+            w = self.tabs.widget(i)
+            if isinstance(w, EditorTab):
+                w.wait_for_io()
+        self.stop_watch(wait=True)
+        self.stop_symbol_index(wait=True)
+        self.search_panel.cancel_search(wait=True)
+        if self._build_worker is not None and self._build_thread is not None:
+            self._build_worker.cancel()
+            self._build_thread.wait()
+        super().closeEvent(event)
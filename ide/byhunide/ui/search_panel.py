@@ -0,0 +1,264 @@
+import itertools
+import os
+import re
+from typing import Callable, List, Optional, Set
+
+from PySide6.QtCore import Qt, QThread, Signal
+from PySide6.QtWidgets import (
+    QCheckBox,
+    QGridLayout,
+    QLabel,
+    QLineEdit,
+    QMessageBox,
+    QPushButton,
+    QTreeWidget,
+    QTreeWidgetItem,
+    QWidget,
+)
+
+from byhunide.editor.io_worker import TabIO
+from byhunide.file_types import ALLOWED_EXTENSIONS
+from byhunide.search import FileMatches, ReplaceResult, SearchQuery, SearchSummary, TrigramIndex, replace_in_files
+from byhunide.ui.search_worker import SearchWorker
+from byhunide.ui.workers import start_worker_thread
+
+
+# Result items hold (path, line, column, length) under this role.
+_LOCATION_ROLE = Qt.ItemDataRole.UserRole
+
+
+def _path_key(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+class SearchPanel(QWidget):
+    """Find in the project's HTML, CSS and JS files; results stream in as files are searched.
+
+    ``modified_paths`` returns the files open with unsaved changes;
+    replace-in-files leaves them alone so no edits are lost.
+    """
+
+    # (path, line, column, length) of a clicked match
+    open_location = Signal(str, int, int, int)
+    # Absolute paths rewritten by a replace.
+    files_replaced = Signal(list)
+
+    def __init__(self, io: TabIO, modified_paths: Callable[[], Set[str]], parent=None):
+        super().__init__(parent)
+        self._io = io
+        self._modified_paths = modified_paths
+        self.project_root: Optional[str] = None
+        self._index: Optional[TrigramIndex] = None
+        self._worker: Optional[SearchWorker] = None
+        self._search_ids = itertools.count(1)
+        self._search_id = 0
+        self._thread: Optional[QThread] = None
+        self._query: Optional[SearchQuery] = None
+        self._result_files: List[str] = []
+        self._match_count = 0
+
+        self.find_edit = QLineEdit(self)
+        self.find_edit.setPlaceholderText("Find")
+        self.find_edit.returnPressed.connect(self.start_search)
+        self.replace_edit = QLineEdit(self)
+        self.replace_edit.setPlaceholderText("Replace")
+
+        self.regex_box = QCheckBox("Regex", self)
+        self.case_box = QCheckBox("Match Case", self)
+        self.word_box = QCheckBox("Whole Word", self)
+        self.index_box = QCheckBox("Use Index", self)
+        self.index_box.setToolTip("Keep a trigram index of the project so repeated searches skip most files")
+        self.index_box.toggled.connect(self._set_use_index)
+
+        self.find_button = QPushButton("Find", self)
+        self.find_button.clicked.connect(self.start_search)
+        self.stop_button = QPushButton("Stop", self)
+        self.stop_button.setEnabled(False)
+        self.stop_button.clicked.connect(self.cancel_search)
+        self.replace_button = QPushButton("Replace All", self)
+        self.replace_button.setEnabled(False)
+        self.replace_button.clicked.connect(self.replace_all)
+
+        self.results = QTreeWidget(self)
+        self.results.setHeaderHidden(True)
+        self.results.setUniformRowHeights(True)
+        self.results.itemActivated.connect(self._on_item_activated)
+        self.summary_label = QLabel(self)
+
+        layout = QGridLayout(self)
+        layout.setContentsMargins(6, 6, 6, 6)
+        layout.addWidget(self.find_edit, 0, 0)
+        layout.addWidget(self.find_button, 0, 1)
+        layout.addWidget(self.stop_button, 0, 2)
+        layout.addWidget(self.replace_edit, 1, 0)
+        layout.addWidget(self.replace_button, 1, 1, 1, 2)
+        options = QWidget(self)
+        options_layout = QGridLayout(options)
+        options_layout.setContentsMargins(0, 0, 0, 0)
+        for column, box in enumerate((self.regex_box, self.case_box, self.word_box, self.index_box)):
+            options_layout.addWidget(box, 0, column)
+        layout.addWidget(options, 2, 0, 1, 3)
+        layout.addWidget(self.results, 3, 0, 1, 3)
+        layout.addWidget(self.summary_label, 4, 0, 1, 3)
+        self.setLayout(layout)
+
+    def set_project_root(self, folder: Optional[str]) -> None:
+        if self._worker is not None:
+            self.cancel_search()
+            self._search_ended()  # and ignore anything it still reports
+        self.project_root = folder
+        self._index = TrigramIndex(folder) if folder and self.index_box.isChecked() else None
+        self._clear_results()
+
+    def _set_use_index(self, enabled: bool) -> None:
+        # Built lazily by the next search; dropped when turned off to free its memory.
+        self._index = TrigramIndex(self.project_root) if enabled and self.project_root else None
+
+    def focus_find(self, text: str = "") -> None:
+        if text:
+            self.find_edit.setText(text)
+        self.find_edit.setFocus()
+        self.find_edit.selectAll()
+
+    def is_searching(self) -> bool:
+        return self._worker is not None
+
+    def _current_query(self) -> SearchQuery:
+        return SearchQuery(
+            self.find_edit.text(),
+            regex=self.regex_box.isChecked(),
+            case_sensitive=self.case_box.isChecked(),
+            whole_word=self.word_box.isChecked(),
+        )
+
+    def _clear_results(self) -> None:
+        self.results.clear()
+        self._result_files = []
+        self._match_count = 0
+        self._query = None
+        self.replace_button.setEnabled(False)
+        self.summary_label.clear()
+
+    def start_search(self) -> None:
+        if not self.project_root:
+            QMessageBox.information(self, "Project", "Open a project folder first.")
+            return
+        query = self._current_query()
+        if not query.pattern:
+            return
+        try:
+            query.compile()
+        except re.error as e:
+            QMessageBox.warning(self, "Invalid regular expression", str(e))
+            return
+        self.cancel_search()
+        self._clear_results()
+        self._query = query
+        self._search_id = next(self._search_ids)
+        worker = SearchWorker(self._search_id, self.project_root, query, self._index, ALLOWED_EXTENSIONS)
+        worker.found.connect(self._on_found)
+        worker.succeeded.connect(self._on_search_succeeded)
+        worker.failed.connect(self._on_search_failed)
+        worker.finished.connect(self._on_search_finished)
+        self._worker = worker
+        self.find_button.setEnabled(False)
+        self.stop_button.setEnabled(True)
+        self.summary_label.setText("Searching...")
+        self._thread = start_worker_thread(worker, self)
+
+    def cancel_search(self, wait: bool = False) -> None:
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        if wait and self._thread is not None:
+            self._thread.wait()
+
+    def _on_found(self, search_id: int, batch: List[FileMatches]) -> None:
+        # Results of a cancelled search may still arrive after a new one started.
+        if search_id != self._search_id:
+            return
+        self.results.setUpdatesEnabled(False)
+        for file_matches in batch:
+            count = len(file_matches.matches)
+            more = "+" if file_matches.truncated else ""
+            file_item = QTreeWidgetItem([f"{file_matches.rel}  ({count}{more})"])
+            file_item.setData(0, _LOCATION_ROLE, (file_matches.path, 1, 0, 0))
+            for match in file_matches.matches:
+                item = QTreeWidgetItem([f"{match.line}: {match.preview.strip()}"])
+                item.setData(0, _LOCATION_ROLE, (file_matches.path, match.line, match.column, match.length))
+                file_item.addChild(item)
+            self.results.addTopLevelItem(file_item)
+            self._result_files.append(file_matches.rel)
+            self._match_count += count
+        self.results.setUpdatesEnabled(True)
+        self.summary_label.setText(f"Searching... {self._match_count} matches in {len(self._result_files)} files")
+
+    def _on_search_succeeded(self, search_id: int, summary: SearchSummary) -> None:
+        if search_id != self._search_id:
+            return
+        text = (
+            f"{summary.matches} matches in {summary.files_matched} of {summary.files_searched} files "
+            f"({summary.seconds * 1000:.0f} ms{', indexed' if summary.indexed else ''})"
+        )
+        if summary.truncated:
+            text += " - stopped at the result limit"
+        self.summary_label.setText(text)
+
+    def _on_search_failed(self, search_id: int, message: str) -> None:
+        if search_id == self._search_id:
+            self.summary_label.setText(f"Search failed: {message}")
+
+    def _on_search_finished(self, search_id: int, cancelled: bool) -> None:
+        if search_id != self._search_id:
+            return
+        if cancelled:
+            self.summary_label.setText(f"Stopped: {self._match_count} matches in {len(self._result_files)} files")
+        self._search_ended()
+
+    def _search_ended(self) -> None:
+        self._search_id = 0
+        self._worker = None
+        self._thread = None
+        self.find_button.setEnabled(True)
+        self.stop_button.setEnabled(False)
+        self.replace_button.setEnabled(bool(self._result_files))
+
+    def _on_item_activated(self, item: QTreeWidgetItem, _column: int) -> None:
+        location = item.data(0, _LOCATION_ROLE)
+        if location:
+            self.open_location.emit(*location)
+
+    def replace_all(self) -> None:
+        """Replace every match of the last search in the files it found"""
+        if self._query is None or not self._result_files or self.is_searching():
+            return
+        modified = {_path_key(path) for path in self._modified_paths()}
+        rels = [rel for rel in self._result_files if _path_key(os.path.join(self.project_root, rel)) not in modified]
+        skipped = len(self._result_files) - len(rels)
+        message = f"Replace {self._match_count} matches in {len(self._result_files)} files?"
+        if skipped:
+            message += f"\n\n{skipped} files with unsaved changes will be skipped."
+        answer = QMessageBox.question(self, "Replace in Files", message)
+        if answer != QMessageBox.StandardButton.Yes or not rels:
+            return
+        root, query, replacement = self.project_root, self._query, self.replace_edit.text()
+        self.replace_button.setEnabled(False)
+        self.find_button.setEnabled(False)
+        self.summary_label.setText("Replacing...")
+        self._io.submit(
+            lambda: replace_in_files(root, query, replacement, rels),
+            lambda result, error: self._on_replaced(root, result, error),
+        )
+
+    def _on_replaced(self, root: str, result: Optional[ReplaceResult], error: Optional[BaseException]) -> None:
+        self.find_button.setEnabled(True)
+        if error is not None:
+            self.summary_label.setText(f"Replace failed: {error}")
+            return
+        self._clear_results()
+        text = f"Replaced {result.replacements} matches in {len(result.changed)} files"
+        if result.errors:
+            text += f"; {len(result.errors)} failed: " + ", ".join(rel for rel, _ in result.errors)
+        self.summary_label.setText(text)
+        if result.changed:
+            self.files_replaced.emit([os.path.join(root, rel) for rel in result.changed])
@@ -0,0 +1,75 @@
+import threading
+import time
+from typing import List, Optional, Set
+
+from PySide6.QtCore import QObject, Signal, Slot
+
+from byhunide.search import FileMatches, SearchQuery, TrigramIndex, search_project
+
+
+# Search results are delivered to the GUI at most this often.
+SEARCH_BATCH_SECONDS = 0.05
+
+
+class SearchWorker(QObject):
+    """Runs a find-in-files search off the GUI thread, streaming results.
+
+    Every signal but ``done`` carries ``search_id`` first, so results of a
+    superseded search can be told apart after its worker is deleted.
+    """
+
+    # Lists of FileMatches, batched so a flood of small files does not
+    # flood the GUI thread with signals.
+    found = Signal(int, object)
+    succeeded = Signal(int, object)  # SearchSummary
+    failed = Signal(int, str)
+    finished = Signal(int, bool)  # cancelled
+    done = Signal()
+
+    def __init__(
+        self,
+        search_id: int,
+        project_root: str,
+        query: SearchQuery,
+        index: Optional[TrigramIndex] = None,
+        extensions: Optional[Set[str]] = None,
+    ):
+        super().__init__()
+        self.search_id = search_id
+        self.project_root = project_root
+        self.query = query
+        self.index = index
+        self.extensions = extensions
+        self._cancel = threading.Event()
+        self._batch: List[FileMatches] = []
+        self._last_flush = 0.0
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def _on_file(self, result: FileMatches) -> None:
+        self._batch.append(result)
+        now = time.monotonic()
+        if now - self._last_flush >= SEARCH_BATCH_SECONDS:
+            self._flush()
+            self._last_flush = now
+
+    def _flush(self) -> None:
+        if self._batch:
+            self.found.emit(self.search_id, self._batch)
+            self._batch = []
+
+    @Slot()
+    def run(self) -> None:
+        try:
+            summary = search_project(
+                self.project_root, self.query, self._on_file, self._cancel, index=self.index, extensions=self.extensions
+            )
+            self._flush()
+        except Exception as e:
+            self.failed.emit(self.search_id, str(e))
+        else:
+            self.succeeded.emit(self.search_id, summary)
+        finally:
+            self.finished.emit(self.search_id, self._cancel.is_set())
+            self.done.emit()
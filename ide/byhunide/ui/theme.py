@@ -12,5 +12,10 @@ def apply_dark_theme(window) -> None:
         "QTabWidget::pane{border:0px;background:#0b1020;}"
         "QTabBar::tab{background:#0f1730;color:#c0caf5;padding:8px 10px;border-top-left-radius:6px;border-top-right-radius:6px;margin-right:4px;}"
         "QTabBar::tab:selected{background:#1f2a4a;}"
+        "QLineEdit{background:#0b1020;color:#c0caf5;border:1px solid #1f2a4a;padding:4px;}"
+        "QPushButton{background:#1f2a4a;color:#c0caf5;border:0px;padding:5px 12px;}"
+        "QPushButton:disabled{color:#565f89;}"
+        "QCheckBox,QLabel{color:#c0caf5;}"
+        "QDockWidget{color:#c0caf5;}"
         "QPlainTextEdit{background:#0b1020;color:#c0caf5;border:0px;padding:10px;selection-background-color:#1f2a4a;}"
     )
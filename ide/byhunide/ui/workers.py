@@ -0,0 +1,14 @@
+from PySide6.QtCore import QObject, Qt, QThread
+
+
+def start_worker_thread(worker: QObject, parent: QObject) -> QThread:
+    """Move ``worker`` to a new thread and start it; the thread quits when the worker is done"""
+    thread = QThread(parent)
+    worker.moveToThread(thread)
+    thread.started.connect(worker.run)
+    # Direct so the thread can quit even while the GUI thread is blocked in wait().
+    worker.done.connect(thread.quit, Qt.ConnectionType.DirectConnection)
+    worker.done.connect(worker.deleteLater)
+    thread.finished.connect(thread.deleteLater)
+    thread.start()
+    return thread
@@ -1,7 +1,10 @@
+import multiprocessing
 import sys
 
 
 def main() -> int:
+    # Build workers run in a process pool; needed for frozen Windows builds.
+    multiprocessing.freeze_support()
     try:
         from byhunide.app import main as run
     except ModuleNotFoundError as e:
@@ -0,0 +1,120 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import tracemalloc
+import unittest
+import zipfile
+
+from byhunide.build.compiler import compile_project, obfuscate_file, transform_source
+from byhunide.build.report import CACHE_BYPASSED
+
+
+# Large-file mode must peak under this multiple of the input size; the
+# in-memory path needs over 20x. Its fixed cost (about 32 MB of in-flight
+# chunks across the encoding layers) is covered by the input's size.
+MAX_PEAK_RATIO = 3.0
+LARGE_INPUT_BYTES = 16 * 1024 * 1024
+# Input for comparing against the in-memory path, which is costly on big files.
+SMALL_INPUT_BYTES = 1024 * 1024
+# A project of many files below the large-file threshold must not be held
+# in memory at once: its build peaks under this share of its total size.
+MID_FILES = 128
+MID_FILE_BYTES = 128 * 1024
+MAX_PROJECT_PEAK_SHARE = 0.5
+SEED = 1234
+
+_JS_LINE = "function f{0}(a, b) {{ var s = 'item {0} \\u00e9'; return a * {0} + b + s.length; }}\n"
+
+
+def _write_js(path: str, size: int) -> int:
+    written = 0
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        i = 0
+        while written < size:
+            line = _JS_LINE.format(i)
+            f.write(line)
+            written += len(line.encode("utf-8"))
+            i += 1
+    return written
+
+
+def _peak(fn):
+    tracemalloc.start()
+    try:
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+def _digest(chunks) -> str:
+    h = hashlib.sha256()
+    for chunk in chunks:
+        h.update(chunk)
+    return h.hexdigest()
+
+
+class LargeFileModeTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        cls.project = os.path.join(cls.tmp, "project")
+        os.makedirs(cls.project)
+        cls.large = os.path.join(cls.project, "bundle.js")
+        cls.large_bytes = _write_js(cls.large, LARGE_INPUT_BYTES)
+        with open(os.path.join(cls.project, "index.html"), "w", encoding="utf-8") as f:
+            f.write('<html><body><script src="bundle.js"></script></body></html>')
+        cls.small = os.path.join(cls.tmp, "small.js")
+        _write_js(cls.small, SMALL_INPUT_BYTES)
+        cls.mid_project = os.path.join(cls.tmp, "mid")
+        os.makedirs(cls.mid_project)
+        cls.mid_bytes = sum(
+            _write_js(os.path.join(cls.mid_project, f"module{i}.js"), MID_FILE_BYTES) for i in range(MID_FILES)
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp, True)
+
+    def test_obfuscate_file_peak_memory(self):
+        out_bytes, peak = _peak(
+            lambda: sum(len(chunk) for chunk in obfuscate_file(".js", self.large, seed=SEED))
+        )
+        self.assertGreater(out_bytes, self.large_bytes)
+        self.assertLess(peak, MAX_PEAK_RATIO * self.large_bytes)
+
+    def test_obfuscate_file_matches_in_memory_output(self):
+        with open(self.small, "rb") as f:
+            data = f.read()
+        # Large files are not minified, so compare against the unminified transform.
+        in_memory = transform_source(".js", data, seed=SEED, minify=False).encode("utf-8")
+        for chunk_size in (64 * 1024, 1024 * 1024):
+            streamed = b"".join(obfuscate_file(".js", self.small, seed=SEED, chunk_size=chunk_size))
+            self.assertEqual(streamed, in_memory)
+
+    def test_compile_project_streams_large_files(self):
+        out_path = os.path.join(self.tmp, "out.zip")
+        # A budget below the in-memory estimate forces large-file mode.
+        result, peak = _peak(
+            lambda: compile_project(self.project, out_path, seed=SEED, memory_budget=self.large_bytes)
+        )
+        self.assertLess(peak, MAX_PEAK_RATIO * self.large_bytes)
+        report = {r.path: r for r in result.files}["bundle.js"]
+        self.assertEqual((report.kind, report.cache), ("stream", CACHE_BYPASSED))
+        with zipfile.ZipFile(out_path) as zf, zf.open("bundle.js") as entry:
+            archived = _digest(iter(lambda: entry.read(1024 * 1024), b""))
+        self.assertEqual(archived, _digest(obfuscate_file(".js", self.large, seed=SEED)))
+
+    def test_compile_project_peak_memory_does_not_grow_with_project(self):
+        out_path = os.path.join(self.tmp, "mid.zip")
+        result, peak = _peak(
+            lambda: compile_project(self.mid_project, out_path, seed=SEED, workers=2, memory_budget=64 * 1024 * 1024)
+        )
+        self.assertEqual({r.kind for r in result.files}, {"transform"})
+        self.assertLess(peak, MAX_PROJECT_PEAK_SHARE * self.mid_bytes)
+
+
+if __name__ == "__main__":
+    unittest.main()
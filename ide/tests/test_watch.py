@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+from byhunide.build.compiler import compile_project, stream_threshold
+from byhunide.build.dedup import read_aliases
+from byhunide.build.watch import ProjectWatcher
+
+
+SEED = 99
+_JS_LINE = "function g{0}(x) {{ return x + {0}; }}\n"
+
+
+def _write_js(path: str, size: int) -> None:
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        written = i = 0
+        while written < size:
+            line = _JS_LINE.format(i)
+            f.write(line)
+            written += len(line)
+            i += 1
+
+
+def _touch(path: str, text: str) -> None:
+    with open(path, "a", encoding="utf-8", newline="\n") as f:
+        f.write(text)
+    # Make sure the change shows up even on coarse mtime clocks.
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 2_000_000_000))
+
+
+def _entries(path: str):
+    with zipfile.ZipFile(path) as zf:
+        return {name: zf.read(name) for name in zf.namelist()}
+
+
+class IncrementalUpdateTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.project = os.path.join(self.tmp, "project")
+        os.makedirs(self.project)
+        with open(os.path.join(self.project, "index.html"), "w", encoding="utf-8") as f:
+            f.write('<html><body><script src="app.js"></script></body></html>')
+
+    def _full_build(self, **options) -> dict:
+        out_path = os.path.join(self.tmp, "full.zip")
+        compile_project(self.project, out_path, seed=SEED, **options)
+        return _entries(out_path)
+
+    def test_incremental_entry_matches_full_build_with_workers(self):
+        # Large-file mode for a full build with 4 workers, but not for a single transform.
+        options = {"workers": 4, "memory_budget": 64 * 1024 * 1024}
+        size = 1024 * 1024
+        self.assertGreater(size, stream_threshold(options["memory_budget"], options["workers"]))
+        self.assertLess(size, stream_threshold(options["memory_budget"], 1))
+        app = os.path.join(self.project, "app.js")
+        _write_js(app, size)
+        out_path = os.path.join(self.tmp, "watch.zip")
+        watcher = ProjectWatcher(self.project, out_path, seed=SEED, **options)
+        self.assertTrue(watcher.poll().full_rebuild)
+
+        _touch(app, "var changed = 1;\n")
+        update = watcher.poll()
+        self.assertFalse(update.full_rebuild)
+        self.assertEqual(update.changed, ["app.js"])
+        self.assertEqual(_entries(out_path), self._full_build(**options))
+
+    def test_added_duplicate_becomes_an_alias(self):
+        for name in ("a.js", "unique.js"):
+            _write_js(os.path.join(self.project, name), 4096 if name == "a.js" else 2048)
+        out_path = os.path.join(self.tmp, "watch.zip")
+        watcher = ProjectWatcher(self.project, out_path, seed=SEED, dedup=True)
+        watcher.poll()
+
+        # An unrelated edit stays incremental.
+        _touch(os.path.join(self.project, "unique.js"), "var more = 2;\n")
+        self.assertFalse(watcher.poll().full_rebuild)
+
+        shutil.copyfile(os.path.join(self.project, "a.js"), os.path.join(self.project, "b.js"))
+        self.assertTrue(watcher.poll().full_rebuild)
+        with zipfile.ZipFile(out_path) as zf:
+            self.assertEqual(read_aliases(zf), {"b.js": "a.js"})
+        self.assertEqual(_entries(out_path), self._full_build(dedup=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
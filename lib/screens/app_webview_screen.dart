@@ -41,6 +41,24 @@ class _AppWebViewScreenState extends State<AppWebViewScreen> {
     _initializeApp();
   }
 
+  static const String _aliasManifestName = '.byhun/aliases.json';
+
+  // Build the extraction path for an archive entry and create its directory
+  Future<String> _prepareExtractPath(String tempPath, String filename) async {
+    final filePath = Platform.isWindows
+        ? '$tempPath\\${filename.replaceAll('/', '\\')}'
+        : '$tempPath/$filename';
+    final separator = Platform.isWindows ? '\\' : '/';
+    final lastSeparator = filePath.lastIndexOf(separator);
+    if (lastSeparator > 0) {
+      final fileDir = Directory(filePath.substring(0, lastSeparator));
+      if (!await fileDir.exists()) {
+        await fileDir.create(recursive: true);
+      }
+    }
+    return filePath;
+  }
+
   Future<void> _initializeApp() async {
     try {
       // Mark app as used
@@ -87,24 +105,29 @@ class _AppWebViewScreenState extends State<AppWebViewScreen> {
         final filename = file.name.replaceAll('\\', '/');
         if (filename.isEmpty) continue;
 
-        final filePath = Platform.isWindows
-            ? '$tempPath\\${filename.replaceAll('/', '\\')}'
-            : '$tempPath/$filename';
-        final separator = Platform.isWindows ? '\\' : '/';
-        final lastSeparator = filePath.lastIndexOf(separator);
-        if (lastSeparator > 0) {
-          final fileDir = Directory(filePath.substring(0, lastSeparator));
-          if (!await fileDir.exists()) {
-            await fileDir.create(recursive: true);
-          }
-        }
-
+        final filePath = await _prepareExtractPath(tempPath, filename);
         if (file.isFile) {
           final outFile = File(filePath);
           await outFile.writeAsBytes(file.content as List<int>);
         }
       }
 
+      // Deduplicated builds store identical files once and list the other
+      // paths in an alias manifest; restore them next to the originals.
+      final aliasManifest = archive.findFile(_aliasManifestName);
+      if (aliasManifest != null) {
+        final manifest = jsonDecode(
+          utf8.decode(aliasManifest.content as List<int>),
+        ) as Map<String, dynamic>;
+        final aliases = manifest['aliases'] as Map<String, dynamic>? ?? {};
+        for (final alias in aliases.entries) {
+          final target = archive.findFile(alias.value as String);
+          if (target == null || alias.key.split('/').contains('..')) continue;
+          final filePath = await _prepareExtractPath(tempPath, alias.key);
+          await File(filePath).writeAsBytes(target.content as List<int>);
+        }
+      }
+
       // Find index.html
       final indexPath = Platform.isWindows
           ? '$tempPath\\index.html'